@@ -0,0 +1,5 @@
+from src.batch import run_batch
+
+
+if __name__ == "__main__":
+    run_batch()
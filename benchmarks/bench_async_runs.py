@@ -0,0 +1,133 @@
+"""
+Benchmark research runs per second, sync invoke vs concurrent ainvoke.
+
+The whole workflow runs against a fake chat model and a fake search
+backend that both sleep instead of doing I/O, so the numbers measure how
+well one process overlaps waiting across sessions.
+
+Run from the repository root:
+    python -m benchmarks.bench_async_runs
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from src.api import ResearchAgent
+from src.prompts import Prompts
+from src.search_backends import register_backend
+from src.workflow import WorkflowBuilder
+
+from .fakes import FakeChatModel, FakeSearchBackend
+
+
+def make_builder(llm_latency: float, search_latency: float) -> WorkflowBuilder:
+    """Create a builder wired to the fake model and search backend.
+    
+    Args:
+        llm_latency: Fake model latency per call in seconds
+        search_latency: Fake search latency per query in seconds
+        
+    Returns:
+        Workflow builder with all caches and checkpoints disabled
+    """
+    @register_backend("bench-async")
+    class BenchSearchBackend(FakeSearchBackend):
+        def __init__(self):
+            super().__init__(
+                latency=search_latency, jitter=0.0, name="bench-async"
+            )
+    
+    class BenchWorkflowBuilder(WorkflowBuilder):
+        def create_llm(self, settings=None):
+            return FakeChatModel(latency=llm_latency)
+    
+    return BenchWorkflowBuilder(
+        model_name="fake-chat",
+        num_sub_questions=3,
+        max_iterations=2,
+        question_prompt=Prompts.QUESTION_GENERATION,
+        analysis_prompt=Prompts.ANALYSIS,
+        reflection_prompt=Prompts.REFLECTION,
+        report_prompt=Prompts.REPORT_GENERATION,
+        use_search_cache=False,
+        use_llm_cache=False,
+        search_backend="bench-async",
+        fetch_pages=False,
+        checkpoints=False
+    )
+
+
+def time_sync(builder: WorkflowBuilder, runs: int) -> float:
+    """Run sessions one after another with ``invoke``.
+    
+    Returns:
+        Wall time in seconds
+    """
+    app = builder.build()
+    start = time.perf_counter()
+    for i in range(runs):
+        app.invoke(builder.create_initial_state(f"topic {i}"))
+    return time.perf_counter() - start
+
+
+def time_async(builder: WorkflowBuilder, runs: int, concurrency: int) -> float:
+    """Run sessions concurrently with ``ResearchAgent.research_many``.
+    
+    Returns:
+        Wall time in seconds
+    """
+    agent = ResearchAgent(builder=builder, max_concurrent_runs=concurrency)
+    queries = [f"topic {i}" for i in range(runs)]
+    
+    async def run() -> float:
+        start = time.perf_counter()
+        results = await agent.research_many(queries)
+        elapsed = time.perf_counter() - start
+        assert all(result["report"] for result in results), "missing report"
+        return elapsed
+    
+    return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=64)
+    parser.add_argument("--sync-runs", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 8, 32, 64]
+    )
+    args = parser.parse_args()
+    
+    builder = make_builder(args.llm_latency, args.search_latency)
+    
+    print(
+        f"fake latency: {args.llm_latency:.2f}s per LLM call, "
+        f"{args.search_latency:.2f}s per search\n"
+    )
+    print(f"{'mode':>14} {'runs':>6} {'wall (s)':>9} {'runs/s':>8}")
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        time_sync(builder, 1)  # warm-up
+        elapsed = time_sync(builder, args.sync_runs)
+    print(
+        f"{'sync invoke':>14} {args.sync_runs:>6} {elapsed:>9.2f} "
+        f"{args.sync_runs / elapsed:>8.2f}"
+    )
+    
+    for concurrency in args.concurrency:
+        runs = args.sync_runs if concurrency == 1 else args.runs
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = time_async(builder, runs, concurrency)
+        print(
+            f"{f'ainvoke x{concurrency}':>14} {runs:>6} {elapsed:>9.2f} "
+            f"{runs / elapsed:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark search tail latency with and without hedged requests.
+
+The primary fake backend is usually fast but occasionally stalls; the
+secondary is slower on average but has no tail.
+
+Run from the repository root:
+    python -m benchmarks.bench_hedging
+"""
+
+import argparse
+import time
+from typing import List
+
+from src.search_tool import WebSearchTool
+
+from .fakes import FakeSearchBackend
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def measure(tool: WebSearchTool, num_queries: int) -> List[float]:
+    """Run sequential searches and return their latencies.
+    
+    Args:
+        tool: Search tool to exercise
+        num_queries: Number of searches
+        
+    Returns:
+        Latency of each search in seconds
+    """
+    latencies = []
+    for i in range(num_queries):
+        start = time.perf_counter()
+        tool.search(f"query {i}")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--tail-probability", type=float, default=0.05)
+    parser.add_argument("--percentile", type=float, default=90)
+    args = parser.parse_args()
+    
+    def primary(name: str) -> FakeSearchBackend:
+        return FakeSearchBackend(
+            latency=0.02, jitter=0.01, tail_probability=args.tail_probability,
+            tail_latency=0.5, name=name, seed=1
+        )
+    
+    plain = WebSearchTool(backend=primary("primary-plain"))
+    hedged = WebSearchTool(
+        backend=primary("primary-hedged"),
+        hedge_backend=FakeSearchBackend(
+            latency=0.05, jitter=0.01, name="secondary", seed=2
+        ),
+        hedge_percentile=args.percentile
+    )
+    hedged.hedge.min_samples = 20
+    hedged.hedge.default_delay = 0.1
+    
+    print(f"{args.queries} queries, {args.tail_probability:.0%} stragglers\n")
+    print(f"{'mode':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for mode, tool in (("plain", plain), ("hedged", hedged)):
+        latencies = measure(tool, args.queries)
+        print(
+            f"{mode:>8} "
+            + " ".join(
+                f"{percentile(latencies, p) * 1000:>9.1f}" for p in (50, 95, 99)
+            )
+        )
+    print(f"\nhedge stats: {hedged.hedge.stats}")
+
+
+if __name__ == "__main__":
+    main()
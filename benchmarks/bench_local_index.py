@@ -0,0 +1,71 @@
+"""
+Benchmark indexing and query latency of the local-corpus BM25 backend.
+
+Run from the repository root:
+    python -m benchmarks.bench_local_index
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.local_index import LocalCorpusIndex
+
+
+def write_corpus(directory: str, num_files: int, seed: int = 0) -> None:
+    """Write a synthetic markdown corpus.
+    
+    Args:
+        directory: Target folder
+        num_files: Number of files to create
+        seed: Seed for the word generator
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    for i in range(num_files):
+        paragraphs = [
+            " ".join(rng.choices(vocabulary, k=rng.randint(40, 120)))
+            for _ in range(rng.randint(3, 10))
+        ]
+        with open(os.path.join(directory, f"doc{i}.md"), "w") as f:
+            f.write("\n\n".join(paragraphs))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "corpus")
+        os.makedirs(corpus)
+        write_corpus(corpus, args.files)
+        index = LocalCorpusIndex(os.path.join(tmp, "index.sqlite"))
+        
+        start = time.perf_counter()
+        counts = index.update(corpus)
+        print(f"Full index:        {time.perf_counter() - start:8.2f}s  {counts}")
+        
+        with open(os.path.join(corpus, "doc0.md"), "a") as f:
+            f.write("\n\nfreshly appended paragraph term1 term2")
+        start = time.perf_counter()
+        counts = index.update(corpus)
+        print(f"Incremental index: {time.perf_counter() - start:8.2f}s  {counts}")
+        
+        rng = random.Random(1)
+        queries = [
+            " ".join(f"term{rng.randrange(5000)}" for _ in range(4))
+            for _ in range(args.queries)
+        ]
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, top_k=5)
+        elapsed = time.perf_counter() - start
+        print(f"Query latency:     {elapsed / len(queries) * 1000:8.2f}ms (mean)")
+
+
+if __name__ == "__main__":
+    main()
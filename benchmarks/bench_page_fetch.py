@@ -0,0 +1,95 @@
+"""
+Benchmark the page fetch stage against a local HTTP fixture server.
+
+The server answers every page after a fixed delay, serves one oversized
+page to exercise the byte cap, and one page that fails.
+
+Run from the repository root:
+    python -m benchmarks.bench_page_fetch
+"""
+
+import argparse
+import contextlib
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.fetcher import PageFetcher
+from src.models import SearchHit
+
+PAGE = (
+    "<html><head><title>Fixture</title><style>body {{ color: red; }}</style>"
+    "<script>var tracking = 1;</script></head><body><nav>Menu</nav>"
+    "<h1>Page {name}</h1>{paragraphs}<footer>Footer</footer></body></html>"
+)
+
+
+def make_handler(delay: float):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            if self.path == "/missing":
+                self.send_error(404)
+                return
+            repeats = 20000 if self.path == "/huge" else 20
+            paragraphs = "".join(
+                f"<p>Paragraph {i} of {self.path} with some text.</p>"
+                for i in range(repeats)
+            )
+            body = PAGE.format(name=self.path, paragraphs=paragraphs).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    return FixtureHandler
+
+
+def run(fetcher: PageFetcher, hits) -> float:
+    for hit in hits:
+        hit.content = ""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fetcher.fetch_for_hits(hits, top_k=3)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--delay", type=float, default=0.1)
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    
+    paths = [f"/page{i}" for i in range(args.pages - 2)] + ["/huge", "/missing"]
+    hits = [
+        SearchHit(i // 3, f"Page {i}", base + path, "", "fixture", 0.0)
+        for i, path in enumerate(paths)
+    ]
+    
+    print(f"{len(hits)} pages, {args.delay:.2f}s server delay\n")
+    for concurrency in (1, 8):
+        fetcher = PageFetcher(max_concurrency=concurrency, max_bytes=64 * 1024)
+        elapsed = run(fetcher, hits)
+        fetcher.close()
+        print(f"concurrency {concurrency:>2}: {elapsed:6.2f}s")
+    
+    huge = next(hit for hit in hits if hit.url.endswith("/huge"))
+    sample = next(hit for hit in hits if hit.url.endswith("/page0"))
+    print(f"\n/huge extracted chars (capped): {len(huge.content)}")
+    print(f"/page0 extract starts: {sample.content[:60]!r}")
+    assert "tracking" not in sample.content and "Menu" not in sample.content
+    
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark pipelined search and analysis against search-then-analyze.
+
+Every mode runs the same research sessions against a fake search backend
+and a fake chat model with jittered, straggler-prone latencies:
+
+- single: search all sub-questions, then one analysis prompt
+- map_reduce: search all sub-questions, then one analysis per
+  sub-question in parallel, then merge
+- pipelined: each sub-question's analysis starts as soon as its own
+  search returns, then merge
+
+Besides the whole session, the search and analysis phase is timed from
+the end of sub-question generation to the end of the (merged) analysis,
+which is where pipelining overlaps LLM work with searches. The fake
+model's latency does not grow with prompt size, so "single" gets no
+penalty for its one large prompt.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import statistics
+import time
+
+from src.prompts import Prompts
+from src.search_backends import register_backend
+from src.workflow import WorkflowBuilder
+
+from .fakes import FakeChatModel, FakeSearchBackend
+
+MODES = ("single", "map_reduce", "pipelined")
+
+
+def make_builder(args: argparse.Namespace, mode: str) -> WorkflowBuilder:
+    """Create a builder for one analysis mode wired to the fakes.
+    
+    Args:
+        args: Parsed benchmark options
+        mode: Analysis mode
+        
+    Returns:
+        Workflow builder with all caches and checkpoints disabled and one analysis pass
+    """
+    @register_backend("bench-pipeline")
+    class BenchSearchBackend(FakeSearchBackend):
+        def __init__(self):
+            super().__init__(
+                latency=args.search_latency,
+                jitter=args.search_jitter,
+                seed=args.seed,
+                tail_probability=args.tail_probability,
+                tail_latency=args.tail_latency,
+                name="bench-pipeline"
+            )
+    
+    class BenchWorkflowBuilder(WorkflowBuilder):
+        def create_llm(self, settings=None):
+            return FakeChatModel(
+                latency=args.llm_latency, jitter=args.llm_jitter
+            )
+    
+    return BenchWorkflowBuilder(
+        model_name="fake-chat",
+        num_sub_questions=args.questions,
+        max_iterations=1,
+        question_prompt=Prompts.QUESTION_GENERATION,
+        analysis_prompt=Prompts.ANALYSIS,
+        reflection_prompt=Prompts.REFLECTION,
+        report_prompt=Prompts.REPORT_GENERATION,
+        use_search_cache=False,
+        use_llm_cache=False,
+        search_backend="bench-pipeline",
+        fetch_pages=False,
+        checkpoints=False,
+        analysis_mode=mode,
+        analysis_concurrency=args.concurrency
+    )
+
+
+def time_mode(args: argparse.Namespace, mode: str) -> tuple:
+    """Run the sessions of one mode one after another.
+    
+    Returns:
+        Tuple of (session wall times, search and analysis phase times)
+        in seconds
+    """
+    random.seed(args.seed)
+    builder = make_builder(args, mode)
+    app = builder.build()
+    # Searches and branches get the same concurrency in every mode
+    builder.nodes.search_tool.max_concurrency = args.concurrency
+    
+    analysis = "analyze_context" if mode == "single" else "merge_analyses"
+    
+    async def run() -> tuple:
+        times, phases = [], []
+        for i in range(args.runs):
+            start = time.perf_counter()
+            finished = {}
+            async for update in app.astream(
+                builder.create_initial_state(f"topic {i}"),
+                stream_mode="updates"
+            ):
+                for name in update:
+                    finished[name] = time.perf_counter()
+            times.append(time.perf_counter() - start)
+            phases.append(
+                finished[analysis] - finished["generate_sub_questions"]
+            )
+            assert update["generate_report"]["report"], "missing report"
+        return times, phases
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    parser.add_argument("--search-jitter", type=float, default=0.25)
+    parser.add_argument("--tail-probability", type=float, default=0.1)
+    parser.add_argument("--tail-latency", type=float, default=1.2)
+    parser.add_argument("--llm-latency", type=float, default=0.6)
+    parser.add_argument("--llm-jitter", type=float, default=0.45)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    print(
+        f"{args.questions} sub-questions, {args.concurrency} concurrent, "
+        f"search {args.search_latency:.2f}±{args.search_jitter:.2f}s "
+        f"({args.tail_probability:.0%} at {args.tail_latency:.2f}s), "
+        f"LLM {args.llm_latency:.2f}±{args.llm_jitter:.2f}s\n"
+    )
+    print(
+        f"{'mode':>11} {'session (s)':>12} {'search+analysis (s)':>20} "
+        f"{'phase vs map_reduce':>20}"
+    )
+    
+    results = {mode: time_mode(args, mode) for mode in MODES}
+    baseline = statistics.mean(results["map_reduce"][1])
+    for mode, (times, phases) in results.items():
+        phase = statistics.mean(phases)
+        print(
+            f"{mode:>11} {statistics.mean(times):>12.2f} {phase:>20.2f} "
+            f"{(phase - baseline) / baseline:>+20.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
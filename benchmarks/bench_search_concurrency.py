@@ -0,0 +1,63 @@
+"""
+Benchmark sequential vs concurrent ``WebSearchTool.search_multiple``.
+
+Run from the repository root:
+    python -m benchmarks.bench_search_concurrency
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from src.search_tool import WebSearchTool
+
+from .fakes import FakeSearchBackend
+
+
+def time_search(num_questions: int, concurrency: int, latency: float) -> float:
+    """Time one ``search_multiple`` call against the fake backend.
+    
+    Args:
+        num_questions: Number of sub-questions to search
+        concurrency: Maximum concurrent searches
+        latency: Fake backend latency in seconds
+        
+    Returns:
+        Wall time in seconds
+    """
+    tool = WebSearchTool(
+        backend=FakeSearchBackend(latency=latency),
+        max_concurrency=concurrency
+    )
+    questions = [f"Sub-question number {i}?" for i in range(num_questions)]
+    
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = tool.search_multiple(questions)
+    elapsed = time.perf_counter() - start
+    
+    question_ids = [hit.question_id for hit in results]
+    assert question_ids == sorted(question_ids), "results are out of order"
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    
+    print(f"{args.questions} questions, {args.latency:.2f}s fake latency\n")
+    print(f"{'concurrency':>12} {'wall (s)':>10} {'speedup':>8}")
+    
+    baseline = None
+    for concurrency in args.concurrency:
+        elapsed = time_search(args.questions, concurrency, args.latency)
+        baseline = baseline or elapsed
+        print(f"{concurrency:>12} {elapsed:>10.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark CLI startup time and check it against an import budget.
+
+Each target is imported in a fresh interpreter, several times, and the
+median wall time of the process and the import time of the target
+(from ``python -X importtime``) are reported, with the slowest modules
+it pulled in. The CLI entry points must not import the heavy
+dependencies, which load in the background or when the workflow is
+built, and their import must stay within ``--budget`` seconds. The
+command exits with status 1 when either check fails.
+
+``src.workflow`` is measured for reference only; it is what the CLIs
+defer.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported by the command line entry points, which are checked
+CLI_MODULES = ("src.main", "src.batch")
+# Imported for reference, not checked
+REFERENCE_MODULES = ("src.workflow",)
+
+# Packages the entry points must leave to first use
+HEAVY_PACKAGES = (
+    "langgraph", "langchain_core", "langchain_openai", "langchain_community",
+    "langsmith", "openai", "httpx", "tiktoken", "duckduckgo_search", "ddgs"
+)
+
+DEFAULT_BUDGET = 0.5  # seconds to import one entry point
+
+
+def python(*args: str) -> subprocess.CompletedProcess:
+    """Run the current interpreter from the repository root."""
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def measure(module: str) -> Tuple[float, float, List[Tuple[float, str]]]:
+    """Import a module in a fresh interpreter.
+    
+    Returns:
+        Tuple of (process wall time, import time of the module, import
+        times of the modules it loaded) in seconds
+    """
+    start = time.perf_counter()
+    result = python("-X", "importtime", "-c", f"import {module}")
+    wall = time.perf_counter() - start
+    
+    # Lines look like "import time: self [us] | cumulative | name", with
+    # nested imports indented and listed before the module importing them
+    block, imports, total = [], [], 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        seconds = int(cumulative) / 1e6
+        if name.startswith("  "):
+            block.append((seconds, name.strip()))
+        elif name.strip() == module:
+            total, imports = seconds, block
+        else:
+            block = []
+    return wall, total, imports
+
+
+def heavy_imports(module: str) -> List[str]:
+    """Return the heavy packages loaded by importing a module."""
+    result = python(
+        "-c",
+        f"import json, sys, {module}; "
+        "print(json.dumps(sorted({name.split('.')[0] "
+        "for name in sys.modules})))"
+    )
+    loaded = set(json.loads(result.stdout))
+    return sorted(loaded.intersection(HEAVY_PACKAGES))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        help="seconds an entry point may take to import "
+        f"[default: {DEFAULT_BUDGET}]"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="slowest imported modules shown per target"
+    )
+    args = parser.parse_args()
+    
+    # One untimed import per target fills the bytecode cache
+    for module in CLI_MODULES + REFERENCE_MODULES:
+        python("-c", f"import {module}")
+    
+    print(
+        f"{'target':>14} {'process (s)':>12} {'import (s)':>11} "
+        f"{'budget':>8}"
+    )
+    failures = []
+    slowest: Dict[str, List[Tuple[float, str]]] = {}
+    for module in CLI_MODULES + REFERENCE_MODULES:
+        walls, totals = [], []
+        for _ in range(args.runs):
+            wall, total, imports = measure(module)
+            walls.append(wall)
+            totals.append(total)
+        slowest[module] = sorted(imports, reverse=True)[:args.top]
+        
+        total = statistics.median(totals)
+        if module in CLI_MODULES:
+            status = "ok" if total <= args.budget else "over"
+            if total > args.budget:
+                failures.append(
+                    f"{module} took {total:.3f}s to import "
+                    f"(budget {args.budget:.3f}s)"
+                )
+            heavy = heavy_imports(module)
+            if heavy:
+                failures.append(
+                    f"{module} imports {', '.join(heavy)} at startup"
+                )
+        else:
+            status = "-"
+        print(
+            f"{module:>14} {statistics.median(walls):>12.3f} "
+            f"{total:>11.3f} {status:>8}"
+        )
+    
+    for module, imports in slowest.items():
+        print(f"\nSlowest imports of {module}:")
+        for seconds, name in imports:
+            print(f"  {seconds:>7.3f}s  {name}")
+    
+    if failures:
+        print("\n❌ Startup budget exceeded:")
+        for failure in failures:
+            print(f"  • {failure}")
+        sys.exit(1)
+    print("\n✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""
+Benchmark the whole research workflow and compare it to a baseline.
+
+The real graph from ``WorkflowBuilder`` runs against the fake chat model
+and search backend, so every prompt, node and search path is exercised
+without network access. Per node it reports wall time and prompt and
+completion tokens; per run it reports end-to-end latency and failures,
+and one extra run under ``tracemalloc`` gives the peak Python memory.
+
+Fake latencies are seeded, so with unchanged code two runs of the
+benchmark give nearly the same times and exactly the same token counts.
+``--save-baseline`` stores the results; later runs are compared to the
+stored baseline and exit with status 1 when a metric regressed by more
+than its tolerance.
+
+Run from the repository root:
+    python -m benchmarks.bench_workflow
+    python -m benchmarks.bench_workflow --save-baseline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.config import Config
+from src.prompts import Prompts
+from src.reflection import available_strategies
+from src.search_backends import register_backend
+from src.workflow import ANALYSIS_MODES, WorkflowBuilder
+
+from .fakes import FakeChatModel, FakeSearchBackend
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(__file__), "baselines", "bench_workflow.json"
+)
+
+# Smallest increases counted as regressions
+MIN_SECONDS = 0.01
+MIN_MEGABYTES = 0.25
+
+# Options that change what is measured; a baseline only applies to runs
+# with the same values
+SETTINGS = (
+    "runs", "questions", "iterations", "analysis", "reflection", "use_async",
+    "llm_latency", "llm_jitter", "response_size", "llm_failure_rate",
+    "search_latency", "search_jitter", "result_size", "search_failure_rate",
+    "seed"
+)
+
+
+class NodeProfiler(BaseCallbackHandler):
+    """Callback handler collecting wall time and tokens per graph node.
+    
+    LangGraph tags every run inside a node with the node name in the
+    ``langgraph_node`` metadata, which attributes model calls to nodes.
+    """
+    
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {
+                "calls": 0,
+                "seconds": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0
+            }
+        )
+        self._starts: Dict = {}
+        self._model_nodes: Dict = {}
+        self._lock = threading.Lock()
+    
+    def on_chain_start(
+        self,
+        serialized,
+        inputs,
+        *,
+        run_id,
+        parent_run_id=None,
+        metadata=None,
+        **kwargs
+    ):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            with self._lock:
+                # The node's runnable runs inside a wrapper of the same
+                # name; only the outer one is timed
+                if parent_run_id not in self._starts:
+                    self._starts[run_id] = (node, time.perf_counter())
+    
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish_node(run_id)
+    
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish_node(run_id)
+    
+    def _finish_node(self, run_id) -> None:
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+            if started is not None:
+                node, start = started
+                self.nodes[node]["calls"] += 1
+                self.nodes[node]["seconds"] += time.perf_counter() - start
+    
+    def on_chat_model_start(
+        self,
+        serialized,
+        messages,
+        *,
+        run_id,
+        metadata=None,
+        **kwargs
+    ):
+        with self._lock:
+            self._model_nodes[run_id] = (metadata or {}).get(
+                "langgraph_node", "other"
+            )
+    
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            node = self._model_nodes.pop(run_id, "other")
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(generation.message, "usage_metadata", None)
+                    if usage:
+                        totals = self.nodes[node]
+                        totals["prompt_tokens"] += usage["input_tokens"]
+                        totals["completion_tokens"] += usage["output_tokens"]
+
+
+def make_builder(args: argparse.Namespace) -> WorkflowBuilder:
+    """Create a builder wired to the fakes.
+    
+    Args:
+        args: Parsed benchmark options
+        
+    Returns:
+        Workflow builder with all caches and checkpoints disabled
+    """
+    @register_backend("bench-workflow")
+    class BenchSearchBackend(FakeSearchBackend):
+        def __init__(self):
+            super().__init__(
+                latency=args.search_latency,
+                jitter=args.search_jitter,
+                result_size=args.result_size,
+                seed=args.seed,
+                name="bench-workflow",
+                failure_rate=args.search_failure_rate
+            )
+    
+    class BenchWorkflowBuilder(WorkflowBuilder):
+        def create_llm(self, settings=None):
+            return FakeChatModel(
+                latency=args.llm_latency,
+                jitter=args.llm_jitter,
+                response_size=args.response_size,
+                failure_rate=args.llm_failure_rate
+            )
+    
+    return BenchWorkflowBuilder(
+        model_name="fake-chat",
+        num_sub_questions=args.questions,
+        max_iterations=args.iterations,
+        question_prompt=Prompts.QUESTION_GENERATION,
+        analysis_prompt=Prompts.ANALYSIS,
+        reflection_prompt=Prompts.REFLECTION,
+        report_prompt=Prompts.REPORT_GENERATION,
+        use_search_cache=False,
+        use_llm_cache=False,
+        search_backend="bench-workflow",
+        fetch_pages=False,
+        node_models={},
+        stream=False,
+        reflection_strategy=args.reflection,
+        analysis_mode=args.analysis,
+        checkpoints=False
+    )
+
+
+def run_once(
+    app,
+    builder: WorkflowBuilder,
+    query: str,
+    config: dict,
+    use_async: bool
+):
+    """Run one research session and return its final state."""
+    state = builder.create_initial_state(query)
+    if use_async:
+        return asyncio.run(app.ainvoke(state, config))
+    return app.invoke(state, config)
+
+
+def measure(args: argparse.Namespace) -> dict:
+    """Run the sessions and collect the metrics.
+    
+    Returns:
+        Metrics per run: end-to-end latency, failures, peak memory,
+        tokens, and per-node calls, time and tokens
+    """
+    random.seed(args.seed)
+    builder = make_builder(args)
+    app = builder.build()
+    profiler = NodeProfiler()
+    config = {"callbacks": [profiler]}
+    
+    latencies, failures = [], 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.runs):
+            start = time.perf_counter()
+            try:
+                run_once(app, builder, f"topic {i}", config, args.use_async)
+            except Exception:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        
+        # Memory is measured separately since tracing allocations slows
+        # down the timed runs
+        tracemalloc.start()
+        try:
+            run_once(app, builder, "memory topic", {}, args.use_async)
+        except Exception:
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    
+    nodes = {
+        node: {
+            "calls": values["calls"] / args.runs,
+            "seconds": values["seconds"] / args.runs,
+            "prompt_tokens": values["prompt_tokens"] / args.runs,
+            "completion_tokens": values["completion_tokens"] / args.runs
+        }
+        for node, values in sorted(profiler.nodes.items())
+    }
+    ordered = sorted(latencies)
+    return {
+        "latency_mean": statistics.mean(latencies) if latencies else 0.0,
+        "latency_p95": (
+            ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            if ordered else 0.0
+        ),
+        "failed_runs": failures,
+        "peak_memory_mb": peak / 2**20,
+        "prompt_tokens": sum(n["prompt_tokens"] for n in nodes.values()),
+        "completion_tokens": sum(
+            n["completion_tokens"] for n in nodes.values()
+        ),
+        "nodes": nodes
+    }
+
+
+def print_metrics(metrics: dict) -> None:
+    print(
+        f"{'node':>22} {'calls':>6} {'time (s)':>9} "
+        f"{'prompt tok':>11} {'compl. tok':>11}"
+    )
+    for node, values in metrics["nodes"].items():
+        print(
+            f"{node:>22} {values['calls']:>6.1f} {values['seconds']:>9.3f} "
+            f"{values['prompt_tokens']:>11.0f} "
+            f"{values['completion_tokens']:>11.0f}"
+        )
+    print(
+        f"\nend-to-end {metrics['latency_mean']:.3f}s mean, "
+        f"{metrics['latency_p95']:.3f}s p95, "
+        f"{metrics['failed_runs']} failed runs, "
+        f"peak memory {metrics['peak_memory_mb']:.1f} MB, "
+        f"{metrics['prompt_tokens']:.0f} prompt + "
+        f"{metrics['completion_tokens']:.0f} completion tokens per run"
+    )
+
+
+def compare(
+    metrics: dict,
+    baseline: dict,
+    tolerance: float,
+    token_tolerance: float
+) -> List[str]:
+    """Compare metrics to a baseline.
+    
+    Times must also grow by at least ``MIN_SECONDS`` and memory by
+    ``MIN_MEGABYTES`` to count, so millisecond nodes do not flag noise.
+    
+    Args:
+        metrics: Current metrics
+        baseline: Baseline metrics
+        tolerance: Allowed relative increase of times and memory
+        token_tolerance: Allowed relative increase of token counts
+        
+    Returns:
+        Descriptions of the metrics that regressed
+    """
+    rows = [
+        ("end-to-end mean", "latency_mean", tolerance, MIN_SECONDS),
+        ("end-to-end p95", "latency_p95", tolerance, MIN_SECONDS),
+        ("peak memory (MB)", "peak_memory_mb", tolerance, MIN_MEGABYTES),
+        ("prompt tokens", "prompt_tokens", token_tolerance, 0),
+        ("completion tokens", "completion_tokens", token_tolerance, 0)
+    ]
+    rows = [
+        (label, metrics[key], baseline[key], limit, floor)
+        for label, key, limit, floor in rows
+    ]
+    for node, values in metrics["nodes"].items():
+        old = baseline["nodes"].get(node)
+        if old is None:
+            continue
+        rows.append((
+            f"{node} time",
+            values["seconds"],
+            old["seconds"],
+            tolerance,
+            MIN_SECONDS
+        ))
+        if values["prompt_tokens"] or old["prompt_tokens"]:
+            rows.append((
+                f"{node} prompt tokens",
+                values["prompt_tokens"],
+                old["prompt_tokens"],
+                token_tolerance,
+                0
+            ))
+    
+    print(f"\n{'metric':>34} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressions = []
+    for label, current, old, limit, floor in rows:
+        change = (current - old) / old if old else 0.0
+        flag = ""
+        if change > limit and current - old > floor:
+            flag = "  REGRESSION"
+            regressions.append(f"{label} {change:+.1%}")
+        print(
+            f"{label:>34} {old:>10.3f} {current:>10.3f} "
+            f"{change:>+8.1%}{flag}"
+        )
+    
+    if metrics["failed_runs"] > baseline["failed_runs"]:
+        regressions.append(
+            f"failed runs {baseline['failed_runs']} -> {metrics['failed_runs']}"
+        )
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=2)
+    parser.add_argument(
+        "--analysis", choices=ANALYSIS_MODES, default=Config.ANALYSIS_MODE
+    )
+    parser.add_argument(
+        "--reflection",
+        choices=["llm", *available_strategies()],
+        default=Config.REFLECTION_STRATEGY
+    )
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--llm-jitter", type=float, default=0.02)
+    parser.add_argument("--response-size", type=int, default=1000)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--search-jitter", type=float, default=0.02)
+    parser.add_argument("--result-size", type=int, default=300)
+    parser.add_argument("--search-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--baseline",
+        default=DEFAULT_BASELINE,
+        help="baseline file to compare against [default: %(default)s]"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="allowed relative increase of times and memory"
+    )
+    parser.add_argument(
+        "--token-tolerance",
+        type=float,
+        default=0.01,
+        help="allowed relative increase of token counts"
+    )
+    args = parser.parse_args()
+    settings = {name: getattr(args, name) for name in SETTINGS}
+    
+    print(
+        f"{args.runs} runs, {args.questions} sub-questions, "
+        f"{args.iterations} iterations, {args.analysis} analysis, "
+        f"{args.reflection} reflection, "
+        f"{'ainvoke' if args.use_async else 'invoke'}\n"
+    )
+    metrics = measure(args)
+    print_metrics(metrics)
+    
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "metrics": metrics}, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return
+    
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline")
+        return
+    if baseline["settings"] != settings:
+        print("\nBaseline was recorded with different options; not comparing")
+        return
+    
+    regressions = compare(
+        metrics, baseline["metrics"], args.tolerance, args.token_tolerance
+    )
+    if regressions:
+        print("\n❌ Regressions: " + ", ".join(regressions))
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
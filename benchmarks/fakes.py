@@ -0,0 +1,180 @@
+"""
+In-process fake backends used by the benchmarks.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+import zlib
+from typing import List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.search_backends import RawResult, SearchBackend
+from src.utils import estimate_tokens
+
+
+class FakeSearchBackend(SearchBackend):
+    """Search backend with artificial latency and failures."""
+    
+    name = "fake"
+    cacheable = False
+    
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.1,
+        result_size: int = 300,
+        num_results: int = 5,
+        seed: int = 0,
+        tail_probability: float = 0.0,
+        tail_latency: float = 0.0,
+        name: str = "fake",
+        failure_rate: float = 0.0
+    ):
+        """Initialize the fake search backend.
+        
+        Args:
+            latency: Mean delay per search in seconds
+            jitter: Maximum random deviation from the mean delay in seconds
+            result_size: Number of snippet characters per result
+            num_results: Number of results returned per search
+            seed: Seed for the latency random generator
+            tail_probability: Chance that a search takes ``tail_latency``
+            tail_latency: Delay of a tail (straggler) search in seconds
+            name: Backend name, which also selects the shared guard
+            failure_rate: Chance that a search raises ``ConnectionError``
+                after its delay
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.result_size = result_size
+        self.num_results = num_results
+        self.tail_probability = tail_probability
+        self.tail_latency = tail_latency
+        self.name = name
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def sample_latency(self) -> float:
+        """Draw one search latency from the configured distribution."""
+        with self._lock:
+            if self._random.random() < self.tail_probability:
+                return self.tail_latency
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        return max(delay, 0.0)
+    
+    def run(self, query: str) -> List[RawResult]:
+        """Sleep for the configured latency and return filler results.
+        
+        Args:
+            query: The search query
+            
+        Returns:
+            Fake search results
+        """
+        time.sleep(self.sample_latency())
+        self._maybe_fail()
+        return self.results(query)
+    
+    async def arun(self, query: str) -> List[RawResult]:
+        """Async version of ``run`` that sleeps without blocking the loop."""
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        return self.results(query)
+    
+    def _maybe_fail(self) -> None:
+        with self._lock:
+            failed = self._random.random() < self.failure_rate
+        if failed:
+            raise ConnectionError("fake search failure")
+    
+    def results(self, query: str) -> List[RawResult]:
+        """Return filler results for a query without any delay."""
+        results = []
+        for i in range(self.num_results):
+            text = f"Result {i} for {query}. "
+            results.append({
+                "title": f"Result {i}",
+                "url": f"https://example.com/{zlib.crc32(query.encode())}/{i}",
+                "snippet": (text * (self.result_size // len(text) + 1))[
+                    :self.result_size
+                ]
+            })
+        return results
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with artificial latency and canned workflow answers.
+    
+    Sub-question prompts get one question per line, reflection prompts
+    get "yes" and every other prompt gets ``response_size`` characters
+    of filler text. A share ``failure_rate`` of calls raise
+    ``ConnectionError`` after their delay.
+    """
+    
+    model_name: str = "fake-chat"
+    temperature: float = 0.0
+    latency: float = 0.2
+    jitter: float = 0.0  # maximum random deviation from ``latency``
+    response_size: int = 1000
+    failure_rate: float = 0.0
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self._delay())
+        self._maybe_fail()
+        return self._result(messages)
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return self._result(messages)
+    
+    def _maybe_fail(self) -> None:
+        if random.random() < self.failure_rate:
+            raise ConnectionError("fake model failure")
+    
+    def _delay(self) -> float:
+        return max(
+            self.latency + random.uniform(-self.jitter, self.jitter), 0.0
+        )
+    
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = messages[-1].content
+        match = re.search(r"Generate exactly (\d+)", prompt)
+        if match:
+            count = int(match.group(1))
+            text = "\n".join(
+                f"What is aspect number {i} of this research topic?"
+                for i in range(count)
+            )
+        elif "ready for report generation" in prompt:
+            text = "yes, the analysis is comprehensive"
+        else:
+            filler = f"Generated text for a {len(prompt)} character prompt. "
+            text = (filler * (self.response_size // len(filler) + 1))[
+                :self.response_size
+            ]
+        input_tokens = sum(
+            estimate_tokens(str(message.content)) for message in messages
+        )
+        output_tokens = estimate_tokens(text)
+        message = AIMessage(
+            content=text,
+            response_metadata={"model_name": self.model_name},
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
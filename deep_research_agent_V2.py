@@ -1,16 +1,12 @@
 import os
 from typing import TypedDict, List, Annotated
-from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_community.tools import DuckDuckGoSearchRun
 import operator
-from langsmith.run_helpers import traceable
 
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_ENDPOINT"] = "https://api.smith.langchain.com"
-os.environ["LANGCHAIN_API_KEY"] = "" # Add your key
-os.environ["LANGCHAIN_PROJECT"] = "default"
+def setup_environment():
+    os.environ["LANGCHAIN_TRACING_V2"] = "true"
+    os.environ["LANGCHAIN_ENDPOINT"] = "https://api.smith.langchain.com"
+    os.environ["LANGCHAIN_API_KEY"] = "" # Add your key
+    os.environ["LANGCHAIN_PROJECT"] = "default"
 
 openai_api_key = "" # Add key
 
@@ -22,8 +18,6 @@ class ResearchState(TypedDict):
     report: str
     iteration: int
 
-search_tool = DuckDuckGoSearchRun()
-
 def create_workflow(
     model_name,
     num_sub_questions,
@@ -33,11 +27,19 @@ def create_workflow(
     reflection_prompt,
     report_prompt
 ):
+    # Imported here so the prompts appear without waiting for LangChain
+    from langgraph.graph import StateGraph, END
+    from langchain_openai import ChatOpenAI
+    from langchain_core.messages import HumanMessage, SystemMessage
+    from langchain_community.tools import DuckDuckGoSearchRun
+    from langsmith.run_helpers import traceable
+    
     llm = ChatOpenAI(
         model=model_name,
         api_key=openai_api_key,
         temperature=0.7
     )
+    search_tool = DuckDuckGoSearchRun()
 
     @traceable(run_type="chain", name="generate_sub_questions")
     def generate_sub_questions(state: ResearchState) -> ResearchState:
@@ -226,6 +228,8 @@ Include a short summary of the steps taken (Planner's sub-questions, Reflection
 
 
 def run_research():
+    setup_environment()
+    
     print("\n" + "="*60)
     print("🔬 DEEP RESEARCH AGENT")
     print("="*60)
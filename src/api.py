@@ -0,0 +1,148 @@
+"""
+Async API for running research sessions from other programs.
+
+Example:
+    agent = ResearchAgent(model_name="gpt-4o-mini")
+    results = await agent.research_many(["topic one", "topic two"])
+"""
+
+import asyncio
+from typing import List, Optional
+
+from .checkpoint import new_run_id, run_config
+from .config import Config
+from .models import ResearchState
+from .prompts import Prompts
+from .workflow import WorkflowBuilder
+
+
+class ResearchAgent:
+    """Runs concurrent research sessions on one event loop.
+    
+    All sessions share one compiled graph and therefore one set of
+    models, search guards and caches.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = Config.DEFAULT_MODEL,
+        num_sub_questions: int = Config.DEFAULT_NUM_SUB_QUESTIONS,
+        max_iterations: int = Config.DEFAULT_MAX_ITERATIONS,
+        max_concurrent_runs: int = Config.API_MAX_CONCURRENT_RUNS,
+        question_prompt: str = Prompts.QUESTION_GENERATION,
+        analysis_prompt: str = Prompts.ANALYSIS,
+        reflection_prompt: str = Prompts.REFLECTION,
+        report_prompt: str = Prompts.REPORT_GENERATION,
+        builder: Optional[WorkflowBuilder] = None,
+        **builder_options
+    ):
+        """Build the workflow.
+        
+        Args:
+            model_name: Name of the language model to use
+            num_sub_questions: Number of sub-questions to generate
+            max_iterations: Maximum reflection iterations
+            max_concurrent_runs: Maximum sessions running at once
+            question_prompt: System prompt for question generation
+            analysis_prompt: System prompt for analysis
+            reflection_prompt: System prompt for reflection
+            report_prompt: System prompt for report generation
+            builder: Preconfigured builder, overriding all of the above
+                except ``max_concurrent_runs``
+            **builder_options: Further ``WorkflowBuilder`` arguments, e.g.
+                ``search_backend``. ``report_path`` is not supported since
+                sessions would share the file.
+        """
+        self.builder = builder or WorkflowBuilder(
+            model_name=model_name,
+            num_sub_questions=num_sub_questions,
+            max_iterations=max_iterations,
+            question_prompt=question_prompt,
+            analysis_prompt=analysis_prompt,
+            reflection_prompt=reflection_prompt,
+            report_prompt=report_prompt,
+            **builder_options
+        )
+        self.app = self.builder.build()
+        self.max_concurrent_runs = max(1, max_concurrent_runs)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_runs)
+    
+    async def research(
+        self,
+        query: str,
+        run_id: Optional[str] = None
+    ) -> ResearchState:
+        """Run one research session.
+        
+        Args:
+            query: Research query
+            run_id: Id to resume the run with if it fails, defaults to a
+                new id
+                
+        Returns:
+            Final research state, including the report
+        """
+        run_id = run_id or new_run_id()
+        async with self._semaphore:
+            try:
+                return await self.app.ainvoke(
+                    self.builder.create_initial_state(query),
+                    run_config(run_id, query=query)
+                )
+            finally:
+                # Streamed timings are printed, not returned; dropping
+                # them keeps a long-lived agent from accumulating them
+                self.builder.nodes.pop_ttft(run_id)
+    
+    async def resume(self, run_id: str) -> ResearchState:
+        """Continue a failed session from its last completed step.
+        
+        Requires checkpoints, which are on unless the builder was created
+        with ``checkpoints=False``.
+        
+        Args:
+            run_id: Id the session was started with
+            
+        Returns:
+            Final research state, including the report
+        """
+        async with self._semaphore:
+            try:
+                return await self.app.ainvoke(None, run_config(run_id))
+            finally:
+                self.builder.nodes.pop_ttft(run_id)
+    
+    async def research_many(
+        self,
+        queries: List[str],
+        return_exceptions: bool = False
+    ) -> List[ResearchState]:
+        """Run research sessions concurrently.
+        
+        At most ``max_concurrent_runs`` sessions run at a time.
+        
+        Args:
+            queries: Research queries
+            return_exceptions: Whether a failed session returns its
+                exception instead of cancelling the others
+                
+        Returns:
+            Final research states, in query order
+        """
+        return await asyncio.gather(
+            *(self.research(query) for query in queries),
+            return_exceptions=return_exceptions
+        )
+
+
+async def research(query: str, **options) -> ResearchState:
+    """Run a single research session with a new ``ResearchAgent``.
+    
+    Args:
+        query: Research query
+        **options: ``ResearchAgent`` arguments
+        
+    Returns:
+        Final research state, including the report
+    """
+    return await ResearchAgent(**options).research(query)
@@ -0,0 +1,540 @@
+"""
+Non-interactive batch runner for JSONL query files.
+
+Each input line is a JSON object with a ``query`` and optional
+per-query settings, e.g.:
+
+    {"id": "ev", "query": "Solid-state EV batteries", "model": "gpt-4o"}
+
+Every query gets a report in ``<output>/reports/<id>.md`` and a line in
+``<output>/manifest.jsonl`` as soon as it finishes. Running again with
+the same output folder skips queries that already succeeded, so an
+interrupted batch resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, TextIO, Tuple
+
+from .config import Config
+from .metrics import MetricsRegistry, estimate_cost, write_metrics
+from .prompts import Prompts
+from .search_backends import available_backends
+from .tracing import TRACING_MODES, configure_tracing
+from .utils import save_report_to_file
+
+if TYPE_CHECKING:
+    from .workflow import WorkflowBuilder
+
+# Per-query settings accepted in the input file, besides "id" and "query"
+SETTINGS = (
+    "model", "num_sub_questions", "max_iterations", "backend", "fetch_pages"
+)
+# JSON type each setting must have
+SETTING_TYPES = {
+    "model": str,
+    "num_sub_questions": int,
+    "max_iterations": int,
+    "backend": str,
+    "fetch_pages": bool
+}
+# Characters not allowed in an id, which names the item's report file:
+# path separators and characters Windows rejects in file names
+UNSAFE_ID_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+@dataclass
+class BatchItem:
+    """One query of a batch.
+    
+    Attributes:
+        id: Stable identifier, used for the report file name and resuming
+        query: Research query
+        settings: Values for every key in ``SETTINGS``
+    """
+    id: str
+    query: str
+    settings: dict
+
+
+def query_id(query: str, settings: dict) -> str:
+    """Derive a stable identifier from a query and its settings.
+    
+    Args:
+        query: Research query
+        settings: Per-query settings
+        
+    Returns:
+        Slug of the query followed by a short hash of query and settings
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")[:40]
+    digest = hashlib.blake2b(
+        json.dumps([query, settings], sort_keys=True).encode("utf-8"),
+        digest_size=4
+    ).hexdigest()
+    return f"{slug}-{digest}" if slug else digest
+
+
+def load_items(path: str, defaults: dict) -> List[BatchItem]:
+    """Read and validate a JSONL query file.
+    
+    Args:
+        path: Path to the JSONL file
+        defaults: Values for settings a line does not set
+        
+    Returns:
+        Batch items in file order
+        
+    Raises:
+        ValueError: If a line is invalid, an id is not a safe file name
+            or two lines share an id
+    """
+    items = []
+    seen: Set[str] = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from e
+            if not isinstance(record, dict) or not record.get("query"):
+                raise ValueError(f"{path}:{line_number}: missing 'query'")
+            if not isinstance(record["query"], str):
+                raise ValueError(f"{path}:{line_number}: query must be a string")
+            
+            unknown = set(record) - set(SETTINGS) - {"id", "query"}
+            if unknown:
+                raise ValueError(
+                    f"{path}:{line_number}: unknown settings "
+                    f"{', '.join(sorted(unknown))}"
+                )
+            settings = {key: record.get(key, defaults[key]) for key in SETTINGS}
+            _validate_settings(settings, f"{path}:{line_number}")
+            
+            item_id = str(
+                record.get("id") or query_id(record["query"], settings)
+            )
+            _validate_id(item_id, f"{path}:{line_number}")
+            if item_id in seen:
+                raise ValueError(
+                    f"{path}:{line_number}: duplicate id '{item_id}'"
+                )
+            seen.add(item_id)
+            items.append(BatchItem(item_id, record["query"], settings))
+    return items
+
+
+def _validate_id(item_id: str, where: str) -> None:
+    # Reports are written to <reports dir>/<id>.md
+    if (
+        UNSAFE_ID_CHARS.search(item_id)
+        or os.sep in item_id
+        or (os.altsep and os.altsep in item_id)
+        or ".." in item_id
+        or item_id != item_id.strip(" .")
+    ):
+        raise ValueError(f"{where}: id '{item_id}' is not a valid file name")
+
+
+def _validate_settings(settings: dict, where: str) -> None:
+    for key, expected in SETTING_TYPES.items():
+        value = settings[key]
+        # JSON true/false load as bool, which is also an int
+        if not isinstance(value, expected) or (
+            isinstance(value, bool) and expected is not bool
+        ):
+            raise ValueError(
+                f"{where}: {key} must be {expected.__name__}, "
+                f"got {json.dumps(value)}"
+            )
+    if not (
+        Config.MIN_SUB_QUESTIONS
+        <= settings["num_sub_questions"]
+        <= Config.MAX_SUB_QUESTIONS
+    ):
+        raise ValueError(f"{where}: num_sub_questions out of range")
+    if not (
+        Config.MIN_ITERATIONS
+        <= settings["max_iterations"]
+        <= Config.MAX_ITERATIONS
+    ):
+        raise ValueError(f"{where}: max_iterations out of range")
+    if settings["backend"] not in available_backends():
+        raise ValueError(f"{where}: unknown backend '{settings['backend']}'")
+
+
+def load_completed(manifest_path: str) -> Set[str]:
+    """Return the ids recorded as successful in a manifest.
+    
+    Args:
+        manifest_path: Path to ``manifest.jsonl``
+        
+    Returns:
+        Set of completed ids (empty if there is no manifest yet)
+    """
+    completed = set()
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # line cut short by an interruption
+            if entry.get("status") == "ok":
+                completed.add(entry["id"])
+    return completed
+
+
+class BatchRunner:
+    """Runs batch items on a bounded pool of concurrent sessions.
+    
+    Items with the same settings share one compiled workflow, and all
+    workflows share one set of caches and one metrics registry.
+    """
+    
+    def __init__(
+        self,
+        output_dir: str,
+        concurrency: int = Config.BATCH_MAX_CONCURRENCY,
+        use_search_cache: bool = Config.SEARCH_CACHE_ENABLED,
+        use_llm_cache: bool = Config.LLM_CACHE_ENABLED,
+        console: Optional[TextIO] = None
+    ):
+        """Initialize the runner.
+        
+        Args:
+            output_dir: Folder for reports, the manifest and the log
+            concurrency: Maximum sessions running at once
+            use_search_cache: Whether to use the persistent search caches
+            use_llm_cache: Whether to use the persistent LLM cache
+            console: Stream for progress lines, defaults to stdout
+        """
+        self.output_dir = output_dir
+        self.reports_dir = os.path.join(output_dir, "reports")
+        self.manifest_path = os.path.join(output_dir, "manifest.jsonl")
+        self.concurrency = max(1, concurrency)
+        self.use_search_cache = use_search_cache
+        self.use_llm_cache = use_llm_cache
+        self.console = console or sys.stdout
+        # LangGraph and LangChain load with the first runner, not with
+        # the module, so argument errors are reported right away
+        from .workflow import SharedCaches
+        
+        self.caches = SharedCaches()
+        self.metrics = MetricsRegistry()
+        self._workflows: Dict[Tuple, Tuple["WorkflowBuilder", object]] = {}
+        os.makedirs(self.reports_dir, exist_ok=True)
+    
+    async def run(self, items: List[BatchItem], resume: bool = True) -> dict:
+        """Run every item that has not completed yet.
+        
+        Args:
+            items: Batch items
+            resume: Whether to skip items already in the manifest
+            
+        Returns:
+            Summary statistics
+        """
+        completed = load_completed(self.manifest_path) if resume else set()
+        pending = [item for item in items if item.id not in completed]
+        self._print(
+            f"📦 {len(items)} queries, {len(items) - len(pending)} already "
+            f"done, running {len(pending)} ({self.concurrency} concurrent)"
+        )
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        
+        async def run_one(item: BatchItem) -> dict:
+            async with semaphore:
+                return await self._run_item(item)
+        
+        entries = []
+        for done, next_done in enumerate(
+            asyncio.as_completed([run_one(item) for item in pending]), 1
+        ):
+            entry = await next_done
+            entries.append(entry)
+            if entry["status"] == "ok":
+                self._print(
+                    f"[{done}/{len(pending)}] ✓ {entry['id']} "
+                    f"({entry['elapsed']:.1f}s, "
+                    f"{entry['tokens']['total_tokens']} tokens)"
+                )
+            else:
+                self._print(
+                    f"[{done}/{len(pending)}] ✗ {entry['id']}: "
+                    f"{entry['error']}"
+                )
+        
+        summary = {
+            "queries": len(items),
+            "skipped": len(items) - len(pending),
+            "succeeded": sum(entry["status"] == "ok" for entry in entries),
+            "failed": sum(entry["status"] != "ok" for entry in entries),
+            "wall_seconds": round(time.perf_counter() - start, 3),
+            "tokens": _sum_tokens(entry["tokens"] for entry in entries),
+            "cost_usd": round(
+                sum(entry["cost_usd"] for entry in entries), 6
+            )
+        }
+        with open(
+            os.path.join(self.output_dir, "summary.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(summary, f, indent=2)
+        write_metrics(self.metrics, os.path.join(self.output_dir, "metrics"))
+        return summary
+    
+    def _thread_id(self, item: BatchItem) -> str:
+        """Return the checkpoint thread of an item.
+        
+        Scoped to the output folder, query and settings, so a reused id
+        in another batch or an edited line never resumes the wrong run.
+        """
+        digest = hashlib.blake2b(
+            json.dumps(
+                [os.path.abspath(self.output_dir), item.query, item.settings],
+                sort_keys=True
+            ).encode("utf-8"),
+            digest_size=8
+        ).hexdigest()
+        return f"batch-{item.id}-{digest}"
+    
+    async def _run_item(self, item: BatchItem) -> dict:
+        """Run one item, write its report and append it to the manifest."""
+        from langchain_core.callbacks import UsageMetadataCallbackHandler
+        from .checkpoint import run_config
+        
+        builder, app = self._workflow(item.settings)
+        usage = UsageMetadataCallbackHandler()
+        started_at = time.time()
+        start = time.perf_counter()
+        entry = {"id": item.id, "query": item.query, "settings": item.settings}
+        config = run_config(self._thread_id(item), query=item.query)
+        config["callbacks"] = [usage]
+        try:
+            # A query that failed mid-run continues from its checkpoint
+            snapshot = (
+                await app.aget_state(config) if builder.checkpointer else None
+            )
+            if snapshot is not None and snapshot.next:
+                entry["resumed_at"] = list(snapshot.next)
+            result = await app.ainvoke(
+                None if "resumed_at" in entry
+                else builder.create_initial_state(item.query),
+                config=config
+            )
+        except Exception as e:
+            entry.update(status="error", error=f"{type(e).__name__}: {e}")
+        else:
+            report_path = os.path.join(self.reports_dir, f"{item.id}.md")
+            saved = save_report_to_file(
+                report_path,
+                result["query"],
+                result["sub_questions"],
+                result["report"],
+                item.settings["model"],
+                item.settings["num_sub_questions"],
+                item.settings["max_iterations"]
+            )
+            if saved:
+                entry.update(status="ok", report=report_path)
+            else:
+                entry.update(status="error", error="report could not be saved")
+        
+        entry.update(
+            started_at=started_at,
+            elapsed=round(time.perf_counter() - start, 3),
+            tokens=_sum_tokens(usage.usage_metadata.values()),
+            tokens_by_model={
+                model: dict(counts)
+                for model, counts in usage.usage_metadata.items()
+            },
+            cost_usd=round(sum(
+                estimate_cost(
+                    model,
+                    counts.get("input_tokens", 0),
+                    counts.get("output_tokens", 0)
+                )
+                for model, counts in usage.usage_metadata.items()
+            ), 6)
+        )
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        return entry
+    
+    def _workflow(self, settings: dict) -> Tuple["WorkflowBuilder", object]:
+        """Return the compiled workflow for a set of settings."""
+        from .workflow import WorkflowBuilder
+        
+        key = tuple(settings[name] for name in SETTINGS)
+        if key not in self._workflows:
+            builder = WorkflowBuilder(
+                model_name=settings["model"],
+                num_sub_questions=settings["num_sub_questions"],
+                max_iterations=settings["max_iterations"],
+                question_prompt=Prompts.QUESTION_GENERATION,
+                analysis_prompt=Prompts.ANALYSIS,
+                reflection_prompt=Prompts.REFLECTION,
+                report_prompt=Prompts.REPORT_GENERATION,
+                use_search_cache=self.use_search_cache,
+                search_backend=settings["backend"],
+                fetch_pages=settings["fetch_pages"],
+                use_llm_cache=self.use_llm_cache,
+                caches=self.caches,
+                metrics=self.metrics
+            )
+            self._workflows[key] = (builder, builder.build())
+        return self._workflows[key]
+    
+    def _print(self, message: str) -> None:
+        print(message, file=self.console, flush=True)
+
+
+def _sum_tokens(usages) -> dict:
+    totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for usage in usages:
+        for key in totals:
+            totals[key] += usage.get(key, 0)
+    return totals
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse batch command line options.
+    
+    Args:
+        argv: Argument list, defaults to ``sys.argv[1:]``
+        
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Run research queries from a JSONL file"
+    )
+    parser.add_argument("input", help="JSONL file with one query per line")
+    parser.add_argument(
+        "--output",
+        default=Config.BATCH_OUTPUT_DIR,
+        help=f"folder for reports and the manifest "
+        f"[default: {Config.BATCH_OUTPUT_DIR}]"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=Config.BATCH_MAX_CONCURRENCY,
+        help=f"queries run at once [default: {Config.BATCH_MAX_CONCURRENCY}]"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="rerun queries already recorded as done in the manifest"
+    )
+    parser.add_argument("--model", default=Config.DEFAULT_MODEL)
+    parser.add_argument(
+        "--num-sub-questions",
+        type=int,
+        default=Config.DEFAULT_NUM_SUB_QUESTIONS
+    )
+    parser.add_argument(
+        "--max-iterations",
+        type=int,
+        default=Config.DEFAULT_MAX_ITERATIONS
+    )
+    parser.add_argument(
+        "--backend",
+        choices=available_backends(),
+        default=Config.SEARCH_BACKEND
+    )
+    parser.add_argument(
+        "--fetch-pages",
+        action="store_true",
+        default=Config.FETCH_PAGES_ENABLED
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="bypass the persistent search caches"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="always call the model instead of reusing cached responses"
+    )
+    parser.add_argument(
+        "--tracing",
+        choices=TRACING_MODES,
+        default=Config.TRACING_MODE,
+        help="send traces to LangSmith, write them to Config.TRACE_PATH "
+        f"(local) or turn tracing off [default: {Config.TRACING_MODE}]"
+    )
+    return parser.parse_args(argv)
+
+
+def run_batch(argv: Optional[List[str]] = None) -> None:
+    """Run a batch from the command line.
+    
+    Workflow output goes to ``<output>/batch.log``; only per-query
+    progress is printed.
+    
+    Args:
+        argv: Command line arguments, defaults to ``sys.argv[1:]``
+    """
+    args = parse_args(argv)
+    Config.setup_environment()
+    Config.validate_config()
+    tracer = configure_tracing(args.tracing)
+    
+    defaults = {
+        "model": args.model,
+        "num_sub_questions": args.num_sub_questions,
+        "max_iterations": args.max_iterations,
+        "backend": args.backend,
+        "fetch_pages": args.fetch_pages
+    }
+    try:
+        items = load_items(args.input, defaults)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+    
+    runner = BatchRunner(
+        args.output,
+        concurrency=args.concurrency,
+        use_search_cache=Config.SEARCH_CACHE_ENABLED and not args.no_cache,
+        use_llm_cache=Config.LLM_CACHE_ENABLED and not args.no_llm_cache
+    )
+    log_path = os.path.join(args.output, "batch.log")
+    try:
+        with open(log_path, "a", encoding="utf-8") as log:
+            with contextlib.redirect_stdout(log):
+                summary = asyncio.run(
+                    runner.run(items, resume=not args.no_resume)
+                )
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted; run the same command again to resume")
+        sys.exit(130)
+    
+    print(
+        f"\n✅ {summary['succeeded']} succeeded, {summary['failed']} failed, "
+        f"{summary['skipped']} skipped in {summary['wall_seconds']:.1f}s "
+        f"({summary['tokens']['total_tokens']} tokens, "
+        f"~${summary['cost_usd']:.4f})"
+    )
+    print(f"📁 Reports and manifest in {args.output}")
+    if tracer is not None:
+        tracer.flush()
+        print(
+            f"🧭 {tracer.stats()['recorded']} trace spans written to "
+            f"{Config.TRACE_PATH}"
+        )
@@ -0,0 +1,270 @@
+"""
+Persistent SQLite-backed caches for search results and fetched pages.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import List, Optional
+
+from .config import Config
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache key.
+    
+    Args:
+        query: Raw search query
+        
+    Returns:
+        Lowercased query with punctuation removed and whitespace collapsed
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class SQLiteCache:
+    """Key/value cache stored in SQLite with per-entry TTL and LRU eviction."""
+    
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        max_entries: int,
+        table: str = "entries",
+        max_bytes: Optional[int] = None
+    ):
+        """Open (or create) the cache database.
+        
+        Args:
+            path: Path to the SQLite database file
+            ttl: Default time-to-live for new entries in seconds
+            max_entries: Maximum number of entries kept before evicting
+                the least recently used ones
+            table: Name of the table holding the entries
+            max_bytes: Maximum total size of stored values, or None for
+                no size bound
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_last_access "
+            f"ON {table} (last_access)"
+        )
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached value, or None on a miss or expired entry.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value if present and fresh
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?",
+                (key,)
+            ).fetchone()
+            
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute(
+                        f"DELETE FROM {self.table} WHERE key = ?", (key,)
+                    )
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            
+            self._conn.execute(
+                f"UPDATE {self.table} SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+    
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value and evict least recently used entries if needed.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds, defaults to the cache TTL
+        """
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} "
+                "(key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table}"
+            ).fetchone()[0]
+    
+    def stats(self) -> dict:
+        """Return hit/miss counters for this process.
+        
+        Returns:
+            Dictionary with hits, misses, hit rate and entry count
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self)
+        }
+    
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used overflow.
+        
+        Overflow is counted in entries and, if ``max_bytes`` is set, in
+        total value size.
+        """
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time(),)
+        )
+        overflow = self._conn.execute(
+            f"SELECT COUNT(*) FROM {self.table}"
+        ).fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} "
+                "ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+        
+        if self.max_bytes is None:
+            return
+        excess = self._conn.execute(
+            f"SELECT COALESCE(SUM(LENGTH(CAST(value AS BLOB))), 0) FROM {self.table}"
+        ).fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in self._conn.execute(
+            f"SELECT key, LENGTH(CAST(value AS BLOB)) FROM {self.table} "
+            "ORDER BY last_access ASC"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany(
+            f"DELETE FROM {self.table} WHERE key = ?", victims
+        )
+
+
+class SearchCache(SQLiteCache):
+    """Search hit cache keyed by normalized query, storing JSON records."""
+    
+    def __init__(
+        self,
+        path: str = Config.SEARCH_CACHE_PATH,
+        ttl: float = Config.SEARCH_CACHE_TTL,
+        max_entries: int = Config.SEARCH_CACHE_MAX_ENTRIES
+    ):
+        """Open the search cache.
+        
+        Args:
+            path: Path to the SQLite database file
+            ttl: Time-to-live for cached results in seconds
+            max_entries: Maximum number of cached queries
+        """
+        super().__init__(path, ttl, max_entries, table="search_hits")
+    
+    def get(self, query: str, namespace: str = "") -> Optional[List[dict]]:
+        """Look up results for a query.
+        
+        Args:
+            query: Search query
+            namespace: Backend name, so backends never share entries
+            
+        Returns:
+            Cached hit records if present and fresh
+        """
+        value = super().get(f"{namespace}:{normalize_query(query)}")
+        return None if value is None else json.loads(value)
+    
+    def set(
+        self,
+        query: str,
+        value: List[dict],
+        ttl: Optional[float] = None,
+        namespace: str = ""
+    ) -> None:
+        """Store results for a query.
+        
+        Args:
+            query: Search query
+            value: Hit records (``SearchHit.to_dict()``)
+            ttl: Time-to-live in seconds, defaults to the cache TTL
+            namespace: Backend name, so backends never share entries
+        """
+        super().set(
+            f"{namespace}:{normalize_query(query)}",
+            json.dumps(value, separators=(",", ":")),
+            ttl
+        )
+
+
+class PageCache(SQLiteCache):
+    """Extracted page text keyed by URL."""
+    
+    def __init__(
+        self,
+        path: str = Config.FETCH_CACHE_PATH,
+        ttl: float = Config.FETCH_CACHE_TTL,
+        max_entries: int = Config.FETCH_CACHE_MAX_ENTRIES
+    ):
+        """Open the page cache.
+        
+        Args:
+            path: Path to the SQLite database file
+            ttl: Time-to-live for cached pages in seconds
+            max_entries: Maximum number of cached pages
+        """
+        super().__init__(path, ttl, max_entries, table="pages")
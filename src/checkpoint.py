@@ -0,0 +1,532 @@
+"""
+Durable SQLite checkpoints for resuming interrupted research runs.
+
+Every node's output is checkpointed, so a run that fails in a late node
+(a timeout in ``generate_report``, a rate limit) resumes from the last
+completed node instead of repeating the search and LLM calls before it.
+Each run is a LangGraph thread whose id is the run id.
+
+Values are serialized with LangGraph's msgpack serializer and compressed
+with zstd when the ``zstandard`` package is installed, or zlib otherwise.
+"""
+
+import asyncio
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from .config import Config
+
+# Types stored in the state that msgpack may rebuild on load
+_STATE_TYPES = [("src.models", "SearchHit"), ("src.models", "Gap")]
+
+
+def new_run_id() -> str:
+    """Return a new run id, sortable by start time."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+
+
+def run_config(run_id: str, **metadata) -> RunnableConfig:
+    """Return the invoke config of a checkpointed run.
+    
+    Args:
+        run_id: Run id, used as the LangGraph thread id
+        **metadata: Values stored with every checkpoint of the run
+        
+    Returns:
+        Runnable config for ``invoke``/``ainvoke``
+    """
+    config: RunnableConfig = {"configurable": {"thread_id": run_id}}
+    if metadata:
+        config["metadata"] = metadata
+    return config
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Wraps a serializer and compresses values above a size threshold.
+    
+    The compression codec is appended to the type tag, e.g.
+    ``msgpack+zstd``, so small values stay uncompressed and values written
+    with either codec can be read back.
+    """
+    
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        min_size: int = Config.CHECKPOINT_COMPRESS_MIN_BYTES,
+        level: int = Config.CHECKPOINT_COMPRESS_LEVEL
+    ):
+        """Initialize the serializer.
+        
+        Args:
+            serde: Serializer producing the bytes to compress, defaults to
+                LangGraph's msgpack serializer
+            min_size: Smallest serialized value that is compressed
+            level: Compression level
+        """
+        self.serde = serde or JsonPlusSerializer(
+            allowed_msgpack_modules=_STATE_TYPES
+        )
+        self.min_size = min_size
+        self.level = level
+        try:
+            import zstandard
+            self.codec = "zstd"
+        except ImportError:
+            self.codec = "zlib"
+        # zstd contexts must not be shared between threads
+        self._zstd = threading.local()
+    
+    def _zstd_context(self, kind: str):
+        """Return this thread's zstd "compressor" or "decompressor"."""
+        import zstandard
+        context = getattr(self._zstd, kind, None)
+        if context is None:
+            context = (
+                zstandard.ZstdCompressor(level=self.level)
+                if kind == "compressor" else zstandard.ZstdDecompressor()
+            )
+            setattr(self._zstd, kind, context)
+        return context
+    
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+        if self.codec == "zstd":
+            compressed = self._zstd_context("compressor").compress(data)
+            return f"{type_}+zstd", compressed
+        return f"{type_}+zlib", zlib.compress(data, min(self.level, 9))
+    
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        base, _, codec = type_.partition("+")
+        if codec == "zstd":
+            if self.codec != "zstd":
+                raise ValueError(
+                    "Checkpoint is zstd-compressed; install zstandard to read it"
+                )
+            payload = self._zstd_context("decompressor").decompress(payload)
+        elif codec == "zlib":
+            payload = zlib.decompress(payload)
+        return self.serde.loads_typed((base, payload))
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """LangGraph checkpoint saver stored in a SQLite file.
+    
+    Like LangGraph's in-memory saver, channel values are stored once per
+    channel version, so a checkpoint only writes the channels its node
+    changed. Runs older than ``ttl`` and runs beyond the ``max_runs`` most
+    recent ones are deleted when the saver opens.
+    """
+    
+    def __init__(
+        self,
+        path: str = Config.CHECKPOINT_PATH,
+        ttl: float = Config.CHECKPOINT_TTL,
+        max_runs: int = Config.CHECKPOINT_MAX_RUNS,
+        serde: Optional[SerializerProtocol] = None
+    ):
+        """Open (or create) the checkpoint database.
+        
+        Args:
+            path: Path to the SQLite database file
+            ttl: Seconds after its last checkpoint that a run is deleted
+            max_runs: Maximum number of runs kept
+            serde: Serializer, defaults to compressed msgpack
+        """
+        super().__init__(serde=serde or CompressedSerializer())
+        self.path = path
+        self.ttl = ttl
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "thread_id TEXT NOT NULL, "
+            "checkpoint_ns TEXT NOT NULL, "
+            "checkpoint_id TEXT NOT NULL, "
+            "parent_id TEXT, "
+            "type TEXT NOT NULL, "
+            "checkpoint BLOB NOT NULL, "
+            "metadata_type TEXT NOT NULL, "
+            "metadata BLOB NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id));"
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "thread_id TEXT NOT NULL, "
+            "checkpoint_ns TEXT NOT NULL, "
+            "channel TEXT NOT NULL, "
+            "version TEXT NOT NULL, "
+            "type TEXT NOT NULL, "
+            "value BLOB NOT NULL, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, channel, version));"
+            "CREATE TABLE IF NOT EXISTS writes ("
+            "thread_id TEXT NOT NULL, "
+            "checkpoint_ns TEXT NOT NULL, "
+            "checkpoint_id TEXT NOT NULL, "
+            "task_id TEXT NOT NULL, "
+            "idx INTEGER NOT NULL, "
+            "channel TEXT NOT NULL, "
+            "type TEXT NOT NULL, "
+            "value BLOB NOT NULL, "
+            "task_path TEXT NOT NULL, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx));"
+            "CREATE INDEX IF NOT EXISTS checkpoints_created_at "
+            "ON checkpoints (created_at);"
+        )
+        self._conn.commit()
+        self.prune()
+    
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Return a checkpoint, or the latest one of the thread.
+        
+        Args:
+            config: Config with a thread id and optionally a checkpoint id
+            
+        Returns:
+            Checkpoint tuple, or None if there is no matching checkpoint
+        """
+        configurable = {"checkpoint_ns": "", **config["configurable"]}
+        return next(self.list({"configurable": configurable}, limit=1), None)
+    
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first.
+        
+        Args:
+            config: Config selecting the thread, namespace and checkpoint
+            filter: Metadata values the checkpoints must have
+            before: Only list checkpoints older than this one
+            limit: Maximum number of checkpoints
+            
+        Yields:
+            Matching checkpoint tuples
+        """
+        clauses, params = [], []
+        if config:
+            configurable = config["configurable"]
+            clauses.append("thread_id = ?")
+            params.append(configurable["thread_id"])
+            if "checkpoint_ns" in configurable:
+                clauses.append("checkpoint_ns = ?")
+                params.append(configurable["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # A metadata filter is applied after loading, so only without one
+        # can SQLite stop at the limit
+        if limit is not None and not filter:
+            where += " ORDER BY checkpoint_id DESC LIMIT ?"
+            params.append(max(0, limit))
+        else:
+            where += " ORDER BY checkpoint_id DESC"
+        
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, "
+                "type, checkpoint, metadata_type, metadata FROM checkpoints "
+                f"{where}",
+                params
+            ).fetchall()
+        
+        for thread_id, ns, checkpoint_id, parent_id, *data in rows:
+            metadata = self.serde.loads_typed((data[2], data[3]))
+            if filter and any(
+                metadata.get(key) != value for key, value in filter.items()
+            ):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    return
+                limit -= 1
+            yield self._load(
+                thread_id, ns, checkpoint_id, parent_id,
+                self.serde.loads_typed((data[0], data[1])), metadata
+            )
+    
+    def _load(
+        self,
+        thread_id: str,
+        ns: str,
+        checkpoint_id: str,
+        parent_id: Optional[str],
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata
+    ) -> CheckpointTuple:
+        """Attach channel values and pending writes to a checkpoint."""
+        values = {}
+        with self._lock:
+            for channel, version in checkpoint["channel_versions"].items():
+                row = self._conn.execute(
+                    "SELECT type, value FROM blobs WHERE thread_id = ? AND "
+                    "checkpoint_ns = ? AND channel = ? AND version = ?",
+                    (thread_id, ns, channel, str(version))
+                ).fetchone()
+                if row is not None and row[0] != "empty":
+                    values[channel] = row
+            writes = self._conn.execute(
+                "SELECT task_id, channel, type, value FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND "
+                "checkpoint_id = ? ORDER BY task_path, task_id, idx",
+                (thread_id, ns, checkpoint_id)
+            ).fetchall()
+        
+        def config(checkpoint_id: str) -> RunnableConfig:
+            return {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": ns,
+                    "checkpoint_id": checkpoint_id
+                }
+            }
+        
+        return CheckpointTuple(
+            config=config(checkpoint_id),
+            checkpoint={
+                **checkpoint,
+                "channel_values": {
+                    channel: self.serde.loads_typed(row)
+                    for channel, row in values.items()
+                }
+            },
+            metadata=metadata,
+            parent_config=config(parent_id) if parent_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, channel, type_, value in writes
+            ]
+        )
+    
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Store a checkpoint and the channel values it changed.
+        
+        Returns:
+            Config of the stored checkpoint
+        """
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        ns = configurable.get("checkpoint_ns", "")
+        checkpoint = checkpoint.copy()
+        values = checkpoint.pop("channel_values")
+        blobs = [
+            (
+                thread_id, ns, channel, str(version),
+                *(
+                    self.serde.dumps_typed(values[channel])
+                    if channel in values else ("empty", b"")
+                )
+            )
+            for channel, version in new_versions.items()
+        ]
+        type_, data = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_data = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, ns, checkpoint["id"],
+                    configurable.get("checkpoint_id"),
+                    type_, data, metadata_type, metadata_data, time.time()
+                )
+            )
+            self._conn.commit()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": ns,
+                "checkpoint_id": checkpoint["id"]
+            }
+        }
+    
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Store the writes of a finished task before its step completes.
+        
+        This is what lets a resumed run skip parallel branches that
+        already finished when another branch failed.
+        """
+        configurable = config["configurable"]
+        rows = [
+            (
+                configurable["thread_id"],
+                configurable.get("checkpoint_ns", ""),
+                configurable["checkpoint_id"],
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self.serde.dumps_typed(value),
+                task_path
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        # Special writes (errors, interrupts) have negative indexes and
+        # replace earlier ones; regular writes keep the first attempt
+        with self._lock:
+            for verb, special in (("REPLACE", True), ("IGNORE", False)):
+                self._conn.executemany(
+                    f"INSERT OR {verb} INTO writes "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row for row in rows if (row[4] < 0) == special]
+                )
+            self._conn.commit()
+    
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete every checkpoint of a run.
+        
+        Args:
+            thread_id: Run id
+        """
+        with self._lock:
+            self._delete([thread_id])
+            self._conn.commit()
+    
+    def _delete(self, thread_ids: List[str]) -> None:
+        for table in ("checkpoints", "blobs", "writes"):
+            self._conn.executemany(
+                f"DELETE FROM {table} WHERE thread_id = ?",
+                [(thread_id,) for thread_id in thread_ids]
+            )
+    
+    def runs(self) -> List[Tuple[str, float]]:
+        """Return the stored runs, most recently checkpointed first.
+        
+        Returns:
+            List of (run id, time of its last checkpoint)
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT thread_id, MAX(created_at) AS last FROM checkpoints "
+                "GROUP BY thread_id ORDER BY last DESC"
+            ).fetchall()
+    
+    def prune(self) -> int:
+        """Delete expired runs and runs beyond ``max_runs``.
+        
+        Returns:
+            Number of runs deleted
+        """
+        cutoff = time.time() - self.ttl
+        stale = [
+            thread_id
+            for i, (thread_id, last) in enumerate(self.runs())
+            if last < cutoff or i >= self.max_runs
+        ]
+        if stale:
+            with self._lock:
+                self._delete(stale)
+                self._conn.commit()
+        return len(stale)
+    
+    # The async methods run the SQLite work in a worker thread, so
+    # checkpointing never blocks the event loop
+    
+    async def aget_tuple(
+        self,
+        config: RunnableConfig
+    ) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+    
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ):
+        items = await asyncio.to_thread(
+            lambda: list(
+                self.list(config, filter=filter, before=before, limit=limit)
+            )
+        )
+        for item in items:
+            yield item
+    
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+    
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        await asyncio.to_thread(
+            self.put_writes, config, writes, task_id, task_path
+        )
+    
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+    
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """Return a version that sorts after ``current``."""
+        if current is None:
+            version = 0
+        elif isinstance(current, int):
+            version = current
+        else:
+            version = int(current.split(".")[0])
+        return f"{version + 1:032}.{secrets.randbits(53):016}"
@@ -10,6 +10,21 @@ class Config:
     LANGCHAIN_API_KEY: str = ""  # Add your key
     LANGCHAIN_PROJECT: str = "default"
     
+    # Tracing Configuration
+    # "langsmith" sends traces to LANGCHAIN_ENDPOINT, "local" writes spans
+    # to TRACE_PATH (JSON lines if it ends in .jsonl, SQLite otherwise) from
+    # a background thread, and "off" disables tracing
+    TRACING_MODE: str = "langsmith"
+    TRACE_PATH: str = os.path.join(".cache", "traces.sqlite")
+    TRACE_SAMPLE_RATE: float = 1.0  # share of runs whose spans are recorded
+    # Share of failed spans recorded from runs that were not sampled
+    TRACE_ERROR_SAMPLE_RATE: float = 1.0
+    TRACE_MAX_FIELD_CHARS: int = 2000  # per input/output field, as JSON
+    TRACE_BATCH_SIZE: int = 200
+    TRACE_FLUSH_INTERVAL: float = 2.0  # seconds
+    TRACE_QUEUE_SIZE: int = 10000  # spans beyond this are dropped
+    TRACE_TTL: float = 7 * 24 * 60 * 60  # seconds, SQLite sink only
+    
     # OpenAI Configuration
     OPENAI_API_KEY: str = ""  # Add your key
     
@@ -17,6 +32,23 @@ class Config:
     DEFAULT_MODEL: str = "gpt-4"
     DEFAULT_TEMPERATURE: float = 0.7
     
+    # Per-node model overrides, keyed by node name. Each entry may set
+    # "model", "temperature", "max_tokens", "base_url" (any OpenAI-compatible
+    # endpoint, e.g. a local server) and "api_key". Unset keys fall back to
+    # the selected model, DEFAULT_TEMPERATURE and the OpenAI API.
+    NODE_MODELS: dict = {
+        "generate_sub_questions": {"model": "gpt-4o-mini", "max_tokens": 400},
+        "analyze_context": {},
+        "merge_analyses": {},
+        "reflect_on_analysis": {
+            "model": "gpt-4o-mini", "temperature": 0.0, "max_tokens": 200
+        },
+        "generate_report": {},
+    }
+    
+    # Print model output token by token as it is generated
+    STREAM_LLM_OUTPUT: bool = False
+    
     # Research Configuration
     DEFAULT_NUM_SUB_QUESTIONS: int = 3
     DEFAULT_MAX_ITERATIONS: int = 2
@@ -25,10 +57,165 @@ class Config:
     MIN_ITERATIONS: int = 1
     MAX_ITERATIONS: int = 5
     
+    # Async API Configuration
+    API_MAX_CONCURRENT_RUNS: int = 32  # research sessions per ResearchAgent
+    
+    # Batch Runner Configuration
+    BATCH_MAX_CONCURRENCY: int = 8  # queries run at once
+    BATCH_OUTPUT_DIR: str = "batch_output"
+    
+    # Search Configuration
+    SEARCH_BACKEND: str = "duckduckgo"  # see search_backends.available_backends()
+    SEARCH_MAX_CONCURRENCY: int = 4
+    SEARCH_MAX_RESULTS: int = 5  # per sub-question
+    
+    # Search Resilience Configuration
+    # Token buckets shared by every search in the process, per backend
+    SEARCH_RATE_LIMITS: dict = {"duckduckgo": {"rate": 1.0, "burst": 3}}
+    SEARCH_MAX_RETRIES: int = 3
+    SEARCH_RETRY_BASE_DELAY: float = 0.5  # seconds
+    SEARCH_RETRY_MAX_DELAY: float = 8.0  # seconds
+    SEARCH_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    SEARCH_CIRCUIT_RESET_TIMEOUT: float = 30.0  # seconds
+    
+    # Semantic Search Cache Configuration
+    # Off by default: a near-paraphrase can still ask something else
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_PATH: str = os.path.join(".cache", "semantic_cache.sqlite")
+    # Minimum cosine similarity; "for employers" vs "for employees" scores 0.86
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9
+    SEMANTIC_CACHE_DIM: int = 4096
+    # Word stems mapped to a shared term before questions are embedded.
+    # Generated sub-questions swap research boilerplate freely ("recent
+    # developments" vs "current trends"), which the hashed vectors cannot
+    # tell are the same. Reflection's coverage and convergence checks use
+    # the same terms. Keep the words generic: a domain word mapped here
+    # makes two different questions look alike.
+    SEMANTIC_CACHE_SYNONYMS: dict = {
+        "recent": "current", "latest": "current", "today": "current",
+        "develop": "trend", "advance": "trend",
+        "progress": "trend", "innovation": "trend",
+        "limitation": "challenge", "problem": "challenge",
+        "issue": "challenge", "obstacle": "challenge",
+        "drawback": "challenge",
+        "application": "use", "usage": "use", "case": "use",
+        "future": "outlook", "prospect": "outlook",
+        "concept": "fundamental", "principle": "fundamental",
+        "basic": "fundamental",
+        "benefit": "advantage",
+    }
+    
+    # Hedged Search Configuration
+    # Per primary backend: the secondary backend raced against it and the
+    # primary latency percentile after which the hedge request is sent,
+    # e.g. {"duckduckgo": {"secondary": "local", "percentile": 95}}
+    SEARCH_HEDGING: dict = {}
+    SEARCH_HEDGE_PERCENTILE: float = 95  # when a backend sets none
+    SEARCH_HEDGE_DEFAULT_DELAY: float = 2.0  # seconds, until enough samples
+    SEARCH_HEDGE_MIN_SAMPLES: int = 20
+    SEARCH_HEDGE_MAX_WORKERS: int = 16  # threads shared by all hedged searches
+    
+    # Page Fetch Configuration
+    FETCH_PAGES_ENABLED: bool = False
+    FETCH_TOP_K: int = 2  # pages fetched per sub-question
+    FETCH_MAX_CONCURRENCY: int = 8
+    FETCH_MAX_BYTES: int = 512 * 1024  # per page
+    FETCH_MAX_CHARS: int = 8000  # extracted text kept per page
+    FETCH_TIMEOUT: float = 10.0  # seconds per page
+    FETCH_CACHE_PATH: str = os.path.join(".cache", "page_cache.sqlite")
+    FETCH_CACHE_TTL: float = 7 * 24 * 60 * 60  # seconds
+    FETCH_CACHE_MAX_ENTRIES: int = 2000
+    
+    # Deduplication Configuration
+    DEDUP_ENABLED: bool = True
+    DEDUP_MAX_HAMMING_DISTANCE: int = 3  # of 64 SimHash bits
+    DEDUP_SHINGLE_SIZE: int = 3  # words per shingle
+    
+    # Local Corpus Backend Configuration
+    LOCAL_CORPUS_DIR: str = "corpus"
+    LOCAL_INDEX_PATH: str = os.path.join(".cache", "local_index.sqlite")
+    
+    # Search Cache Configuration
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_PATH: str = os.path.join(".cache", "search_cache.sqlite")
+    SEARCH_CACHE_TTL: float = 24 * 60 * 60  # seconds
+    SEARCH_CACHE_MAX_ENTRIES: int = 5000
+    
+    # Context Packing Configuration
+    # Search results in the analysis prompt are cut to fit
+    # min(CONTEXT_MAX_TOKENS, context window - CONTEXT_RESERVED_TOKENS)
+    CONTEXT_PACKING_ENABLED: bool = True
+    CONTEXT_MAX_TOKENS: int = 6000
+    CONTEXT_RESERVED_TOKENS: int = 2500  # instructions and model output
+    DEFAULT_CONTEXT_WINDOW: int = 8192
+    MODEL_CONTEXT_WINDOWS: dict = {
+        "gpt-4": 8192,
+        "gpt-4-turbo": 128000,
+        "gpt-4o": 128000,
+        "gpt-4o-mini": 128000,
+        "gpt-3.5-turbo": 16385,
+    }
+    
+    # Reflection Configuration
+    # "llm" always asks the model; other strategies (see
+    # reflection.available_strategies()) score the analysis locally
+    REFLECTION_STRATEGY: str = "local"
+    REFLECTION_LLM_FALLBACK: bool = True  # ask the model when unsure
+    REFLECTION_COVERAGE_COMPLETE: float = 0.8  # mean sub-question coverage
+    REFLECTION_COVERAGE_INCOMPLETE: float = 0.5
+    REFLECTION_CONVERGENCE_THRESHOLD: float = 0.9  # cosine similarity
+    REFLECTION_MAX_GAPS: int = 3  # follow-up searches per iteration
+    # Generate the report while the model reflects; kept only if the
+    # reflection finds no gaps, so a rejected analysis wastes the tokens
+    SPECULATIVE_REPORT: bool = False
+    
+    # Analysis Configuration
+    # "single" analyzes all sub-questions in one prompt; "map_reduce"
+    # analyzes each sub-question in parallel and merges the results;
+    # "pipelined" also starts each analysis as soon as its search returns
+    ANALYSIS_MODE: str = "single"
+    ANALYSIS_MAX_CONCURRENCY: int = 4  # parallel branches per run
+    
+    # Metrics Configuration
+    METRICS_NAMESPACE: str = "deep_research"  # prefix of exported names
+    # USD per million (input, output) tokens, used for cost estimates
+    MODEL_PRICES: dict = {
+        "gpt-4": (30.0, 60.0),
+        "gpt-4-turbo": (10.0, 30.0),
+        "gpt-4o": (2.5, 10.0),
+        "gpt-4o-mini": (0.15, 0.6),
+        "gpt-3.5-turbo": (0.5, 1.5)
+    }
+    
+    # Checkpoint Configuration
+    # Every node's output is saved so failed runs can be resumed
+    CHECKPOINT_ENABLED: bool = True
+    CHECKPOINT_PATH: str = os.path.join(".cache", "checkpoints.sqlite")
+    CHECKPOINT_TTL: float = 7 * 24 * 60 * 60  # seconds after the last checkpoint
+    CHECKPOINT_MAX_RUNS: int = 200
+    CHECKPOINT_COMPRESS_MIN_BYTES: int = 512
+    CHECKPOINT_COMPRESS_LEVEL: int = 3
+    
+    # LLM Response Cache Configuration
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = os.path.join(".cache", "llm_cache.sqlite")
+    LLM_CACHE_TTL: float = 30 * 24 * 60 * 60  # seconds
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Nodes that always call the model, e.g. to keep sampling at temperature > 0
+    LLM_CACHE_SKIP_NODES: tuple = ()
+    
     @classmethod
     def setup_environment(cls) -> None:
-        """Set up environment variables for LangSmith tracing."""
-        os.environ["LANGCHAIN_TRACING_V2"] = cls.LANGCHAIN_TRACING_V2
+        """Set up environment variables for LangSmith tracing.
+        
+        LangSmith tracing is only turned on when ``TRACING_MODE`` is
+        "langsmith"; ``tracing.configure_tracing`` sets up the other modes.
+        """
+        os.environ["LANGCHAIN_TRACING_V2"] = (
+            cls.LANGCHAIN_TRACING_V2
+            if cls.TRACING_MODE == "langsmith" else "false"
+        )
         os.environ["LANGCHAIN_ENDPOINT"] = cls.LANGCHAIN_ENDPOINT
         os.environ["LANGCHAIN_API_KEY"] = cls.LANGCHAIN_API_KEY
         os.environ["LANGCHAIN_PROJECT"] = cls.LANGCHAIN_PROJECT
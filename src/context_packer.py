@@ -0,0 +1,200 @@
+"""
+Token-budgeted packing of search hits into the analysis prompt context.
+"""
+
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from .config import Config
+from .local_index import tokenize
+from .models import SearchHit
+from .prompts import Prompts
+from .tokens import count_tokens, truncate_tokens
+
+# Truncated hits shorter than this are dropped instead
+MIN_HIT_TOKENS = 32
+
+
+def context_budget(model: str) -> int:
+    """Return the search-context token budget for a model.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        Tokens available for search results in the analysis prompt
+    """
+    window = Config.MODEL_CONTEXT_WINDOWS.get(model)
+    if window is None:
+        # Dated or suffixed names, e.g. "gpt-4o-2024-08-06"
+        prefixes = [
+            name for name in Config.MODEL_CONTEXT_WINDOWS
+            if model.startswith(name)
+        ]
+        window = (
+            Config.MODEL_CONTEXT_WINDOWS[max(prefixes, key=len)]
+            if prefixes else Config.DEFAULT_CONTEXT_WINDOW
+        )
+    return max(0, min(
+        Config.CONTEXT_MAX_TOKENS, window - Config.CONTEXT_RESERVED_TOKENS
+    ))
+
+
+def fair_shares(demands: List[int], budget: int) -> List[int]:
+    """Split a budget across demands by max-min fairness.
+    
+    Every demand gets an equal share; whatever a small demand does not
+    need is redistributed among the larger ones.
+    
+    Args:
+        demands: Tokens wanted by each party
+        budget: Tokens available
+        
+    Returns:
+        Tokens allocated to each party, in input order
+    """
+    shares = [0] * len(demands)
+    pending = sorted(range(len(demands)), key=lambda i: demands[i])
+    remaining = budget
+    while pending:
+        share = remaining // len(pending)
+        index = pending[0]
+        if demands[index] <= share:
+            shares[index] = demands[index]
+            remaining -= demands[index]
+            pending.pop(0)
+            continue
+        for index in pending:
+            shares[index] = share
+        break
+    return shares
+
+
+def relevance(question: str, hit: SearchHit) -> float:
+    """Score how well a hit matches its sub-question.
+    
+    Args:
+        question: Sub-question text
+        hit: Search hit
+        
+    Returns:
+        Fraction of the question's terms found in the hit
+    """
+    terms = set(tokenize(question))
+    if not terms:
+        return 0.0
+    words = set(tokenize(f"{hit.title} {hit.content or hit.snippet}"))
+    return len(terms & words) / len(terms)
+
+
+class ContextPacker:
+    """Fits search hits into a fixed token budget for the analysis prompt."""
+    
+    def __init__(self, model: str, budget: Optional[int] = None):
+        """Initialize the packer.
+        
+        Args:
+            model: Name of the analysis model, used for token counting
+            budget: Token budget, defaults to ``context_budget(model)``
+        """
+        self.model = model
+        self.budget = context_budget(model) if budget is None else budget
+    
+    def pack(
+        self,
+        sub_questions: List[str],
+        hits: List[SearchHit]
+    ) -> Tuple[str, dict]:
+        """Render hits as prompt context within the token budget.
+        
+        The budget is shared fairly across sub-questions. Within each
+        sub-question hits are taken in order of relevance; the first hit
+        that does not fit is truncated and the rest are dropped.
+        
+        Args:
+            sub_questions: The research sub-questions
+            hits: Search hits in question order
+            
+        Returns:
+            Tuple of (context string, token report)
+        """
+        grouped: Dict[int, List[SearchHit]] = {}
+        for hit in hits:
+            grouped.setdefault(hit.question_id, []).append(hit)
+        
+        question_ids = list(grouped)
+        headers = {
+            question_id: self._count(
+                f"Question: {sub_questions[question_id]}\n\nResults:\n\n\n"
+            )
+            for question_id in question_ids
+        }
+        costs = {
+            question_id: [
+                self._count(self._line(hit)) for hit in grouped[question_id]
+            ]
+            for question_id in question_ids
+        }
+        demands = [
+            headers[question_id] + sum(costs[question_id])
+            for question_id in question_ids
+        ]
+        shares = fair_shares(demands, self.budget)
+        
+        packed = []
+        questions = []
+        for question_id, demand, share in zip(question_ids, demands, shares):
+            question = sub_questions[question_id]
+            ranked = sorted(
+                zip(grouped[question_id], costs[question_id]),
+                key=lambda pair: relevance(question, pair[0]),
+                reverse=True
+            )
+            remaining = share - headers[question_id]
+            kept = []
+            truncated = 0
+            for hit, cost in ranked:
+                if cost <= remaining:
+                    kept.append(hit)
+                    remaining -= cost
+                    continue
+                text_budget = remaining - (cost - self._count(self._text(hit)))
+                if text_budget >= MIN_HIT_TOKENS:
+                    text = truncate_tokens(
+                        self._text(hit), text_budget, self.model
+                    )
+                    kept.append(replace(hit, snippet=text, content=""))
+                    truncated += 1
+                break
+            
+            packed.extend(kept)
+            questions.append({
+                "question": question,
+                "demand": demand,
+                "allocated": share,
+                "hits": len(ranked),
+                "kept": len(kept),
+                "truncated": truncated
+            })
+        
+        context = Prompts.format_search_results(sub_questions, packed)
+        used = self._count(context)
+        report = {
+            "model": self.model,
+            "budget": self.budget,
+            "demand": sum(demands),
+            "used": used,
+            "questions": questions
+        }
+        return context, report
+    
+    def _count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+    
+    @staticmethod
+    def _text(hit: SearchHit) -> str:
+        return hit.content or hit.snippet
+    
+    @classmethod
+    def _line(cls, hit: SearchHit) -> str:
+        return f"- {hit.title} ({hit.url}): {cls._text(hit)}\n"
@@ -0,0 +1,144 @@
+"""
+Near-duplicate removal for search results using shingled SimHash.
+"""
+
+import hashlib
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+from .models import SearchHit
+from .utils import estimate_tokens
+
+_BIT_POSITIONS = np.arange(64, dtype=np.uint64)
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """Return the word n-gram shingles of a passage.
+    
+    Args:
+        text: Passage text
+        size: Number of words per shingle
+        
+    Returns:
+        List of shingles (the whole passage if it is shorter than ``size``)
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(passages: List[str], shingle_size: int = 3) -> np.ndarray:
+    """Compute 64-bit SimHash fingerprints for a batch of passages.
+    
+    All shingles are hashed once, then bit votes are accumulated per
+    passage in a single vectorized pass.
+    
+    Args:
+        passages: Passages to fingerprint
+        shingle_size: Number of words per shingle
+        
+    Returns:
+        Array of ``uint64`` fingerprints, one per passage
+    """
+    if not passages:
+        return np.zeros(0, dtype=np.uint64)
+    
+    all_shingles = []
+    owners = []
+    for i, passage in enumerate(passages):
+        passage_shingles = shingles(passage, shingle_size)
+        all_shingles.extend(passage_shingles)
+        owners.extend([i] * len(passage_shingles))
+    
+    digests = b"".join(
+        hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest()
+        for s in all_shingles
+    )
+    hashes = np.frombuffer(digests, dtype="<u8")
+    
+    # +1 for each set bit, -1 for each clear bit, summed per passage
+    bits = ((hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)).astype(np.int32)
+    votes = np.zeros((len(passages), 64), dtype=np.int32)
+    np.add.at(votes, np.asarray(owners), 2 * bits - 1)
+    
+    return ((votes > 0).astype(np.uint64) << _BIT_POSITIONS).sum(
+        axis=1, dtype=np.uint64
+    )
+
+
+def hamming_distances(fingerprint: np.uint64, others: np.ndarray) -> np.ndarray:
+    """Return the Hamming distance from one fingerprint to many.
+    
+    Args:
+        fingerprint: Reference fingerprint
+        others: Array of fingerprints to compare against
+        
+    Returns:
+        Array of bit distances
+    """
+    xor = np.bitwise_xor(others, fingerprint)
+    return np.unpackbits(xor.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+
+def deduplicate_results(
+    hits: List[SearchHit],
+    max_distance: int = 3,
+    shingle_size: int = 3,
+    min_shingles: int = 2
+) -> Tuple[List[SearchHit], dict]:
+    """Drop hits whose text near-duplicates an earlier hit's text.
+    
+    A hit's text is its fetched page content, or its snippet if the page
+    was not fetched. Hits are compared across all sub-questions in
+    order, so the first occurrence is kept and later repeats are
+    removed. Texts too short to give ``min_shingles`` shingles are
+    always kept, since their fingerprints say little about the content.
+    
+    Args:
+        hits: Search hits in question order
+        max_distance: Maximum SimHash Hamming distance treated as duplicate
+        shingle_size: Number of words per shingle
+        min_shingles: Fewest shingles a text needs to be compared
+        
+    Returns:
+        Tuple of (deduplicated hits, statistics dictionary)
+    """
+    texts = [hit.content or hit.snippet for hit in hits]
+    comparable = [
+        len(re.findall(r"\w+", text)) - shingle_size + 1 >= min_shingles
+        for text in texts
+    ]
+    fingerprints = simhash(
+        [text for text, ok in zip(texts, comparable) if ok], shingle_size
+    )
+    
+    kept_fingerprints = np.zeros(len(fingerprints), dtype=np.uint64)
+    compared = 0
+    kept = []
+    removed_text = []
+    next_fingerprint = iter(fingerprints)
+    for hit, text, ok in zip(hits, texts, comparable):
+        if not ok:
+            kept.append(hit)
+            continue
+        fingerprint = next(next_fingerprint)
+        if compared and hamming_distances(
+            fingerprint, kept_fingerprints[:compared]
+        ).min() <= max_distance:
+            removed_text.append(f"{hit.title} {hit.url} {text}")
+            continue
+        kept_fingerprints[compared] = fingerprint
+        compared += 1
+        kept.append(hit)
+    
+    removed = "\n".join(removed_text)
+    stats = {
+        "hits": len(hits),
+        "removed": len(removed_text),
+        "bytes_saved": len(removed.encode("utf-8")),
+        "tokens_saved": estimate_tokens(removed)
+    }
+    return kept, stats
@@ -0,0 +1,377 @@
+"""
+Concurrent page fetching and HTML-to-text extraction for top search hits.
+"""
+
+import asyncio
+import codecs
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+import httpx
+
+from .cache import PageCache
+from .config import Config
+from .models import SearchHit
+from .utils import print_section_header, print_progress, truncate_text
+
+SKIPPED_TAGS = frozenset(
+    {"script", "style", "noscript", "svg", "nav", "footer", "header", "form"}
+)
+BLOCK_TAGS = frozenset(
+    {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+     "section", "article", "blockquote", "pre", "table"}
+)
+
+
+class TextExtractor(HTMLParser):
+    """Incremental HTML parser that keeps readable text only."""
+    
+    def __init__(self, max_chars: int):
+        """Initialize the parser.
+        
+        Args:
+            max_chars: Stop collecting once this much text was extracted
+        """
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self._parts: List[str] = []
+        self._length = 0
+        self._skip_depth = 0
+    
+    @property
+    def full(self) -> bool:
+        return self._length >= self.max_chars
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+    
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+    
+    def handle_data(self, data):
+        if self._skip_depth or self.full:
+            return
+        text = " ".join(data.split())
+        if text:
+            self._parts.append(text + " ")
+            self._length += len(text) + 1
+    
+    def text(self) -> str:
+        """Return the extracted text with blank lines collapsed."""
+        lines = "".join(self._parts).split("\n")
+        lines = (" ".join(line.split()) for line in lines)
+        return "\n".join(line for line in lines if line)[:self.max_chars]
+
+
+class PageReader:
+    """Feeds a streamed response body into a ``TextExtractor``."""
+    
+    def __init__(self, encoding: Optional[str], max_bytes: int, max_chars: int):
+        """Initialize the reader.
+        
+        Args:
+            encoding: Response charset, or None for UTF-8
+            max_bytes: Maximum bytes read from the response
+            max_chars: Maximum characters of text kept
+        """
+        try:
+            decoder_class = codecs.getincrementaldecoder(encoding or "utf-8")
+        except LookupError:
+            decoder_class = codecs.getincrementaldecoder("utf-8")
+        self.decoder = decoder_class(errors="replace")
+        self.extractor = TextExtractor(max_chars)
+        self.max_bytes = max_bytes
+        self.received = 0
+        # Set when the fetch deadline cut the body short
+        self.truncated = False
+    
+    def feed(self, chunk: bytes) -> bool:
+        """Parse a chunk of the body.
+        
+        Args:
+            chunk: Raw bytes
+            
+        Returns:
+            Whether reading can stop
+        """
+        chunk = chunk[:self.max_bytes - self.received]
+        self.received += len(chunk)
+        self.extractor.feed(self.decoder.decode(chunk))
+        return self.received >= self.max_bytes or self.extractor.full
+    
+    def text(self) -> str:
+        self.extractor.feed(self.decoder.decode(b"", final=True))
+        return self.extractor.text()
+
+
+class PageFetcher:
+    """Fetches pages over a pooled HTTP client and extracts their text."""
+    
+    def __init__(
+        self,
+        max_concurrency: int = Config.FETCH_MAX_CONCURRENCY,
+        max_bytes: int = Config.FETCH_MAX_BYTES,
+        max_chars: int = Config.FETCH_MAX_CHARS,
+        timeout: float = Config.FETCH_TIMEOUT,
+        cache: Optional[PageCache] = None
+    ):
+        """Initialize the fetcher.
+        
+        Args:
+            max_concurrency: Maximum pages downloaded at once
+            max_bytes: Maximum bytes read from one response
+            max_chars: Maximum characters of text kept per page
+            timeout: Maximum seconds spent on one page
+            cache: Cache of extracted page text, or None to always fetch
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.cache = cache
+        self.client = httpx.Client(**self._client_options())
+    
+    def _client_options(self) -> dict:
+        return {
+            "follow_redirects": True,
+            "timeout": self.timeout,
+            "limits": httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            ),
+            "headers": {"User-Agent": "DeepResearchAgent/1.0"}
+        }
+    
+    def fetch(self, url: str) -> Optional[str]:
+        """Download a page and return its text.
+        
+        Reading stops at ``max_bytes``, ``timeout`` or once ``max_chars``
+        of text were extracted, whichever comes first. Pages cut short
+        by the timeout are not cached, so a later fetch can read them
+        in full.
+        
+        Args:
+            url: Page URL
+            
+        Returns:
+            Extracted text, or None for non-HTML/text responses
+            
+        Raises:
+            httpx.HTTPError: If the request failed
+        """
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+        
+        deadline = time.monotonic() + self.timeout
+        with self.client.stream("GET", url) as response:
+            reader = self._reader(response)
+            if reader is None:
+                return None
+            for chunk in response.iter_bytes():
+                if reader.feed(chunk):
+                    break
+                if time.monotonic() > deadline:
+                    reader.truncated = True
+                    break
+        return self._finish(url, reader)
+    
+    async def afetch(
+        self,
+        url: str,
+        client: httpx.AsyncClient
+    ) -> Optional[str]:
+        """Async version of ``fetch``.
+        
+        Cache reads and writes run in a worker thread.
+        
+        Args:
+            url: Page URL
+            client: Async HTTP client to download with
+            
+        Returns:
+            Extracted text, or None for non-HTML/text responses
+            
+        Raises:
+            httpx.HTTPError: If the request failed
+        """
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, url)
+            if cached is not None:
+                return cached
+        
+        deadline = time.monotonic() + self.timeout
+        async with client.stream("GET", url) as response:
+            reader = self._reader(response)
+            if reader is None:
+                return None
+            async for chunk in response.aiter_bytes():
+                if reader.feed(chunk):
+                    break
+                if time.monotonic() > deadline:
+                    reader.truncated = True
+                    break
+        return await asyncio.to_thread(self._finish, url, reader)
+    
+    def _reader(self, response: httpx.Response) -> Optional[PageReader]:
+        """Check the response and return a reader for its body.
+        
+        Returns:
+            Reader, or None if the response is not HTML or text
+            
+        Raises:
+            httpx.HTTPStatusError: If the response status is an error
+        """
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type and "text" not in content_type:
+            return None
+        return PageReader(
+            response.charset_encoding, self.max_bytes, self.max_chars
+        )
+    
+    def _finish(self, url: str, reader: PageReader) -> str:
+        text = reader.text()
+        if self.cache is not None and not reader.truncated:
+            self.cache.set(url, text)
+        return text
+    
+    def fetch_for_hits(self, hits: List[SearchHit], top_k: int) -> int:
+        """Fetch the top-k pages per sub-question into ``hit.content``.
+        
+        Each distinct URL is downloaded once even if several sub-questions
+        returned it. Non-HTTP URLs (e.g. local corpus files) are not
+        fetched, and non-HTML/text responses are skipped.
+        
+        Args:
+            hits: Search hits in question order, updated in place
+            top_k: Number of pages fetched per sub-question
+            
+        Returns:
+            Number of pages fetched successfully
+        """
+        targets = self._select_targets(hits, top_k)
+        
+        fetched = skipped = 0
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {executor.submit(self.fetch, url): url for url in targets}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    text = future.result()
+                except (httpx.HTTPError, httpx.InvalidURL) as e:
+                    self._print_failed(url, e)
+                    continue
+                if text is None:
+                    self._print_skipped(url)
+                    skipped += 1
+                    continue
+                self._attach(targets, url, text)
+                fetched += 1
+        
+        self._print_summary(fetched, skipped, len(targets))
+        return fetched
+    
+    async def afetch_for_hits(self, hits: List[SearchHit], top_k: int) -> int:
+        """Async version of ``fetch_for_hits``.
+        
+        Pages are downloaded over an async client opened for the call.
+        
+        Args:
+            hits: Search hits in question order, updated in place
+            top_k: Number of pages fetched per sub-question
+            
+        Returns:
+            Number of pages fetched successfully
+        """
+        targets = self._select_targets(hits, top_k)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        fetched = skipped = 0
+        async with httpx.AsyncClient(**self._client_options()) as client:
+            async def fetch_one(url: str):
+                async with semaphore:
+                    try:
+                        return url, await self.afetch(url, client), None
+                    except (httpx.HTTPError, httpx.InvalidURL) as e:
+                        return url, None, e
+            
+            for next_done in asyncio.as_completed(
+                [fetch_one(url) for url in targets]
+            ):
+                url, text, error = await next_done
+                if error is not None:
+                    self._print_failed(url, error)
+                    continue
+                if text is None:
+                    self._print_skipped(url)
+                    skipped += 1
+                    continue
+                self._attach(targets, url, text)
+                fetched += 1
+        
+        self._print_summary(fetched, skipped, len(targets))
+        return fetched
+    
+    def _select_targets(
+        self,
+        hits: List[SearchHit],
+        top_k: int
+    ) -> Dict[str, List[SearchHit]]:
+        """Pick the URLs to fetch and print the stage header.
+        
+        Returns:
+            Hits to update, keyed by distinct URL
+        """
+        per_question: Dict[int, int] = {}
+        targets: Dict[str, List[SearchHit]] = {}
+        for hit in hits:
+            if not hit.url.startswith(("http://", "https://")):
+                continue
+            if per_question.get(hit.question_id, 0) >= top_k:
+                continue
+            per_question[hit.question_id] = (
+                per_question.get(hit.question_id, 0) + 1
+            )
+            targets.setdefault(hit.url, []).append(hit)
+        
+        print_section_header("🌐 FETCHING PAGES...")
+        print_progress(
+            f"Fetching {len(targets)} pages ({self.max_concurrency} concurrent)"
+        )
+        return targets
+    
+    @staticmethod
+    def _attach(
+        targets: Dict[str, List[SearchHit]],
+        url: str,
+        text: str
+    ) -> None:
+        for hit in targets[url]:
+            hit.content = text
+        print_progress(f"✓ {truncate_text(url, 50)} ({len(text)} chars)")
+    
+    @staticmethod
+    def _print_failed(url: str, error: Exception) -> None:
+        print_progress(f"✗ {truncate_text(url, 50)}: {type(error).__name__}")
+    
+    @staticmethod
+    def _print_skipped(url: str) -> None:
+        print_progress(f"- {truncate_text(url, 50)}: not HTML or text")
+    
+    @staticmethod
+    def _print_summary(fetched: int, skipped: int, total: int) -> None:
+        note = f", {skipped} skipped" if skipped else ""
+        print(f"\n✅ Fetched {fetched}/{total} pages{note}")
+    
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,179 @@
+"""
+Hedged search requests across a primary and a secondary backend.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Tuple
+
+from .config import Config
+from .resilience import SearchError, get_guard
+from .search_backends import RawResult, SearchBackend
+
+
+class HedgedSearch:
+    """Sends a query to a secondary backend when the primary is slow.
+    
+    The hedge is sent once the primary has been outstanding for longer
+    than a percentile of its recent latencies, and whichever backend
+    answers first wins. A primary that fails before the delay falls back
+    to the secondary immediately. Losing requests are cancelled if they
+    have not started yet; a request already running in a worker thread
+    is left to finish and its result is discarded. Worker threads come
+    from one process-wide pool, so hedged searches need no teardown.
+    """
+    
+    def __init__(
+        self,
+        primary: SearchBackend,
+        secondary: SearchBackend,
+        percentile: float = Config.SEARCH_HEDGE_PERCENTILE,
+        default_delay: float = Config.SEARCH_HEDGE_DEFAULT_DELAY,
+        min_samples: int = Config.SEARCH_HEDGE_MIN_SAMPLES
+    ):
+        """Initialize the hedged search.
+        
+        Args:
+            primary: Backend queried first
+            secondary: Backend raced against a slow primary
+            percentile: Primary latency percentile used as the hedge delay
+            default_delay: Hedge delay until ``min_samples`` are recorded
+            min_samples: Primary latencies needed before using the percentile
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.primary_guard = get_guard(primary.name)
+        self.secondary_guard = get_guard(secondary.name)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "hedged": 0, "secondary_wins": 0}
+    
+    def hedge_delay(self) -> float:
+        """Return how long to wait for the primary before hedging."""
+        latency = self.primary_guard.latency
+        if len(latency) < self.min_samples:
+            return self.default_delay
+        return latency.percentile(self.percentile)
+    
+    def run(self, query: str) -> Tuple[List[RawResult], SearchBackend]:
+        """Search with hedging.
+        
+        Args:
+            query: The search query
+            
+        Returns:
+            Tuple of (results, backend that produced them)
+            
+        Raises:
+            SearchError: If both backends failed
+        """
+        self._count("requests")
+        primary = _executor().submit(
+            self.primary_guard.call, lambda: self.primary.run(query)
+        )
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done and primary.exception() is None:
+            return primary.result(), self.primary
+        
+        self._count("hedged")
+        secondary = _executor().submit(
+            self.secondary_guard.call, lambda: self.secondary.run(query)
+        )
+        backends = {primary: self.primary, secondary: self.secondary}
+        pending = {primary, secondary}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                if future is secondary:
+                    self._count("secondary_wins")
+                return future.result(), backends[future]
+        
+        raise error if isinstance(error, SearchError) else SearchError(str(error))
+    
+    async def arun(self, query: str) -> Tuple[List[RawResult], SearchBackend]:
+        """Search with hedging on the running event loop.
+        
+        Unlike ``run``, the losing request is cancelled even if it has
+        already started.
+        
+        Args:
+            query: The search query
+            
+        Returns:
+            Tuple of (results, backend that produced them)
+            
+        Raises:
+            SearchError: If both backends failed
+        """
+        self._count("requests")
+        primary = asyncio.ensure_future(
+            self.primary_guard.acall(lambda: self.primary.arun(query))
+        )
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait([primary], timeout=self.hedge_delay())
+            if done and primary.exception() is None:
+                return primary.result(), self.primary
+            
+            self._count("hedged")
+            secondary = asyncio.ensure_future(
+                self.secondary_guard.acall(lambda: self.secondary.arun(query))
+            )
+            tasks.append(secondary)
+            backends = {primary: self.primary, secondary: self.secondary}
+            pending = {primary, secondary}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    if task is secondary:
+                        self._count("secondary_wins")
+                    return task.result(), backends[task]
+            
+            raise (
+                error if isinstance(error, SearchError)
+                else SearchError(str(error))
+            )
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Return the worker pool shared by all hedged searches.
+    
+    Every search tool gets its own ``HedgedSearch``, and callers such as
+    ``ResearchAgent.research_many`` and the batch runner build a tool per
+    workflow, so a pool per instance would leave idle threads behind.
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=Config.SEARCH_HEDGE_MAX_WORKERS,
+                thread_name_prefix="hedge"
+            )
+        return _EXECUTOR
@@ -0,0 +1,122 @@
+"""
+Persistent cache of chat model responses.
+"""
+
+import hashlib
+import json
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from .cache import SQLiteCache
+from .config import Config
+
+
+def make_key(
+    model: str,
+    params: dict,
+    messages: List[BaseMessage],
+    namespace: str = ""
+) -> str:
+    """Return the cache key of a chat model call.
+    
+    Args:
+        model: Model name
+        params: Sampling parameters, e.g. temperature and max tokens
+        messages: Prompt messages
+        namespace: Caller name, e.g. the workflow node
+        
+    Returns:
+        Hex SHA-256 digest of the serialized call
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "params": params,
+            "messages": [
+                {"type": message.type, "content": message.content}
+                for message in messages
+            ],
+            "namespace": namespace
+        },
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache(SQLiteCache):
+    """Chat model responses keyed by model, parameters and messages."""
+    
+    def __init__(
+        self,
+        path: str = Config.LLM_CACHE_PATH,
+        ttl: float = Config.LLM_CACHE_TTL,
+        max_entries: int = Config.LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = Config.LLM_CACHE_MAX_BYTES
+    ):
+        """Open the LLM cache.
+        
+        Args:
+            path: Path to the SQLite database file
+            ttl: Time-to-live for cached responses in seconds
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached responses
+        """
+        super().__init__(
+            path, ttl, max_entries, table="llm_responses", max_bytes=max_bytes
+        )
+    
+    def get(
+        self,
+        model: str,
+        params: dict,
+        messages: List[BaseMessage],
+        namespace: str = ""
+    ) -> Optional[AIMessage]:
+        """Look up the response to a call.
+        
+        Args:
+            model: Model name
+            params: Sampling parameters, e.g. temperature and max tokens
+            messages: Prompt messages
+            namespace: Caller name, e.g. the workflow node
+            
+        Returns:
+            Cached response if present and fresh
+        """
+        value = super().get(make_key(model, params, messages, namespace))
+        if value is None:
+            return None
+        record = json.loads(value)
+        return AIMessage(
+            content=record["content"],
+            usage_metadata=record.get("usage_metadata"),
+            response_metadata={"cached": True}
+        )
+    
+    def set(
+        self,
+        model: str,
+        params: dict,
+        messages: List[BaseMessage],
+        response: BaseMessage,
+        namespace: str = ""
+    ) -> None:
+        """Store the response to a call.
+        
+        Args:
+            model: Model name
+            params: Sampling parameters, e.g. temperature and max tokens
+            messages: Prompt messages
+            response: Model response
+            namespace: Caller name, e.g. the workflow node
+        """
+        record = {"content": response.content}
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            record["usage_metadata"] = dict(usage)
+        super().set(
+            make_key(model, params, messages, namespace),
+            json.dumps(record, separators=(",", ":"))
+        )
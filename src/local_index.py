@@ -0,0 +1,240 @@
+"""
+On-disk BM25 inverted index over a folder of local text documents.
+"""
+
+import heapq
+import math
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or "
+    "that the this to was were what when where which who why will with".split()
+)
+
+INDEXED_EXTENSIONS = (".txt", ".md", ".markdown", ".rst")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens without stopwords.
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        List of tokens
+    """
+    return [
+        token for token in re.findall(r"\w+", text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+def split_passages(text: str, max_chars: int = 800) -> List[str]:
+    """Split a document into paragraph-aligned passages.
+    
+    Args:
+        text: Document text
+        max_chars: Soft upper bound on passage length
+        
+    Returns:
+        List of passages
+    """
+    passages = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) > max_chars:
+            passages.append(current)
+            current = paragraph
+        else:
+            current = f"{current} {paragraph}".strip()
+    if current:
+        passages.append(current)
+    return passages
+
+
+class LocalCorpusIndex:
+    """BM25-scored inverted index of passages stored in SQLite."""
+    
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        """Open (or create) the index database.
+        
+        Args:
+            path: Path to the SQLite index file
+            k1: BM25 term frequency saturation parameter
+            b: BM25 length normalization parameter
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS passages (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                text TEXT NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                passage_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS passages_path ON passages (path);
+            CREATE INDEX IF NOT EXISTS postings_term ON postings (term);
+            CREATE INDEX IF NOT EXISTS postings_passage ON postings (passage_id);
+            """
+        )
+        self._conn.commit()
+        self._load_stats()
+    
+    def update(self, corpus_dir: str) -> Dict[str, int]:
+        """Incrementally index a folder.
+        
+        Only files whose size or modification time changed since the last
+        update are re-read; files removed from disk are dropped.
+        
+        Args:
+            corpus_dir: Folder containing text or markdown documents
+            
+        Returns:
+            Counts of added, updated and removed files
+        """
+        on_disk = {}
+        for root, _, files in os.walk(corpus_dir):
+            for name in files:
+                if name.lower().endswith(INDEXED_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    on_disk[path] = (stat.st_mtime, stat.st_size)
+        
+        counts = {"added": 0, "updated": 0, "removed": 0}
+        with self._lock:
+            indexed = {
+                path: (mtime, size)
+                for path, mtime, size in self._conn.execute(
+                    "SELECT path, mtime, size FROM files"
+                )
+            }
+            
+            for path in indexed.keys() - on_disk.keys():
+                self._remove_file(path)
+                counts["removed"] += 1
+            
+            for path, signature in on_disk.items():
+                if indexed.get(path) == signature:
+                    continue
+                if path in indexed:
+                    self._remove_file(path)
+                    counts["updated"] += 1
+                else:
+                    counts["added"] += 1
+                self._add_file(path, *signature)
+            
+            self._conn.commit()
+            self._load_stats()
+        return counts
+    
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[float, str, str]]:
+        """Return the best matching passages for a query.
+        
+        Args:
+            query: Search query
+            top_k: Maximum number of passages to return
+            
+        Returns:
+            List of (score, path, passage) tuples, best first
+        """
+        terms = set(tokenize(query))
+        if not terms or not self._num_passages:
+            return []
+        
+        scores: Dict[int, float] = {}
+        with self._lock:
+            for term in terms:
+                rows = self._conn.execute(
+                    "SELECT p.passage_id, p.tf, s.length "
+                    "FROM postings p JOIN passages s ON s.id = p.passage_id "
+                    "WHERE p.term = ?",
+                    (term,)
+                ).fetchall()
+                if not rows:
+                    continue
+                
+                df = len(rows)
+                idf = math.log(1 + (self._num_passages - df + 0.5) / (df + 0.5))
+                for passage_id, tf, length in rows:
+                    norm = self.k1 * (
+                        1 - self.b + self.b * length / self._avg_length
+                    )
+                    scores[passage_id] = scores.get(passage_id, 0.0) + (
+                        idf * tf * (self.k1 + 1) / (tf + norm)
+                    )
+            
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            results = []
+            for passage_id, score in best:
+                path, text = self._conn.execute(
+                    "SELECT path, text FROM passages WHERE id = ?",
+                    (passage_id,)
+                ).fetchone()
+                results.append((score, path, text))
+        return results
+    
+    def _add_file(self, path: str, mtime: float, size: int) -> None:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+        
+        self._conn.execute(
+            "INSERT INTO files (path, mtime, size) VALUES (?, ?, ?)",
+            (path, mtime, size)
+        )
+        for passage in split_passages(text):
+            tokens = tokenize(passage)
+            if not tokens:
+                continue
+            cursor = self._conn.execute(
+                "INSERT INTO passages (path, text, length) VALUES (?, ?, ?)",
+                (path, passage, len(tokens))
+            )
+            frequencies: Dict[str, int] = {}
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + 1
+            self._conn.executemany(
+                "INSERT INTO postings (term, passage_id, tf) VALUES (?, ?, ?)",
+                [(term, cursor.lastrowid, tf) for term, tf in frequencies.items()]
+            )
+    
+    def _remove_file(self, path: str) -> None:
+        self._conn.execute(
+            "DELETE FROM postings WHERE passage_id IN "
+            "(SELECT id FROM passages WHERE path = ?)",
+            (path,)
+        )
+        self._conn.execute("DELETE FROM passages WHERE path = ?", (path,))
+        self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+    
+    def _load_stats(self) -> None:
+        count, avg_length = self._conn.execute(
+            "SELECT COUNT(*), AVG(length) FROM passages"
+        ).fetchone()
+        self._num_passages = count
+        self._avg_length = avg_length or 1.0
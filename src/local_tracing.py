@@ -0,0 +1,315 @@
+"""
+Local span sink for the "local" tracing mode.
+
+A ``LocalTracer`` callback handler receives every graph, node and model
+run. It samples whole runs, and a background thread caps each input and
+output field and writes the spans in batches to a JSON lines file or a
+SQLite database, so nothing is serialized or written while a node runs.
+Selected through ``tracing.configure_tracing``, which imports this
+module only when local tracing is turned on.
+"""
+
+import dataclasses
+import json
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from langchain_core.tracers.base import BaseTracer
+from langchain_core.tracers.schemas import Run
+
+from .config import Config
+
+# Tag LangGraph puts on its internal runnables, e.g. channel writes
+_HIDDEN_TAG = "langsmith:hidden"
+
+# Queue item that stops the writer thread
+_STOP = object()
+
+
+class JSONLSink:
+    """Appends spans to a JSON lines file."""
+    
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+    
+    def write(self, spans: List[dict]) -> None:
+        self._file.write("".join(_json_line(span) for span in spans))
+        self._file.flush()
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class SQLiteSink:
+    """Stores spans in a SQLite table, one row per span.
+    
+    Spans older than ``ttl`` are deleted when the sink is opened.
+    """
+    
+    def __init__(self, path: str, ttl: float = Config.TRACE_TTL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # Opened here but only written by the tracer's writer thread
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS spans ("
+            "id TEXT PRIMARY KEY, "
+            "trace_id TEXT NOT NULL, "
+            "parent_id TEXT, "
+            "name TEXT NOT NULL, "
+            "run_type TEXT NOT NULL, "
+            "start_time REAL NOT NULL, "
+            "end_time REAL, "
+            "duration REAL, "
+            "error TEXT, "
+            "tags TEXT NOT NULL, "
+            "inputs TEXT NOT NULL, "
+            "outputs TEXT NOT NULL); "
+            "CREATE INDEX IF NOT EXISTS spans_trace ON spans (trace_id); "
+            "CREATE INDEX IF NOT EXISTS spans_start ON spans (start_time);"
+        )
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM spans WHERE start_time < ?", (time.time() - ttl,)
+            )
+    
+    def write(self, spans: List[dict]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO spans VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        span["id"], span["trace_id"], span["parent_id"],
+                        span["name"], span["run_type"], span["start_time"],
+                        span["end_time"], span["duration"], span["error"],
+                        json.dumps(span["tags"]), span["inputs"],
+                        span["outputs"]
+                    )
+                    for span in spans
+                ]
+            )
+    
+    def close(self) -> None:
+        self._conn.close()
+
+
+def create_sink(path: str):
+    """Return a JSON lines sink for ".jsonl" paths, else a SQLite sink."""
+    if path.endswith(".jsonl"):
+        return JSONLSink(path)
+    return SQLiteSink(path)
+
+
+class LocalTracer(BaseTracer):
+    """Callback handler that records sampled runs to a local sink.
+    
+    Whether a run is recorded is decided once when its root starts, so a
+    trace is either complete or absent. Failed spans of runs that were
+    not sampled are still recorded at ``error_sample_rate``. Finished
+    spans go to a bounded queue; when it is full they are dropped rather
+    than slowing the workflow down.
+    """
+    
+    run_inline = True
+    
+    def __init__(
+        self,
+        sink,
+        sample_rate: float = Config.TRACE_SAMPLE_RATE,
+        error_sample_rate: float = Config.TRACE_ERROR_SAMPLE_RATE,
+        max_field_chars: int = Config.TRACE_MAX_FIELD_CHARS,
+        batch_size: int = Config.TRACE_BATCH_SIZE,
+        flush_interval: float = Config.TRACE_FLUSH_INTERVAL,
+        queue_size: int = Config.TRACE_QUEUE_SIZE
+    ):
+        """Initialize the tracer and start its writer thread.
+        
+        Args:
+            sink: Object with ``write(spans)`` and ``close()``, e.g.
+                ``SQLiteSink``
+            sample_rate: Share of runs recorded
+            error_sample_rate: Share of failed spans recorded from runs
+                that were not sampled
+            max_field_chars: Longest JSON kept per input or output field;
+                longer fields are cut and marked
+            batch_size: Spans written per batch
+            flush_interval: Longest time in seconds a span waits in a
+                partial batch
+            queue_size: Spans waiting to be written before new ones are
+                dropped
+        """
+        super().__init__(_schema_format="original+chat")
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.error_sample_rate = error_sample_rate
+        self.max_field_chars = max_field_chars
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.counts = {
+            "recorded": 0, "sampled_out": 0, "dropped": 0, "write_errors": 0
+        }
+        self._sampled = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._write_loop, name="local-tracer", daemon=True
+        )
+        self._writer.start()
+    
+    def stats(self) -> dict:
+        """Return counts of recorded, sampled out and dropped spans."""
+        return dict(self.counts)
+    
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued span has been written.
+        
+        Returns:
+            False if the writer did not catch up within ``timeout``
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = 10.0) -> None:
+        """Write the remaining spans and close the sink."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+        self.sink.close()
+    
+    def _start_trace(self, run: Run) -> None:
+        super()._start_trace(run)
+        if run.parent_run_id is None:
+            self._sampled[run.id] = random.random() < self.sample_rate
+    
+    def _persist_run(self, run: Run) -> None:
+        # Spans are queued as each run ends in _on_run_update
+        pass
+    
+    def _on_run_update(self, run: Run) -> None:
+        if run.parent_run_id is None:
+            sampled = self._sampled.pop(run.id, False)
+        else:
+            sampled = self._sampled.get(run.trace_id, False)
+        if self._closed or _HIDDEN_TAG in (run.tags or ()):
+            return
+        if not sampled and not (
+            run.error and random.random() < self.error_sample_rate
+        ):
+            self.counts["sampled_out"] += 1
+            return
+        
+        # Only references are queued; serializing happens on the writer
+        try:
+            self._queue.put_nowait(run)
+        except queue.Full:
+            self.counts["dropped"] += 1
+    
+    def _write_loop(self) -> None:
+        pending = []
+        deadline = None
+        while True:
+            timeout = (
+                None if deadline is None
+                else max(0.0, deadline - time.monotonic())
+            )
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, Run):
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                pending.append(item)
+                if (
+                    len(pending) < self.batch_size
+                    and time.monotonic() < deadline
+                ):
+                    continue
+            
+            if pending:
+                self._write(pending)
+            pending = []
+            deadline = None
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+    
+    def _write(self, runs: List[Run]) -> None:
+        try:
+            self.sink.write([self._span(run) for run in runs])
+            self.counts["recorded"] += len(runs)
+        except Exception as e:
+            self.counts["write_errors"] += 1
+            print(f"⚠️  Trace write failed ({len(runs)} spans): {e}")
+    
+    def _span(self, run: Run) -> dict:
+        start = run.start_time.timestamp()
+        end = run.end_time.timestamp() if run.end_time else None
+        return {
+            "id": str(run.id),
+            "trace_id": str(run.trace_id),
+            "parent_id": str(run.parent_run_id) if run.parent_run_id else None,
+            "name": run.name,
+            "run_type": run.run_type,
+            "start_time": start,
+            "end_time": end,
+            "duration": round(end - start, 6) if end else None,
+            "error": run.error,
+            "tags": list(run.tags or ()),
+            "inputs": _cap_fields(run.inputs, self.max_field_chars),
+            "outputs": _cap_fields(run.outputs, self.max_field_chars)
+        }
+
+
+def _cap_fields(fields: Optional[dict], limit: int) -> str:
+    """Serialize a run's inputs or outputs, cutting each long field."""
+    parts = []
+    for key, value in (fields or {}).items():
+        text = json.dumps(value, default=_to_json, ensure_ascii=False)
+        if len(text) > limit:
+            text = json.dumps(
+                f"{text[:limit]}... [{len(text) - limit} more chars]",
+                ensure_ascii=False
+            )
+        parts.append(f"{json.dumps(str(key))}: {text}")
+    return "{" + ", ".join(parts) + "}"
+
+
+def _to_json(value):
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def _json_line(span: dict) -> str:
+    """Render a span whose inputs and outputs are already JSON text."""
+    fields = {
+        key: value for key, value in span.items()
+        if key not in ("inputs", "outputs")
+    }
+    return (
+        f"{json.dumps(fields)[:-1]}, \"inputs\": {span['inputs']}, "
+        f"\"outputs\": {span['outputs']}}}\n"
+    )
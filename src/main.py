@@ -1,6 +1,16 @@
+import argparse
+import json
+import os
+import threading
+from typing import TYPE_CHECKING, List, Optional
+
 from .config import Config
+from .metrics import write_metrics
+from .models import ANALYSIS_MODES
 from .prompts import Prompts
-from .workflow import WorkflowBuilder
+from .reflection import available_strategies
+from .search_backends import available_backends
+from .tracing import TRACING_MODES, configure_tracing
 from .utils import (
     print_section_header,
     print_subsection_header,
@@ -9,6 +19,131 @@ from .utils import (
     validate_input_range
 )
 
+if TYPE_CHECKING:
+    from .checkpoint import SQLiteCheckpointer
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options.
+    
+    Args:
+        argv: Argument list, defaults to ``sys.argv[1:]``
+        
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Deep Research Agent")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="bypass the persistent search caches for this run"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="remove all cached search results and model responses "
+        "before running"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="always call the model instead of reusing cached responses"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=available_backends(),
+        default=Config.SEARCH_BACKEND,
+        help=f"search backend [default: {Config.SEARCH_BACKEND}]"
+    )
+    parser.add_argument(
+        "--reflection",
+        choices=["llm", *available_strategies()],
+        default=Config.REFLECTION_STRATEGY,
+        help="how to decide whether the analysis is complete "
+        f"[default: {Config.REFLECTION_STRATEGY}]"
+    )
+    parser.add_argument(
+        "--analysis",
+        choices=ANALYSIS_MODES,
+        default=Config.ANALYSIS_MODE,
+        help="analyze all sub-questions in one prompt, each in parallel "
+        "and merge, or each as soon as its search returns "
+        f"[default: {Config.ANALYSIS_MODE}]"
+    )
+    parser.add_argument(
+        "--speculative-report",
+        action="store_true",
+        default=Config.SPECULATIVE_REPORT,
+        help="generate the report while the model reflects and keep it "
+        "if the analysis is accepted"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=Config.STREAM_LLM_OUTPUT,
+        help="print model output token by token as it is generated"
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="continue a failed or interrupted run from its last "
+        "completed step, with the settings it was started with"
+    )
+    parser.add_argument(
+        "--no-checkpoints",
+        action="store_true",
+        help="do not save progress, so the run cannot be resumed"
+    )
+    parser.add_argument(
+        "--tracing",
+        choices=TRACING_MODES,
+        default=Config.TRACING_MODE,
+        help="send traces to LangSmith, write them to Config.TRACE_PATH "
+        f"(local) or turn tracing off [default: {Config.TRACING_MODE}]"
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="DIR",
+        help="write node, model and search metrics of the run to "
+        "DIR/<run id>.prom and DIR/<run id>.json"
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="write the report to FILE as it is generated instead of "
+        "asking at the end"
+    )
+    parser.add_argument(
+        "--fetch-pages",
+        action="store_true",
+        default=Config.FETCH_PAGES_ENABLED,
+        help="download the top pages of each sub-question for deeper context"
+    )
+    return parser.parse_args(argv)
+
+
+def preload_workflow() -> threading.Thread:
+    """Import the workflow and its dependencies in the background.
+    
+    LangGraph, LangChain and the OpenAI client take a second or more to
+    import. They are not needed to show the prompts, so they load while
+    the user types instead of before the first prompt appears.
+    
+    Returns:
+        The daemon thread doing the imports
+    """
+    def load() -> None:
+        try:
+            from . import workflow  # noqa: F401
+            import langchain_openai  # noqa: F401
+        except ImportError:
+            # run_research reports the error when it imports the workflow
+            pass
+    
+    thread = threading.Thread(target=load, name="preload", daemon=True)
+    thread.start()
+    return thread
+
 
 def get_user_input() -> tuple:
     """ 
@@ -84,6 +219,43 @@ def get_user_input() -> tuple:
     return query, model_name, num_sub_questions, max_iterations, prompts
 
 
+def run_options(args: argparse.Namespace) -> dict:
+    """Return the command line options a run is saved and resumed with.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Options that change the workflow a run builds
+    """
+    return {
+        "reflection": args.reflection,
+        "analysis": args.analysis,
+        "backend": args.backend,
+        "fetch_pages": args.fetch_pages,
+        "speculative_report": args.speculative_report,
+        "stream": args.stream
+    }
+
+
+def load_run(checkpointer: "SQLiteCheckpointer", run_id: str) -> dict:
+    """Load the settings a checkpointed run was started with.
+    
+    Args:
+        checkpointer: Checkpoint store
+        run_id: Run id printed when the run started
+        
+    Returns:
+        Run settings, see ``run_options`` for the saved options
+    """
+    from .checkpoint import run_config
+    
+    saved = checkpointer.get_tuple(run_config(run_id))
+    if saved is None or "settings" not in saved.metadata:
+        raise ValueError(f"No checkpoints found for run '{run_id}'")
+    return json.loads(saved.metadata["settings"])
+
+
 def display_configuration(
     model_name: str,
     num_sub_questions: int,
@@ -101,6 +273,12 @@ def display_configuration(
     print_section_header("🚀 STARTING RESEARCH WORKFLOW")
     print(f"\n📊 Configuration:")
     print(f"  • Model: {model_name}")
+    for node, settings in Config.NODE_MODELS.items():
+        if settings.get("model") or settings.get("base_url"):
+            print(
+                f"  • {node}: {settings.get('model', model_name)}"
+                + (f" @ {settings['base_url']}" if settings.get("base_url") else "")
+            )
     print(f"  • Sub-questions: {num_sub_questions}")
     print(f"  • Max iterations: {max_iterations}")
     print(f"  • Custom prompts: {'Yes' if custom_prompts else 'No'}")
@@ -155,15 +333,73 @@ def save_results(
             print(f"✅ Report saved to {filename}")
 
 
-def run_research() -> None:
-    """Main function to run the research workflow."""
+def run_research(argv: Optional[List[str]] = None) -> None:
+    """Main function to run the research workflow.
+    
+    Args:
+        argv: Command line arguments, defaults to ``sys.argv[1:]``
+    """
+    args = parse_args(argv)
+    run_id = None
+    builder = None
+    tracer = None
+    
     try:
         # Setup environment
         Config.setup_environment()
         Config.validate_config()
+        tracer = configure_tracing(args.tracing)
+        
+        preload_workflow()
+        
+        if args.clear_cache:
+            from .cache import SearchCache
+            from .llm_cache import LLMCache
+            from .semantic_cache import SemanticCache
+            
+            SearchCache().clear()
+            SemanticCache().clear()
+            LLMCache().clear()
+            print("🧹 Search and LLM caches cleared")
         
-        # Get user input
-        query, model_name, num_sub_questions, max_iterations, prompts = get_user_input()
+        checkpointer = None
+        if args.resume:
+            from .checkpoint import SQLiteCheckpointer
+            
+            checkpointer = SQLiteCheckpointer()
+            # The saved options win; runs saved before an option was
+            # recorded fall back to the command line
+            settings = {
+                **run_options(args), **load_run(checkpointer, args.resume)
+            }
+            run_id = args.resume
+        else:
+            # Get user input
+            query, model_name, num_sub_questions, max_iterations, prompts = get_user_input()
+            settings = {
+                "query": query,
+                "model_name": model_name,
+                "num_sub_questions": num_sub_questions,
+                "max_iterations": max_iterations,
+                "prompts": prompts,
+                **run_options(args)
+            }
+        
+        # Imported after the prompts; preload_workflow has been loading
+        # them in the background meanwhile
+        from .checkpoint import SQLiteCheckpointer, new_run_id, run_config
+        from .workflow import SharedCaches, WorkflowBuilder
+        
+        if checkpointer is None and not args.no_checkpoints:
+            checkpointer = SQLiteCheckpointer()
+        if run_id is None and (checkpointer is not None or args.metrics):
+            run_id = new_run_id()
+        
+        query = settings["query"]
+        model_name = settings["model_name"]
+        num_sub_questions = settings["num_sub_questions"]
+        max_iterations = settings["max_iterations"]
+        prompts = settings["prompts"]
         
         # Display configuration
         display_configuration(
@@ -178,25 +414,108 @@ def run_research() -> None:
             model_name=model_name,
             num_sub_questions=num_sub_questions,
             max_iterations=max_iterations,
+            use_search_cache=Config.SEARCH_CACHE_ENABLED and not args.no_cache,
+            search_backend=settings["backend"],
+            fetch_pages=settings["fetch_pages"],
+            use_llm_cache=Config.LLM_CACHE_ENABLED and not args.no_llm_cache,
+            stream=settings["stream"],
+            report_path=args.output,
+            reflection_strategy=settings["reflection"],
+            analysis_mode=settings["analysis"],
+            speculative_report=settings["speculative_report"],
+            caches=SharedCaches(checkpointer=checkpointer),
+            checkpoints=checkpointer is not None,
             **prompts
         )
         
         app = builder.build()
-        initial_state = builder.create_initial_state(query)
-        result = app.invoke(initial_state)
+        # Checkpoint metadata only keeps plain values, so settings are JSON
+        config = (
+            run_config(run_id, settings=json.dumps(settings)) if run_id else {}
+        )
+        if args.resume:
+            snapshot = app.get_state(config)
+            if snapshot.next:
+                print(f"\n♻️  Resuming run {run_id} at {', '.join(snapshot.next)}")
+                result = app.invoke(None, config)
+            else:
+                print(f"\n♻️  Run {run_id} already finished")
+                result = snapshot.values
+        else:
+            if run_id:
+                print(f"\n💾 Run id: {run_id}")
+            result = app.invoke(builder.create_initial_state(query), config)
+        
+        if builder.llm_cache is not None:
+            stats = builder.llm_cache.stats()
+            print(
+                f"\n⚡ LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} entries)"
+            )
+        
+        reflections = builder.nodes.reflections
+        if reflections["local"] or reflections["llm"]:
+            print(
+                f"\n🤔 Reflection: {reflections['local']} decided locally, "
+                f"{reflections['llm']} by the model"
+            )
+        
+        speculation = builder.nodes.speculation_stats()
+        if speculation["started"]:
+            print(
+                f"\n⚡ Speculative report: {speculation['hits']} used, "
+                f"{speculation['misses']} discarded "
+                f"({speculation['hit_rate']:.0%} hit rate, "
+                f"{speculation['wasted_tokens']} tokens wasted)"
+            )
+        
+        llm_calls = builder.metrics.summary().get(
+            "llm_request_duration_seconds", {}
+        )
+        if llm_calls:
+            print(
+                f"\n💰 {sum(calls['count'] for calls in llm_calls.values())} "
+                f"model calls, "
+                f"{builder.metrics.counter('llm_tokens_total'):.0f} tokens, "
+                f"~${builder.metrics.counter('llm_cost_usd_total'):.4f}"
+            )
+        
+        ttft = builder.nodes.pop_ttft(run_id or "")
+        if ttft:
+            print("\n⏱️  Time to first token:")
+            for node, latencies in ttft.items():
+                print(
+                    f"  • {node}: "
+                    + ", ".join(f"{latency:.2f}s" for latency in latencies)
+                )
         
         # Display and save results
-        display_results(result)
-        save_results(result, model_name, num_sub_questions, max_iterations)
+        if not settings["stream"]:
+            display_results(result)
+        if not args.output:
+            save_results(result, model_name, num_sub_questions, max_iterations)
         
         print("\n✅ Research completed successfully!")
-        
+    
     except ValueError as e:
         print(f"❌ Error: {str(e)}")
     except Exception as e:
         print(f"\n❌ Error occurred: {str(e)}")
         import traceback
         traceback.print_exc()
+        if run_id and checkpointer is not None:
+            print(f"\n💾 Continue this run with: python main.py --resume {run_id}")
+    finally:
+        if tracer is not None:
+            tracer.flush()
+            print(
+                f"🧭 {tracer.stats()['recorded']} trace spans written to "
+                f"{Config.TRACE_PATH}"
+            )
+        if args.metrics and builder is not None:
+            prefix = os.path.join(args.metrics, run_id)
+            write_metrics(builder.metrics, prefix, run_id=run_id, query=query)
+            print(f"📈 Metrics written to {prefix}.prom and {prefix}.json")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,411 @@
+"""
+Local metrics for workflow nodes, model calls and searches.
+
+A ``MetricsRegistry`` holds counters and latency histograms keyed by
+label values, plus collectors that read counters kept elsewhere (search
+guards, caches) when the metrics are exported. Everything stays in the
+process; ``to_prometheus`` renders the Prometheus text format and
+``summary`` a JSON-friendly dictionary.
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .config import Config
+
+# Upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+    60.0, 120.0
+)
+# Upper bounds of the payload size histogram buckets in characters
+SIZE_BUCKETS = (
+    100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000
+)
+
+# Name, type, help text and buckets of every metric the workflow records
+METRICS = {
+    "node_duration_seconds": (
+        "histogram", "Wall time of workflow node runs", LATENCY_BUCKETS
+    ),
+    "node_errors_total": ("counter", "Node runs that raised", None),
+    "llm_request_duration_seconds": (
+        "histogram", "Latency of model calls", LATENCY_BUCKETS
+    ),
+    "llm_errors_total": ("counter", "Model calls that raised", None),
+    "llm_tokens_total": (
+        "counter", "Tokens sent to and received from models", None
+    ),
+    "llm_cost_usd_total": (
+        "counter", "Estimated model cost from Config.MODEL_PRICES", None
+    ),
+    "llm_prompt_chars": (
+        "histogram", "Prompt size of model calls", SIZE_BUCKETS
+    ),
+    "llm_response_chars": (
+        "histogram", "Response size of model calls", SIZE_BUCKETS
+    ),
+    "search_duration_seconds": (
+        "histogram", "Latency of backend searches, including retries",
+        LATENCY_BUCKETS
+    ),
+    "search_requests_total": (
+        "counter", "Searches by where the results came from", None
+    ),
+    "search_errors_total": ("counter", "Searches that failed", None),
+    "search_result_chars": (
+        "histogram", "Snippet characters returned per search", SIZE_BUCKETS
+    ),
+    "reflection_decisions_total": (
+        "counter", "Reflection decisions by who made them", None
+    ),
+    "speculative_reports_total": (
+        "counter", "Speculative reports by outcome", None
+    ),
+    "speculative_wasted_tokens_total": (
+        "counter", "Tokens spent on discarded speculative reports", None
+    ),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimate the price of a model call.
+    
+    Args:
+        model: Model name, looked up in ``Config.MODEL_PRICES``; dated
+            snapshots such as "gpt-4o-2024-08-06" use the price of the
+            longest listed name they start with
+        input_tokens: Prompt tokens
+        output_tokens: Completion tokens
+        
+    Returns:
+        Cost in US dollars, 0 for models without a known price
+    """
+    known = [name for name in Config.MODEL_PRICES if model.startswith(name)]
+    if not known:
+        return 0.0
+    input_price, output_price = Config.MODEL_PRICES[max(known, key=len)]
+    return (input_tokens * input_price + output_tokens * output_price) / 1e6
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds."""
+    
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms with labels."""
+    
+    def __init__(self, namespace: str = Config.METRICS_NAMESPACE):
+        """Create an empty registry.
+        
+        Args:
+            namespace: Prefix of every exported metric name
+        """
+        self.namespace = namespace
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Sample]]] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Add to a counter.
+        
+        Args:
+            name: Metric name from ``METRICS``
+            amount: Amount to add
+            **labels: Label values
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+    
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a histogram observation.
+        
+        Args:
+            name: Metric name from ``METRICS``
+            value: Observed value
+            **labels: Label values
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(METRICS[name][2])
+            series[key].observe(value)
+    
+    def timed(self, func: Callable, node: str) -> Callable:
+        """Wrap a node function to record its duration and errors."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                self.inc("node_errors_total", node=node)
+                raise
+            finally:
+                self.observe(
+                    "node_duration_seconds",
+                    time.perf_counter() - start,
+                    node=node
+                )
+        return wrapper
+    
+    def atimed(self, func: Callable, node: str) -> Callable:
+        """Async version of ``timed``."""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                self.inc("node_errors_total", node=node)
+                raise
+            finally:
+                self.observe(
+                    "node_duration_seconds",
+                    time.perf_counter() - start,
+                    node=node
+                )
+        return wrapper
+    
+    def add_collector(
+        self,
+        key: str,
+        collector: Callable[[], Iterable[Sample]]
+    ) -> None:
+        """Register a function read at export time.
+        
+        Args:
+            key: Name of the collected object; registering the same key
+                again replaces the collector, so objects shared by
+                several builders are only exported once
+            collector: Returns (name, type, help, labels, value) samples,
+                e.g. counters kept by a cache
+        """
+        with self._lock:
+            self._collectors[key] = collector
+    
+    def counter(self, name: str, **labels) -> float:
+        """Return a counter's value summed over series matching ``labels``."""
+        with self._lock:
+            return sum(
+                value
+                for key, value in self._counters.get(name, {}).items()
+                if set(_labels(labels)) <= set(key)
+            )
+    
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = {
+                name: dict(series) for name, series in self._counters.items()
+            }
+            histograms = {
+                name: dict(series)
+                for name, series in self._histograms.items()
+            }
+        
+        for name in sorted(counters):
+            lines += self._header(name, "counter", METRICS[name][1])
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{self._name(name)}{_format(key)} {value:g}")
+        
+        for name in sorted(histograms):
+            full = self._name(name)
+            lines += self._header(name, "histogram", METRICS[name][1])
+            for key, histogram in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(
+                    [*histogram.buckets, "+Inf"], histogram.counts
+                ):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else f"{bound:g}"
+                    lines.append(
+                        f"{full}_bucket{_format(key + (('le', le),))} "
+                        f"{cumulative}"
+                    )
+                lines.append(f"{full}_sum{_format(key)} {histogram.sum:g}")
+                lines.append(f"{full}_count{_format(key)} {histogram.count}")
+        
+        described = set()
+        for name, kind, help_text, labels, value in self._collect():
+            if name not in described:
+                lines += self._header(name, kind, help_text)
+                described.add(name)
+            lines.append(
+                f"{self._name(name)}{_format(_labels(labels))} {value:g}"
+            )
+        return "\n".join(lines) + "\n"
+    
+    def summary(self) -> dict:
+        """Return the metrics as plain data for a JSON run summary.
+        
+        Counters map label strings to values. Histograms map label
+        strings to count, sum, mean and bucket-estimated p50 and p95.
+        """
+        with self._lock:
+            result = {
+                name: {
+                    _key(key): value for key, value in sorted(series.items())
+                }
+                for name, series in sorted(self._counters.items())
+            }
+            for name, series in sorted(self._histograms.items()):
+                result[name] = {
+                    _key(key): {
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                        "mean": round(histogram.sum / histogram.count, 6),
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95)
+                    }
+                    for key, histogram in sorted(series.items())
+                }
+        for name, _, _, labels, value in self._collect():
+            result.setdefault(name, {})[_key(_labels(labels))] = value
+        return result
+    
+    def _collect(self) -> List[Sample]:
+        with self._lock:
+            collectors = list(self._collectors.values())
+        samples = []
+        for collector in collectors:
+            samples.extend(collector())
+        return sorted(samples, key=lambda sample: sample[0])
+    
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+    
+    def _header(self, name: str, kind: str, help_text: str) -> List[str]:
+        full = self._name(name)
+        return [f"# HELP {full} {help_text}", f"# TYPE {full} {kind}"]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format(key: Labels) -> str:
+    if not key:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in key
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _key(key: Labels) -> str:
+    return ",".join(f"{name}={value}" for name, value in key) or "total"
+
+
+def guard_samples(guard) -> List[Sample]:
+    """Collect the retry, throttling and circuit counters of a search guard.
+    
+    Args:
+        guard: ``resilience.BackendGuard``
+        
+    Returns:
+        Samples labelled with the backend name
+    """
+    counters = guard.metrics()
+    labels = {"backend": guard.name}
+    samples = [
+        (
+            f"search_{key}_total",
+            "counter",
+            f"Search guard {key.replace('_', ' ')} since process start",
+            labels,
+            counters[key]
+        )
+        for key in (
+            "retries", "throttled", "rate_limit_waits",
+            "rate_limit_wait_seconds", "circuit_rejections"
+        )
+    ]
+    samples.append((
+        "search_circuit_open",
+        "gauge",
+        "Whether the backend circuit is open",
+        labels,
+        float(counters["circuit_open"])
+    ))
+    return samples
+
+
+def cache_samples(name: str, cache) -> List[Sample]:
+    """Collect the hit and miss counters of a cache.
+    
+    Args:
+        name: Cache label, e.g. "search" or "llm"
+        cache: Any cache with a ``stats()`` method returning hits and misses
+        
+    Returns:
+        Hit and miss samples labelled with the cache name
+    """
+    stats = cache.stats()
+    return [
+        (
+            f"cache_{outcome}_total",
+            "counter",
+            f"Cache {outcome} since the cache was opened",
+            {"cache": name},
+            stats[outcome]
+        )
+        for outcome in ("hits", "misses")
+    ]
+
+
+def write_metrics(registry: MetricsRegistry, prefix: str, **extra) -> None:
+    """Write a registry as ``<prefix>.prom`` and ``<prefix>.json``.
+    
+    Args:
+        registry: Metrics to write
+        prefix: Output path without extension
+        **extra: Values added to the JSON summary, e.g. the run id
+    """
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{prefix}.prom", "w", encoding="utf-8") as f:
+        f.write(registry.to_prometheus())
+    with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+        json.dump({**extra, "metrics": registry.summary()}, f, indent=2)
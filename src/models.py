@@ -1,5 +1,87 @@
-from typing import TypedDict, List, Annotated
-import operator
+from dataclasses import asdict, dataclass
+from typing import Annotated, Dict, TypedDict, TypeVar, List
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """A single search result.
+    
+    Attributes:
+        question_id: Index of the sub-question the hit answers
+        title: Result title
+        url: Result URL (or file path for local backends)
+        snippet: Result text
+        backend: Name of the backend that returned the hit
+        fetched_at: Unix time the hit was fetched from the backend
+        content: Extracted page text, if the page was fetched
+    """
+    question_id: int
+    title: str
+    url: str
+    snippet: str
+    backend: str
+    fetched_at: float
+    content: str = ""
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "SearchHit":
+        return cls(**data)
+
+
+@dataclass(slots=True)
+class Gap:
+    """Missing evidence named by reflection.
+    
+    Attributes:
+        question_id: Index of the sub-question the gap belongs to
+        query: Search query targeting the missing evidence
+    """
+    question_id: int
+    query: str
+
+
+T = TypeVar("T")
+
+# How analysis is organized, see WorkflowBuilder
+ANALYSIS_MODES = ("single", "map_reduce", "pipelined")
+
+
+def merge_by_question(
+    current: Dict[int, T],
+    update: Dict[int, T]
+) -> Dict[int, T]:
+    """Merge per-sub-question values, newer entries replacing older ones.
+    
+    Merging the same update twice gives the same result, so parallel
+    branches and full-state updates can both write the field.
+    """
+    return {**current, **update}
+
+
+class AnalysisTask(TypedDict):
+    """Input of one map-reduce analysis branch.
+    
+    Attributes:
+        query: The main research query
+        sub_questions: All research sub-questions
+        question_id: Index of the sub-question to analyze
+        hits: Search hits for the sub-question (only new hits on
+            follow-up passes, none for pipelined branches, which search
+            first)
+        previous: Earlier analysis of the sub-question, if any
+        gaps: Gap queries the new hits were searched for
+        iteration: Analysis iteration
+    """
+    query: str
+    sub_questions: List[str]
+    question_id: int
+    hits: List[SearchHit]
+    previous: str
+    gaps: List[str]
+    iteration: int
 
 
 class ResearchState(TypedDict):
@@ -8,14 +90,28 @@ class ResearchState(TypedDict):
     Attributes:
         query: The main research query
         sub_questions: List of generated sub-questions
-        search_results: Accumulated search results
+        search_results: Search hits for all sub-questions, in question order
         analysis: Current analysis of search results
-        report: Final research report
+        previous_analysis: Analysis of the previous iteration, if any
+        gaps: Gaps found by the last reflection, searched before the next
+            analysis
+        new_results: Hits found for the gaps that no analysis has seen yet
+        partial_analyses: Per-sub-question analyses in map-reduce and
+            pipelined mode, keyed by sub-question index
+        question_results: Search hits of pipelined branches, keyed by
+            sub-question index, until they are merged into search_results
+        report: Final research report, set before generate_report when a
+            speculative report was accepted
         iteration: Current iteration count
     """
     query: str
     sub_questions: List[str]
-    search_results: Annotated[List[str], operator.add]
+    search_results: List[SearchHit]
     analysis: str
+    previous_analysis: str
+    gaps: List[Gap]
+    new_results: List[SearchHit]
+    partial_analyses: Annotated[Dict[int, str], merge_by_question]
+    question_results: Annotated[Dict[int, List[SearchHit]], merge_by_question]
     report: str
     iteration: int
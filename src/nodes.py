@@ -1,17 +1,44 @@
 
-from typing import Callable
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
-from langsmith.run_helpers import traceable
+import asyncio
+import contextlib
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Callable, Dict, List, Optional, Set, TextIO, Tuple, Union
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage
+)
+from langchain_core.runnables import ensure_config
+from langgraph.types import Send
 
-from .models import ResearchState
+from .config import Config
+from .context_packer import ContextPacker
+from .dedup import deduplicate_results
+from .fetcher import PageFetcher
+from .llm_cache import LLMCache
+from .metrics import MetricsRegistry, estimate_cost
+from .models import AnalysisTask, Gap, ResearchState, SearchHit
 from .prompts import Prompts
+from .reflection import ReflectionStrategy
+from .resilience import SearchError
 from .search_tool import WebSearchTool
+from .tokens import count_tokens
+from .tracing import traceable
 from .utils import (
     print_section_header,
     print_progress,
     print_numbered_list,
-    clean_questions
+    truncate_text,
+    clean_questions,
+    open_report_file
 )
 
 
@@ -19,14 +46,24 @@ class WorkflowNodes:
     
     def __init__(
         self,
-        llm: ChatOpenAI,
+        llm: BaseChatModel,
         search_tool: WebSearchTool,
         num_sub_questions: int,
         max_iterations: int,
         question_prompt: str,
         analysis_prompt: str,
         reflection_prompt: str,
-        report_prompt: str
+        report_prompt: str,
+        page_fetcher: Optional[PageFetcher] = None,
+        llm_cache: Optional[LLMCache] = None,
+        node_llms: Optional[Dict[str, BaseChatModel]] = None,
+        context_packer: Optional[ContextPacker] = None,
+        stream: bool = False,
+        report_path: Optional[str] = None,
+        reflection: Optional[ReflectionStrategy] = None,
+        reflection_fallback: bool = True,
+        speculative_report: bool = False,
+        metrics: Optional[MetricsRegistry] = None
     ):
         """Initialize workflow nodes.
         
@@ -39,6 +76,24 @@ class WorkflowNodes:
             analysis_prompt: System prompt for analysis
             reflection_prompt: System prompt for reflection
             report_prompt: System prompt for report generation
+            page_fetcher: Fetcher used by the fetch_pages node
+            llm_cache: Cache of model responses, or None to always call
+                the model
+            node_llms: Models used instead of ``llm`` by specific nodes,
+                keyed by node name
+            context_packer: Packer fitting search results into the
+                analysis prompt, or None to include them all
+            stream: Whether to print model output token by token
+            report_path: File the final report is written to as it is
+                generated, or None to leave saving to the caller
+            reflection: Strategy judging the analysis locally, or None to
+                always ask the model
+            reflection_fallback: Whether to ask the model when the
+                strategy is unsure; otherwise the analysis is accepted
+            speculative_report: Whether to generate the report during
+                LLM reflection, keeping it if reflection finds no gaps
+            metrics: Registry recording model calls and reflection
+                decisions
         """
         self.llm = llm
         self.search_tool = search_tool
@@ -48,6 +103,299 @@ class WorkflowNodes:
         self.analysis_prompt = analysis_prompt
         self.reflection_prompt = reflection_prompt
         self.report_prompt = report_prompt
+        self.page_fetcher = page_fetcher
+        self.llm_cache = llm_cache
+        self.node_llms = node_llms or {}
+        self.context_packer = context_packer
+        self.stream = stream
+        self.report_path = report_path
+        # Times to first token of streamed calls, by run id and node
+        self.ttft: Dict[str, Dict[str, List[float]]] = {}
+        self._ttft_lock = threading.Lock()
+        self.reflection = reflection
+        self.reflection_fallback = reflection_fallback
+        # Reflection decisions made locally and by the model
+        self.reflections = {"local": 0, "llm": 0}
+        self.speculative_report = speculative_report
+        # Speculative reports started, used (hits), discarded (misses),
+        # and the tokens spent on discarded ones
+        self.speculation = {
+            "started": 0, "hits": 0, "misses": 0, "wasted_tokens": 0
+        }
+        self._speculation_lock = threading.Lock()
+        # Set once a rejected, already running sync report is counted
+        self._unsettled: Set[threading.Event] = set()
+        self.metrics = metrics or MetricsRegistry()
+    
+    def _invoke(
+        self,
+        node: str,
+        prompt: List[BaseMessage],
+        variant: str = "",
+        on_chunk: Optional[Callable[[str], None]] = None,
+        stream: bool = True
+    ) -> BaseMessage:
+        """Call the node's model, serving repeated calls from the LLM cache.
+        
+        Args:
+            node: Name of the calling node, used to pick its model and
+                checked against ``Config.LLM_CACHE_SKIP_NODES``
+            prompt: Prompt messages
+            variant: Extra key part for calls that repeat with the same
+                prompt, e.g. the analysis iteration
+            on_chunk: Called with each piece of output text as it arrives
+            stream: Whether output may be printed as it arrives; parallel
+                branches pass False so their output does not interleave
+                
+        Returns:
+            Model response
+        """
+        stream = stream and self.stream
+        llm = self.node_llms.get(node, self.llm)
+        key = self._cache_key(node, llm, variant)
+        response = self._from_cache(node, key, prompt, on_chunk, stream)
+        if response is None:
+            start = time.perf_counter()
+            try:
+                response = self._call(node, llm, prompt, on_chunk, stream)
+            except Exception:
+                self._record_llm_error(node, llm)
+                raise
+            self._record_llm(node, llm, prompt, response, start)
+            self._to_cache(key, prompt, response)
+        return response
+    
+    async def _ainvoke(
+        self,
+        node: str,
+        prompt: List[BaseMessage],
+        variant: str = "",
+        on_chunk: Optional[Callable[[str], None]] = None,
+        stream: bool = True
+    ) -> BaseMessage:
+        """Async version of ``_invoke``.
+        
+        LLM cache reads and writes run in a worker thread, so SQLite
+        never blocks the event loop.
+        """
+        stream = stream and self.stream
+        llm = self.node_llms.get(node, self.llm)
+        key = self._cache_key(node, llm, variant)
+        response = None
+        if key is not None:
+            model, params, namespace = key
+            response = self._replay(
+                node,
+                await asyncio.to_thread(
+                    self.llm_cache.get, model, params, prompt, namespace
+                ),
+                on_chunk,
+                stream
+            )
+        if response is None:
+            start = time.perf_counter()
+            try:
+                response = await self._acall(
+                    node, llm, prompt, on_chunk, stream
+                )
+            except Exception:
+                self._record_llm_error(node, llm)
+                raise
+            self._record_llm(node, llm, prompt, response, start)
+            await asyncio.to_thread(self._to_cache, key, prompt, response)
+        return response
+    
+    def _record_llm(
+        self,
+        node: str,
+        llm: BaseChatModel,
+        prompt: List[BaseMessage],
+        response: BaseMessage,
+        start: float
+    ) -> None:
+        """Record latency, tokens, cost and sizes of a model call.
+        
+        Token counts come from the response's usage metadata, or are
+        counted locally when the model did not report them (e.g. when
+        streaming).
+        """
+        elapsed = time.perf_counter() - start
+        model = getattr(llm, "model_name", type(llm).__name__)
+        prompt_text = "".join(str(message.content) for message in prompt)
+        response_text = str(response.content)
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            input_tokens = usage["input_tokens"]
+            output_tokens = usage["output_tokens"]
+        else:
+            input_tokens = count_tokens(prompt_text, model)
+            output_tokens = count_tokens(response_text, model)
+        
+        metrics = self.metrics
+        metrics.observe(
+            "llm_request_duration_seconds", elapsed, node=node, model=model
+        )
+        metrics.inc(
+            "llm_tokens_total", input_tokens, node=node, model=model,
+            kind="input"
+        )
+        metrics.inc(
+            "llm_tokens_total", output_tokens, node=node, model=model,
+            kind="output"
+        )
+        metrics.inc(
+            "llm_cost_usd_total",
+            estimate_cost(model, input_tokens, output_tokens),
+            node=node,
+            model=model
+        )
+        metrics.observe("llm_prompt_chars", len(prompt_text), node=node)
+        metrics.observe("llm_response_chars", len(response_text), node=node)
+    
+    def _record_llm_error(self, node: str, llm: BaseChatModel) -> None:
+        self.metrics.inc(
+            "llm_errors_total",
+            node=node,
+            model=getattr(llm, "model_name", type(llm).__name__)
+        )
+    
+    def _cache_key(
+        self,
+        node: str,
+        llm: BaseChatModel,
+        variant: str
+    ) -> Optional[Tuple[str, dict, str]]:
+        """Return the (model, params, namespace) LLM cache key of a call.
+        
+        Returns:
+            Cache key, or None if the call must not be cached
+        """
+        if self.llm_cache is None or node in Config.LLM_CACHE_SKIP_NODES:
+            return None
+        model = getattr(llm, "model_name", type(llm).__name__)
+        params = {
+            "temperature": getattr(llm, "temperature", None),
+            "max_tokens": getattr(llm, "max_tokens", None),
+            "base_url": getattr(llm, "openai_api_base", None)
+        }
+        return model, params, f"{node}:{variant}" if variant else node
+    
+    def _from_cache(
+        self,
+        node: str,
+        key: Optional[Tuple[str, dict, str]],
+        prompt: List[BaseMessage],
+        on_chunk: Optional[Callable[[str], None]],
+        stream: bool
+    ) -> Optional[BaseMessage]:
+        if key is None:
+            return None
+        model, params, namespace = key
+        return self._replay(
+            node,
+            self.llm_cache.get(model, params, prompt, namespace),
+            on_chunk,
+            stream
+        )
+    
+    def _replay(
+        self,
+        node: str,
+        response: Optional[BaseMessage],
+        on_chunk: Optional[Callable[[str], None]],
+        stream: bool
+    ) -> Optional[BaseMessage]:
+        """Show a cached response as if the model had just returned it."""
+        if response is not None:
+            print_progress(f"⚡ {node}: cached model response")
+            if stream:
+                print(f"\n{response.content}")
+            if on_chunk is not None:
+                on_chunk(response.content)
+        return response
+    
+    def _to_cache(
+        self,
+        key: Optional[Tuple[str, dict, str]],
+        prompt: List[BaseMessage],
+        response: BaseMessage
+    ) -> None:
+        if key is not None:
+            model, params, namespace = key
+            self.llm_cache.set(model, params, prompt, response, namespace)
+    
+    def _call(
+        self,
+        node: str,
+        llm: BaseChatModel,
+        prompt: List[BaseMessage],
+        on_chunk: Optional[Callable[[str], None]] = None,
+        stream: bool = False
+    ) -> BaseMessage:
+        """Call a model, streaming its output when ``stream`` is set.
+        
+        Args:
+            node: Name of the calling node, used to record time to first
+                token
+            llm: Model to call
+            prompt: Prompt messages
+            on_chunk: Called with each piece of output text as it arrives
+            stream: Whether to print output as it arrives
+            
+        Returns:
+            Model response
+        """
+        if not stream:
+            response = llm.invoke(prompt)
+            if on_chunk is not None:
+                on_chunk(response.content)
+            return response
+        
+        stream = _StreamPrinter(on_chunk)
+        for chunk in llm.stream(prompt):
+            stream.add(chunk)
+        return stream.finish(node, self._record_ttft)
+    
+    async def _acall(
+        self,
+        node: str,
+        llm: BaseChatModel,
+        prompt: List[BaseMessage],
+        on_chunk: Optional[Callable[[str], None]] = None,
+        stream: bool = False
+    ) -> BaseMessage:
+        """Async version of ``_call``."""
+        if not stream:
+            response = await llm.ainvoke(prompt)
+            if on_chunk is not None:
+                on_chunk(response.content)
+            return response
+        
+        stream = _StreamPrinter(on_chunk)
+        async for chunk in llm.astream(prompt):
+            stream.add(chunk)
+        return stream.finish(node, self._record_ttft)
+    
+    def _record_ttft(self, node: str, seconds: float) -> None:
+        """Record a time to first token under the current run's id."""
+        run_id = ensure_config().get("configurable", {}).get("thread_id", "")
+        with self._ttft_lock:
+            self.ttft.setdefault(run_id, {}).setdefault(node, []).append(
+                seconds
+            )
+    
+    def pop_ttft(self, run_id: str = "") -> Dict[str, List[float]]:
+        """Remove and return the times to first token of one run.
+        
+        Args:
+            run_id: Run id the graph was invoked with, or "" for runs
+                without one
+                
+        Returns:
+            Times to first token in seconds, by node
+        """
+        with self._ttft_lock:
+            return self.ttft.pop(run_id, {})
     
     @traceable(run_type="chain", name="generate_sub_questions")
     def generate_sub_questions(self, state: ResearchState) -> ResearchState:
@@ -59,17 +407,34 @@ class WorkflowNodes:
         Returns:
             Updated state with sub-questions
         """
-        query = state["query"]
+        prompt = self._question_messages(state)
+        response = self._invoke("generate_sub_questions", prompt)
+        return self._apply_questions(state, response)
+    
+    @traceable(run_type="chain", name="generate_sub_questions")
+    async def agenerate_sub_questions(
+        self,
+        state: ResearchState
+    ) -> ResearchState:
+        """Async version of ``generate_sub_questions``."""
+        prompt = self._question_messages(state)
+        response = await self._ainvoke("generate_sub_questions", prompt)
+        return self._apply_questions(state, response)
+    
+    def _question_messages(self, state: ResearchState) -> List[BaseMessage]:
         print_section_header("🔵 GENERATING SUB-QUESTIONS...")
-        
-        prompt = [
+        return [
             SystemMessage(content=self.question_prompt),
             HumanMessage(content=Prompts.get_question_generation_prompt(
-                query, self.num_sub_questions
+                state["query"], self.num_sub_questions
             ))
         ]
-        response = self.llm.invoke(prompt)
-        
+    
+    def _apply_questions(
+        self,
+        state: ResearchState,
+        response: BaseMessage
+    ) -> ResearchState:
         questions = clean_questions(
             response.content.strip().split('\n')
         )[:self.num_sub_questions]
@@ -77,7 +442,7 @@ class WorkflowNodes:
         # Use default questions if generation failed
         if len(questions) < self.num_sub_questions:
             questions = Prompts.get_default_sub_questions(
-                query, self.num_sub_questions
+                state["query"], self.num_sub_questions
             )
         
         state["sub_questions"] = questions
@@ -100,6 +465,71 @@ class WorkflowNodes:
         """
         return self.search_tool.search_from_state(state)
     
+    @traceable(run_type="tool", name="search_web")
+    async def asearch_web(self, state: ResearchState) -> ResearchState:
+        """Async version of ``search_web``."""
+        return await self.search_tool.asearch_from_state(state)
+    
+    @traceable(run_type="tool", name="fetch_pages")
+    def fetch_pages(self, state: ResearchState) -> ResearchState:
+        """Fetch and extract the top pages for each sub-question.
+        
+        Args:
+            state: Current research state
+            
+        Returns:
+            Updated state with page text attached to the top search hits
+        """
+        self.page_fetcher.fetch_for_hits(
+            state["search_results"], Config.FETCH_TOP_K
+        )
+        return state
+    
+    @traceable(run_type="tool", name="fetch_pages")
+    async def afetch_pages(self, state: ResearchState) -> ResearchState:
+        """Async version of ``fetch_pages``."""
+        await self.page_fetcher.afetch_for_hits(
+            state["search_results"], Config.FETCH_TOP_K
+        )
+        return state
+    
+    @traceable(run_type="chain", name="deduplicate_results")
+    def deduplicate_results(self, state: ResearchState) -> ResearchState:
+        """Remove near-duplicate hits across sub-question results.
+        
+        Args:
+            state: Current research state
+            
+        Returns:
+            Updated state with deduplicated search results
+        """
+        print_section_header("🧹 DEDUPLICATING RESULTS...")
+        
+        results, stats = deduplicate_results(
+            state["search_results"],
+            max_distance=Config.DEDUP_MAX_HAMMING_DISTANCE,
+            shingle_size=Config.DEDUP_SHINGLE_SIZE
+        )
+        state["search_results"] = results
+        
+        print_progress(
+            f"✓ Removed {stats['removed']}/{stats['hits']} results"
+        )
+        print_progress(
+            f"✓ Saved {stats['bytes_saved']} bytes "
+            f"(~{stats['tokens_saved']} tokens)"
+        )
+        
+        return state
+    
+    async def adeduplicate_results(self, state: ResearchState) -> ResearchState:
+        """Async version of ``deduplicate_results``.
+        
+        Fingerprinting a few dozen snippets takes well under a
+        millisecond, so it runs inline on the event loop.
+        """
+        return self.deduplicate_results(state)
+    
     @traceable(run_type="chain", name="analyze_context")
     def analyze_context(self, state: ResearchState) -> ResearchState:
         """Analyze search results and generate insights.
@@ -110,64 +540,775 @@ class WorkflowNodes:
         Returns:
             Updated state with analysis
         """
+        prompt = self._analysis_messages(state)
+        response = self._invoke(
+            "analyze_context", prompt, variant=str(state["iteration"])
+        )
+        return self._apply_analysis(state, response)
+    
+    @traceable(run_type="chain", name="analyze_context")
+    async def aanalyze_context(self, state: ResearchState) -> ResearchState:
+        """Async version of ``analyze_context``."""
+        prompt = self._analysis_messages(state)
+        response = await self._ainvoke(
+            "analyze_context", prompt, variant=str(state["iteration"])
+        )
+        return self._apply_analysis(state, response)
+    
+    def _analysis_messages(self, state: ResearchState) -> List[BaseMessage]:
+        """Return the analysis prompt.
+        
+        The first pass analyzes all search results. Later passes get the
+        previous analysis plus only the hits found for its gaps.
+        """
         query = state["query"]
-        search_results = state["search_results"]
+        incremental = bool(state["analysis"])
+        search_results = (
+            state["new_results"] if incremental else state["search_results"]
+        )
         
         print_section_header(
             f"🧠 ANALYZING RESULTS (Iteration {state['iteration'] + 1})..."
         )
+        if incremental:
+            print_progress(
+                f"Updating the previous analysis with "
+                f"{len(search_results)} new results"
+            )
         
-        context = "\n\n".join(search_results)
+        if self.context_packer is None:
+            context = Prompts.format_search_results(
+                state["sub_questions"], search_results
+            )
+        else:
+            context, report = self.context_packer.pack(
+                state["sub_questions"], search_results
+            )
+            print_progress(
+                f"✓ Packed {report['demand']} → {report['used']} context "
+                f"tokens (budget {report['budget']})"
+            )
+            for question in report["questions"]:
+                print_progress(
+                    f"  {truncate_text(question['question'], 40)}: "
+                    f"{question['kept']}/{question['hits']} hits, "
+                    f"{question['allocated']} tokens allocated"
+                    + (
+                        f", {question['truncated']} truncated"
+                        if question["truncated"] else ""
+                    )
+                )
         
-        prompt = [
+        if incremental:
+            content = Prompts.get_incremental_analysis_prompt(
+                query,
+                state["analysis"],
+                [gap.query for gap in state["gaps"]],
+                context
+            )
+        else:
+            content = Prompts.get_analysis_prompt(query, context)
+        return [
             SystemMessage(content=self.analysis_prompt),
-            HumanMessage(content=Prompts.get_analysis_prompt(query, context))
+            HumanMessage(content=content)
         ]
-        
-        response = self.llm.invoke(prompt)
+    
+    @staticmethod
+    def _apply_analysis(
+        state: ResearchState,
+        response: BaseMessage
+    ) -> ResearchState:
+        state["previous_analysis"] = state["analysis"]
         state["analysis"] = response.content
         state["iteration"] += 1
+        state["gaps"] = []
+        state["new_results"] = []
         
         print(f"\n✅ Analysis completed ({len(response.content)} chars)")
         
         return state
     
-    def reflect_on_analysis(self, state: ResearchState) -> str:
-        """Reflect on analysis quality and decide next step.
+    def fan_out_analysis(
+        self,
+        state: ResearchState
+    ) -> Union[str, List[Send]]:
+        """Send each sub-question that needs analysis to its own branch.
+        
+        The first pass analyzes every sub-question; follow-up passes only
+        those with new gap results.
+        
+        Args:
+            state: Current research state
+            
+        Returns:
+            One ``analyze_question`` task per sub-question, or
+            "generate_report" if a follow-up pass found nothing new
+        """
+        if state["analysis"]:
+            if not state["new_results"]:
+                return self.after_gap_search(state)
+            hits = state["new_results"]
+            question_ids = sorted({hit.question_id for hit in hits})
+        else:
+            hits = state["search_results"]
+            question_ids = list(range(len(state["sub_questions"])))
+        
+        print_section_header(
+            f"🧠 ANALYZING {len(question_ids)} SUB-QUESTIONS "
+            f"(Iteration {state['iteration'] + 1})..."
+        )
+        return [
+            Send(
+                "analyze_question",
+                self._task(
+                    state, i, [hit for hit in hits if hit.question_id == i]
+                )
+            )
+            for i in question_ids
+        ]
+    
+    def fan_out_research(self, state: ResearchState) -> List[Send]:
+        """Send each sub-question to a branch that searches and analyzes it.
+        
+        Args:
+            state: Research state with sub-questions
+            
+        Returns:
+            One ``research_question`` task per sub-question
+        """
+        print_section_header(
+            f"🔍 SEARCHING AND ANALYZING {len(state['sub_questions'])} "
+            f"SUB-QUESTIONS..."
+        )
+        return [
+            Send("research_question", self._task(state, i, []))
+            for i in range(len(state["sub_questions"]))
+        ]
+    
+    @staticmethod
+    def _task(
+        state: ResearchState,
+        question_id: int,
+        hits: List[SearchHit]
+    ) -> AnalysisTask:
+        return {
+            "query": state["query"],
+            "sub_questions": state["sub_questions"],
+            "question_id": question_id,
+            "hits": hits,
+            "previous": state["partial_analyses"].get(question_id, ""),
+            "gaps": [
+                gap.query for gap in state["gaps"]
+                if gap.question_id == question_id
+            ],
+            "iteration": state["iteration"]
+        }
+    
+    @traceable(run_type="chain", name="research_question")
+    def research_question(self, task: AnalysisTask) -> dict:
+        """Search one sub-question and analyze its results right away.
+        
+        With ``Config.DEDUP_ENABLED`` the branch's own hits are
+        deduplicated before the analysis; repeats across sub-questions
+        are removed when the branches are merged.
+        
+        Args:
+            task: Branch input from ``fan_out_research``
+            
+        Returns:
+            State update with the sub-question's hits and analysis
+        """
+        i = task["question_id"]
+        start = time.perf_counter()
+        try:
+            hits = self.search_tool.search(task["sub_questions"][i], i)
+        except SearchError as e:
+            hits = []
+            self._print_search_error(task, e)
+        if self.page_fetcher is not None:
+            self.page_fetcher.fetch_for_hits(hits, Config.FETCH_TOP_K)
+        hits = self._deduplicate_branch(hits)
+        self._print_searched(task, hits, time.perf_counter() - start)
+        
+        update = self.analyze_question({**task, "hits": hits})
+        return {**update, "question_results": {i: hits}}
+    
+    @traceable(run_type="chain", name="research_question")
+    async def aresearch_question(self, task: AnalysisTask) -> dict:
+        """Async version of ``research_question``."""
+        i = task["question_id"]
+        start = time.perf_counter()
+        try:
+            hits = await self.search_tool.asearch(task["sub_questions"][i], i)
+        except SearchError as e:
+            hits = []
+            self._print_search_error(task, e)
+        if self.page_fetcher is not None:
+            await self.page_fetcher.afetch_for_hits(hits, Config.FETCH_TOP_K)
+        hits = self._deduplicate_branch(hits)
+        self._print_searched(task, hits, time.perf_counter() - start)
+        
+        update = await self.aanalyze_question({**task, "hits": hits})
+        return {**update, "question_results": {i: hits}}
+    
+    @staticmethod
+    def _deduplicate_branch(hits: List[SearchHit]) -> List[SearchHit]:
+        """Drop near-duplicate hits within one pipelined branch."""
+        if not Config.DEDUP_ENABLED:
+            return hits
+        hits, _ = deduplicate_results(
+            hits,
+            max_distance=Config.DEDUP_MAX_HAMMING_DISTANCE,
+            shingle_size=Config.DEDUP_SHINGLE_SIZE
+        )
+        return hits
+    
+    @staticmethod
+    def _print_search_error(task: AnalysisTask, error: SearchError) -> None:
+        print_progress(
+            f"✗ Q{task['question_id'] + 1} search failed: "
+            f"{truncate_text(str(error), 50)}"
+        )
+    
+    @staticmethod
+    def _print_searched(
+        task: AnalysisTask,
+        hits: List[SearchHit],
+        elapsed: float
+    ) -> None:
+        print_progress(
+            f"🔍 Q{task['question_id'] + 1}: {len(hits)} results "
+            f"in {elapsed:.2f}s, analyzing"
+        )
+    
+    @traceable(run_type="chain", name="analyze_question")
+    def analyze_question(self, task: AnalysisTask) -> dict:
+        """Analyze the search results of one sub-question.
+        
+        A failed model call only loses this branch: the other branches
+        are still merged, and an earlier analysis of the sub-question is
+        kept.
+        
+        Args:
+            task: Branch input from ``fan_out_analysis``
+            
+        Returns:
+            State update with the sub-question's analysis, empty if the
+            model call failed
+        """
+        try:
+            response = self._invoke(
+                "analyze_context",
+                self._question_analysis_messages(task),
+                variant=f"{task['iteration']}:{task['question_id']}",
+                stream=False
+            )
+        except Exception as e:
+            return self._question_analysis_failed(task, e)
+        return self._apply_question_analysis(task, response)
+    
+    @traceable(run_type="chain", name="analyze_question")
+    async def aanalyze_question(self, task: AnalysisTask) -> dict:
+        """Async version of ``analyze_question``."""
+        try:
+            response = await self._ainvoke(
+                "analyze_context",
+                self._question_analysis_messages(task),
+                variant=f"{task['iteration']}:{task['question_id']}",
+                stream=False
+            )
+        except Exception as e:
+            return self._question_analysis_failed(task, e)
+        return self._apply_question_analysis(task, response)
+    
+    def _question_analysis_messages(
+        self,
+        task: AnalysisTask
+    ) -> List[BaseMessage]:
+        if self.context_packer is None:
+            context = Prompts.format_search_results(
+                task["sub_questions"], task["hits"]
+            )
+        else:
+            # A single sub-question gets the whole budget
+            context, _ = self.context_packer.pack(
+                task["sub_questions"], task["hits"]
+            )
+        if not context:
+            context = f"Question: {task['sub_questions'][task['question_id']]}"
+            context += "\n\nResults:\nNo results found."
+        
+        if task["previous"]:
+            content = Prompts.get_incremental_analysis_prompt(
+                task["query"], task["previous"], task["gaps"], context
+            )
+        else:
+            content = Prompts.get_analysis_prompt(task["query"], context)
+        return [
+            SystemMessage(content=self.analysis_prompt),
+            HumanMessage(content=content)
+        ]
+    
+    @staticmethod
+    def _apply_question_analysis(
+        task: AnalysisTask,
+        response: BaseMessage
+    ) -> dict:
+        print_progress(
+            f"✓ Q{task['question_id'] + 1} analyzed "
+            f"({len(task['hits'])} results, {len(response.content)} chars)"
+        )
+        return {"partial_analyses": {task["question_id"]: response.content}}
+    
+    @staticmethod
+    def _question_analysis_failed(task: AnalysisTask, error: Exception) -> dict:
+        print_progress(
+            f"✗ Q{task['question_id'] + 1} analysis failed: "
+            f"{truncate_text(str(error) or type(error).__name__, 50)}"
+        )
+        return {"partial_analyses": {}}
+    
+    @traceable(run_type="chain", name="merge_analyses")
+    def merge_analyses(self, state: ResearchState) -> ResearchState:
+        """Merge the per-sub-question analyses into one analysis.
         
         Args:
             state: Current research state
             
         Returns:
-            Next node name to execute
+            Updated state with analysis
+        """
+        self._collect_question_results(state)
+        prompt = self._merge_messages(state)
+        if prompt is None:
+            response = AIMessage(content=self._only_analysis(state))
+        else:
+            response = self._invoke(
+                "merge_analyses", prompt, variant=str(state["iteration"])
+            )
+        return self._apply_analysis(state, response)
+    
+    @traceable(run_type="chain", name="merge_analyses")
+    async def amerge_analyses(self, state: ResearchState) -> ResearchState:
+        """Async version of ``merge_analyses``."""
+        self._collect_question_results(state)
+        prompt = self._merge_messages(state)
+        if prompt is None:
+            response = AIMessage(content=self._only_analysis(state))
+        else:
+            response = await self._ainvoke(
+                "merge_analyses", prompt, variant=str(state["iteration"])
+            )
+        return self._apply_analysis(state, response)
+    
+    @staticmethod
+    def _collect_question_results(state: ResearchState) -> None:
+        """Move the hits of pipelined branches into ``search_results``.
+        
+        With ``Config.DEDUP_ENABLED``, hits repeating an earlier
+        sub-question's are dropped, as ``deduplicate_results`` does in
+        the other modes.
         """
-        analysis = state["analysis"]
-        iteration = state["iteration"]
+        if state["question_results"] and not state["search_results"]:
+            hits = [
+                hit
+                for _, branch in sorted(state["question_results"].items())
+                for hit in branch
+            ]
+            if Config.DEDUP_ENABLED:
+                hits, stats = deduplicate_results(
+                    hits,
+                    max_distance=Config.DEDUP_MAX_HAMMING_DISTANCE,
+                    shingle_size=Config.DEDUP_SHINGLE_SIZE
+                )
+                print_progress(
+                    f"✓ Removed {stats['removed']}/{stats['hits']} "
+                    "repeated results across sub-questions"
+                )
+            state["search_results"] = hits
+    
+    @staticmethod
+    def _only_analysis(state: ResearchState) -> str:
+        """Return the single partial analysis, which needs no merge."""
+        if not state["partial_analyses"]:
+            raise RuntimeError("Every sub-question analysis failed")
+        return next(iter(state["partial_analyses"].values()))
+    
+    def _merge_messages(
+        self,
+        state: ResearchState
+    ) -> Optional[List[BaseMessage]]:
+        """Return the merge prompt, or None if there is only one analysis."""
+        partial_analyses = state["partial_analyses"]
+        if len(partial_analyses) <= 1:
+            return None
+        print_section_header(
+            f"🔗 MERGING {len(partial_analyses)} ANALYSES..."
+        )
+        return [
+            SystemMessage(content=self.analysis_prompt),
+            HumanMessage(
+                content=Prompts.get_merge_prompt(
+                    state["query"], state["sub_questions"], partial_analyses
+                )
+            )
+        ]
+    
+    @traceable(run_type="chain", name="reflect_on_analysis")
+    def reflect_on_analysis(self, state: ResearchState) -> ResearchState:
+        """Reflect on analysis quality and find gaps in the evidence.
         
+        Args:
+            state: Current research state
+            
+        Returns:
+            Updated state with the gaps to search, empty if the analysis
+            is ready for the report
+        """
+        gaps = self._reflect_locally(state)
+        if gaps is None:
+            speculation = self._speculate(state)
+            accepted = False
+            try:
+                response = self._invoke(
+                    "reflect_on_analysis",
+                    self._reflection_messages(state),
+                    variant=str(state["iteration"])
+                )
+                self._count_reflection("llm")
+                gaps = self._parse_gaps(state, response)
+                accepted = not gaps
+            finally:
+                self._settle(state, speculation, accepted)
+        return self._apply_gaps(state, gaps)
+    
+    @traceable(run_type="chain", name="reflect_on_analysis")
+    async def areflect_on_analysis(self, state: ResearchState) -> ResearchState:
+        """Async version of ``reflect_on_analysis``."""
+        gaps = self._reflect_locally(state)
+        if gaps is None:
+            speculation = self._aspeculate(state)
+            accepted = False
+            try:
+                response = await self._ainvoke(
+                    "reflect_on_analysis",
+                    self._reflection_messages(state),
+                    variant=str(state["iteration"])
+                )
+                self._count_reflection("llm")
+                gaps = self._parse_gaps(state, response)
+                accepted = not gaps
+            finally:
+                await self._asettle(state, speculation, accepted)
+        return self._apply_gaps(state, gaps)
+    
+    def _reflect_locally(self, state: ResearchState) -> Optional[List[Gap]]:
+        """Return the gaps, or None if the model has to decide."""
         print_section_header("🤔 REFLECTING ON ANALYSIS...")
         
-        if iteration >= self.max_iterations:
+        if state["iteration"] >= self.max_iterations:
             print_progress(f"⏱️  Max iterations ({self.max_iterations}) reached")
-            print_progress("→ Proceeding to report generation")
-            return "generate_report"
+            return []
         
-        prompt = [
-            SystemMessage(content=self.reflection_prompt),
-            HumanMessage(content=Prompts.get_reflection_prompt(analysis))
-        ]
+        if self.reflection is None:
+            return None
+        verdict = self.reflection.assess(state)
+        if verdict.complete is None and self.reflection_fallback:
+            print_progress(f"? Unsure ({verdict.reason}), asking the model")
+            return None
+        
+        self._count_reflection("local")
+        print_progress(f"✓ Decided locally: {verdict.reason}")
+        return list(verdict.gaps)
+    
+    def _speculate(
+        self,
+        state: ResearchState
+    ) -> Optional[Tuple[List[BaseMessage], Future]]:
+        """Start generating the report in a worker thread."""
+        if not self.speculative_report:
+            return None
+        prompt = self._report_messages(state)
+        executor = ThreadPoolExecutor(max_workers=1)
+        # Run in a copy of the current context so callbacks and tracing
+        # still see the speculative call
+        future = executor.submit(
+            contextvars.copy_context().run,
+            self._invoke,
+            "generate_report",
+            prompt,
+            stream=False
+        )
+        executor.shutdown(wait=False)
+        self._count_speculation("started")
+        return prompt, future
+    
+    def _settle(
+        self,
+        state: ResearchState,
+        speculation: Optional[Tuple[List[BaseMessage], Future]],
+        accepted: bool
+    ) -> None:
+        """Keep an accepted speculative report, discard a rejected one.
+        
+        A rejected report that already started cannot be cancelled in
+        its worker thread. It finishes in the background, so the next
+        step does not wait for it, and is counted as a miss when done;
+        ``speculation_stats`` waits for such reports.
+        """
+        if speculation is None:
+            return
+        prompt, future = speculation
+        if accepted:
+            try:
+                self._accept_speculation(state, future.result())
+            except Exception as e:
+                self._reject_speculation(prompt, None, e)
+        elif future.cancel():
+            self._reject_speculation(prompt, None)
+        else:
+            settled = threading.Event()
+            with self._speculation_lock:
+                self._unsettled.add(settled)
+            
+            def reject(done: Future) -> None:
+                try:
+                    self._reject_speculation(
+                        prompt, None if done.exception() else done.result()
+                    )
+                finally:
+                    with self._speculation_lock:
+                        self._unsettled.discard(settled)
+                    settled.set()
+            
+            future.add_done_callback(reject)
+    
+    def _aspeculate(
+        self,
+        state: ResearchState
+    ) -> Optional[Tuple[List[BaseMessage], asyncio.Task]]:
+        """Async version of ``_speculate``, running the call as a task."""
+        if not self.speculative_report:
+            return None
+        prompt = self._report_messages(state)
+        task = asyncio.create_task(
+            self._ainvoke("generate_report", prompt, stream=False)
+        )
+        self._count_speculation("started")
+        return prompt, task
+    
+    async def _asettle(
+        self,
+        state: ResearchState,
+        speculation: Optional[Tuple[List[BaseMessage], asyncio.Task]],
+        accepted: bool
+    ) -> None:
+        """Async version of ``_settle``; a rejected report is cancelled."""
+        if speculation is None:
+            return
+        prompt, task = speculation
+        if accepted:
+            try:
+                self._accept_speculation(state, await task)
+            except Exception as e:
+                self._reject_speculation(prompt, None, e)
+            return
+        
+        response = None
+        if task.done() and not task.cancelled() and task.exception() is None:
+            response = task.result()
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await task
+        self._reject_speculation(prompt, response)
+    
+    def _accept_speculation(
+        self,
+        state: ResearchState,
+        response: BaseMessage
+    ) -> None:
+        state["report"] = response.content
+        self._count_speculation("hits")
+        print_progress("⚡ Speculative report accepted")
+    
+    def _reject_speculation(
+        self,
+        prompt: List[BaseMessage],
+        response: Optional[BaseMessage],
+        error: Optional[Exception] = None
+    ) -> None:
+        """Count a discarded report and the tokens spent on it.
+        
+        Prompt tokens are always counted; output tokens only when the call
+        finished, since a cancelled request reports no usage.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            wasted = usage["total_tokens"]
+        else:
+            model = getattr(
+                self.node_llms.get("generate_report", self.llm),
+                "model_name",
+                ""
+            )
+            wasted = sum(
+                count_tokens(str(message.content), model) for message in prompt
+            )
+            if response is not None:
+                wasted += count_tokens(str(response.content), model)
+        self._count_speculation("misses", wasted)
+        if error is not None:
+            print_progress(
+                f"⚠️  Speculative report failed: {truncate_text(str(error), 50)}"
+            )
+    
+    def _count_speculation(self, outcome: str, wasted_tokens: int = 0) -> None:
+        with self._speculation_lock:
+            self.speculation[outcome] += 1
+            self.speculation["wasted_tokens"] += wasted_tokens
+        self.metrics.inc("speculative_reports_total", outcome=outcome)
+        if wasted_tokens:
+            self.metrics.inc("speculative_wasted_tokens_total", wasted_tokens)
+    
+    def speculation_stats(self) -> dict:
+        """Return speculative report counters and the hit rate.
         
-        response = self.llm.invoke(prompt)
+        First waits for rejected sync reports that were still running,
+        so their misses and tokens are included.
         
+        Returns:
+            Dictionary with started, hits, misses, wasted_tokens and
+            hit_rate
+        """
+        with self._speculation_lock:
+            unsettled = list(self._unsettled)
+        for settled in unsettled:
+            settled.wait()
+        with self._speculation_lock:
+            stats = dict(self.speculation)
+        settled = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / settled if settled else 0.0
+        return stats
+    
+    def _count_reflection(self, by: str) -> None:
+        self.reflections[by] += 1
+        self.metrics.inc("reflection_decisions_total", by=by)
+    
+    def _reflection_messages(self, state: ResearchState) -> List[BaseMessage]:
+        return [
+            SystemMessage(content=self.reflection_prompt),
+            HumanMessage(
+                content=Prompts.get_reflection_prompt(
+                    state["analysis"],
+                    state["sub_questions"],
+                    Config.REFLECTION_MAX_GAPS
+                )
+            )
+        ]
+    
+    @staticmethod
+    def _parse_gaps(state: ResearchState, response: BaseMessage) -> List[Gap]:
+        """Read the ``GAP <n>: <query>`` lines of a reflection response."""
         if "yes" in response.content.lower()[:50]:
             print(response.content.lower())
             print("=" * 60)
+            return []
+        
+        gaps = []
+        for number, query in re.findall(
+            r"^\W*GAP\s*(\d+)\s*:\s*(.+?)\s*$",
+            response.content,
+            flags=re.IGNORECASE | re.MULTILINE
+        ):
+            question_id = int(number) - 1
+            if 0 <= question_id < len(state["sub_questions"]):
+                gaps.append(Gap(question_id, query))
+        if not gaps:
+            print_progress("⚠️  Analysis needs improvement but no gaps named")
+        return gaps
+    
+    @staticmethod
+    def _apply_gaps(state: ResearchState, gaps: List[Gap]) -> ResearchState:
+        state["gaps"] = gaps[:Config.REFLECTION_MAX_GAPS]
+        if state["gaps"]:
+            print_progress(f"⚠️  {len(state['gaps'])} gaps in the analysis:")
+            for gap in state["gaps"]:
+                print_progress(
+                    f"• Q{gap.question_id + 1}: {truncate_text(gap.query)}",
+                    indent=4
+                )
+            print_progress("→ Searching for the missing evidence")
+        else:
             print_progress("✓ Analysis is comprehensive")
             print_progress("→ Proceeding to report generation")
-            return "generate_report"
-        else:
-            print_progress("⚠️  Analysis needs improvement")
-            print_progress("→ Re-analyzing with more depth")
+        return state
+    
+    @staticmethod
+    def after_reflection(state: ResearchState) -> str:
+        """Route to the gap search, or to the report if there are no gaps."""
+        return "search_gaps" if state["gaps"] else "generate_report"
+    
+    @traceable(run_type="tool", name="search_gaps")
+    def search_gaps(self, state: ResearchState) -> ResearchState:
+        """Search for the gaps found by reflection.
+        
+        Args:
+            state: Current research state
+            
+        Returns:
+            Updated state with the new hits in ``new_results`` and added
+            to ``search_results``
+        """
+        hits = self.search_tool.search_multiple(
+            [gap.query for gap in state["gaps"]],
+            [gap.question_id for gap in state["gaps"]]
+        )
+        if self.page_fetcher is not None:
+            self.page_fetcher.fetch_for_hits(hits, Config.FETCH_TOP_K)
+        return self._apply_gap_results(state, hits)
+    
+    @traceable(run_type="tool", name="search_gaps")
+    async def asearch_gaps(self, state: ResearchState) -> ResearchState:
+        """Async version of ``search_gaps``."""
+        hits = await self.search_tool.asearch_multiple(
+            [gap.query for gap in state["gaps"]],
+            [gap.question_id for gap in state["gaps"]]
+        )
+        if self.page_fetcher is not None:
+            await self.page_fetcher.afetch_for_hits(hits, Config.FETCH_TOP_K)
+        return self._apply_gap_results(state, hits)
+    
+    @staticmethod
+    def _apply_gap_results(
+        state: ResearchState,
+        hits: List[SearchHit]
+    ) -> ResearchState:
+        """Keep the hits that add evidence not already in the results."""
+        seen = {hit.url for hit in state["search_results"]}
+        hits = [hit for hit in hits if hit.url not in seen]
+        if Config.DEDUP_ENABLED and hits:
+            kept, _ = deduplicate_results(
+                state["search_results"] + hits,
+                max_distance=Config.DEDUP_MAX_HAMMING_DISTANCE,
+                shingle_size=Config.DEDUP_SHINGLE_SIZE
+            )
+            kept_ids = {id(hit) for hit in kept}
+            hits = [hit for hit in hits if id(hit) in kept_ids]
+        
+        state["new_results"] = hits
+        state["search_results"] = sorted(
+            state["search_results"] + hits, key=lambda hit: hit.question_id
+        )
+        print_progress(f"✓ {len(hits)} new results for the gaps")
+        return state
+    
+    @staticmethod
+    def after_gap_search(state: ResearchState) -> str:
+        """Route to analysis, or to the report if nothing new was found."""
+        if state["new_results"]:
             return "analyze_context"
+        print_progress("→ No new evidence, proceeding to report generation")
+        return "generate_report"
     
     @traceable(run_type="chain", name="generate_report")
     def generate_report(self, state: ResearchState) -> ResearchState:
@@ -179,21 +1320,140 @@ class WorkflowNodes:
         Returns:
             Updated state with final report
         """
-        query = state["query"]
-        analysis = state["analysis"]
-        
         print_section_header("📄 GENERATING FINAL REPORT...")
-        
-        prompt = [
+        if state["report"]:
+            return self._use_speculative_report(state)
+        prompt = self._report_messages(state)
+        report_file = self._open_report(state)
+        try:
+            response = self._invoke(
+                "generate_report",
+                prompt,
+                on_chunk=self._report_writer(report_file)
+            )
+        finally:
+            if report_file is not None:
+                report_file.close()
+        return self._apply_report(state, response, report_file)
+    
+    @traceable(run_type="chain", name="generate_report")
+    async def agenerate_report(self, state: ResearchState) -> ResearchState:
+        """Async version of ``generate_report``."""
+        print_section_header("📄 GENERATING FINAL REPORT...")
+        if state["report"]:
+            return self._use_speculative_report(state)
+        prompt = self._report_messages(state)
+        report_file = self._open_report(state)
+        try:
+            response = await self._ainvoke(
+                "generate_report",
+                prompt,
+                on_chunk=self._report_writer(report_file)
+            )
+        finally:
+            if report_file is not None:
+                report_file.close()
+        return self._apply_report(state, response, report_file)
+    
+    def _use_speculative_report(self, state: ResearchState) -> ResearchState:
+        """Finish with the report generated during reflection."""
+        print_progress("⚡ Using the report generated during reflection")
+        response = AIMessage(content=state["report"])
+        if self.stream:
+            print(f"\n{response.content}")
+        report_file = self._open_report(state)
+        if report_file is not None:
+            with report_file:
+                report_file.write(response.content)
+        return self._apply_report(state, response, report_file)
+    
+    def _report_messages(self, state: ResearchState) -> List[BaseMessage]:
+        return [
             SystemMessage(content=self.report_prompt),
             HumanMessage(content=Prompts.get_report_generation_prompt(
-                query, analysis
+                state["query"], state["analysis"]
             ))
         ]
+    
+    def _open_report(self, state: ResearchState) -> Optional[TextIO]:
+        if not self.report_path:
+            return None
+        try:
+            return open_report_file(
+                self.report_path,
+                state["query"],
+                state["sub_questions"],
+                getattr(self.llm, "model_name", ""),
+                self.num_sub_questions,
+                self.max_iterations
+            )
+        except OSError as e:
+            print(f"❌ Error saving file: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _report_writer(
+        report_file: Optional[TextIO]
+    ) -> Optional[Callable[[str], None]]:
+        if report_file is None:
+            return None
         
-        response = self.llm.invoke(prompt)
+        def write_chunk(text: str) -> None:
+            report_file.write(text)
+            report_file.flush()
+        return write_chunk
+    
+    def _apply_report(
+        self,
+        state: ResearchState,
+        response: BaseMessage,
+        report_file: Optional[TextIO]
+    ) -> ResearchState:
         state["report"] = response.content
         
         print(f"\n✅ Report generated ({len(response.content)} chars)")
+        if report_file is not None:
+            print(f"✅ Report saved to {self.report_path}")
         
         return state
+
+
+class _StreamPrinter:
+    """Prints streamed model output and measures time to first token."""
+    
+    def __init__(self, on_chunk: Optional[Callable[[str], None]] = None):
+        self.on_chunk = on_chunk
+        self.start = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.response: Optional[BaseMessage] = None
+        print()
+    
+    def add(self, chunk: BaseMessage) -> None:
+        self.response = (
+            chunk if self.response is None else self.response + chunk
+        )
+        if not chunk.content:
+            return
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.start
+        print(chunk.content, end="", flush=True)
+        if self.on_chunk is not None:
+            self.on_chunk(chunk.content)
+    
+    def finish(
+        self,
+        node: str,
+        record_ttft: Callable[[str, float], None]
+    ) -> BaseMessage:
+        """Record time to first token and return the combined response."""
+        print()
+        total = time.perf_counter() - self.start
+        first_token = total if self.first_token is None else self.first_token
+        record_ttft(node, first_token)
+        print_progress(
+            f"⏱️  {node}: first token after {first_token:.2f}s, "
+            f"done after {total:.2f}s"
+        )
+        if self.response is None:
+            return AIMessage(content="")
+        return self.response
@@ -1,3 +1,8 @@
+from typing import Dict, List
+
+from .models import SearchHit
+
+
 class Prompts:
     """Collection of system prompts for the research workflow."""
     
@@ -36,6 +41,38 @@ class Prompts:
 
 Generate exactly {num_questions} specific, focused sub-questions that will help thoroughly research this topic. Return only the {num_questions} questions, one per line, without numbering or extra text."""
     
+    @staticmethod
+    def format_search_results(
+        sub_questions: List[str],
+        hits: List[SearchHit]
+    ) -> str:
+        """Render search hits as prompt context, grouped by sub-question.
+        
+        Sub-questions without any hits are left out. Fetched page text is
+        used in place of the snippet when available.
+        
+        Args:
+            sub_questions: The research sub-questions
+            hits: Search hits in question order
+            
+        Returns:
+            Formatted context string
+        """
+        grouped = {}
+        for hit in hits:
+            grouped.setdefault(hit.question_id, []).append(hit)
+        
+        sections = []
+        for question_id, question_hits in grouped.items():
+            results = "\n".join(
+                f"- {hit.title} ({hit.url}): {hit.content or hit.snippet}"
+                for hit in question_hits
+            )
+            sections.append(
+                f"Question: {sub_questions[question_id]}\n\nResults:\n{results}"
+            )
+        return "\n\n".join(sections)
+    
     @staticmethod
     def get_analysis_prompt(query: str, context: str) -> str:
         """Generate prompt for context analysis.
@@ -61,19 +98,92 @@ Analyze these search results and provide:
 Provide a comprehensive analysis."""
     
     @staticmethod
-    def get_reflection_prompt(analysis: str) -> str:
+    def get_incremental_analysis_prompt(
+        query: str,
+        analysis: str,
+        gaps: List[str],
+        context: str
+    ) -> str:
+        """Generate prompt for updating an analysis with new evidence.
+        
+        Args:
+            query: The main research query
+            analysis: The previous analysis
+            gaps: Gaps the new evidence was searched for
+            context: New search results only
+            
+        Returns:
+            Formatted prompt string
+        """
+        gap_list = "\n".join(f"- {gap}" for gap in gaps)
+        return f"""Research Query: {query}
+
+Previous Analysis:
+{analysis}
+
+Gaps identified in the previous analysis:
+{gap_list}
+
+New Search Results:
+{context}
+
+Update the previous analysis with the new search results. Fill the gaps where the new results allow, keep the existing findings that still hold, and return the complete updated analysis."""
+    
+    @staticmethod
+    def get_merge_prompt(
+        query: str,
+        sub_questions: List[str],
+        partial_analyses: Dict[int, str]
+    ) -> str:
+        """Generate prompt for merging per-sub-question analyses.
+        
+        Args:
+            query: The main research query
+            sub_questions: The research sub-questions
+            partial_analyses: Analyses keyed by sub-question index
+            
+        Returns:
+            Formatted prompt string
+        """
+        sections = "\n\n".join(
+            f"Sub-question {i + 1}: {sub_questions[i]}\n{analysis}"
+            for i, analysis in sorted(partial_analyses.items())
+        )
+        return f"""Research Query: {query}
+
+Analyses per sub-question:
+{sections}
+
+Merge these analyses into one comprehensive analysis of the research query. Combine overlapping findings, point out agreements and conflicts between sub-questions, keep the facts, data points and sources, and list the remaining gaps."""
+    
+    @staticmethod
+    def get_reflection_prompt(
+        analysis: str,
+        sub_questions: List[str],
+        max_gaps: int
+    ) -> str:
         """Generate prompt for analysis reflection.
         
         Args:
             analysis: The current analysis to reflect on
+            sub_questions: The research sub-questions
+            max_gaps: Maximum number of gaps to list
             
         Returns:
             Formatted prompt string
         """
-        return f"""Analysis:
+        questions = "\n".join(
+            f"{i}. {question}" for i, question in enumerate(sub_questions, 1)
+        )
+        return f"""Sub-questions:
+{questions}
+
+Analysis:
 {analysis}
 
-Is this analysis comprehensive, well-supported, and ready for report generation? Answer with 'yes' or 'no' and briefly explain why."""
+Is this analysis comprehensive, well-supported, and ready for report generation? Answer with 'yes' or 'no' and briefly explain why.
+If 'no', list up to {max_gaps} missing pieces of evidence, one per line, as:
+GAP <sub-question number>: <web search query that would find the evidence>"""
     
     @staticmethod
     def get_report_generation_prompt(query: str, analysis: str) -> str:
@@ -0,0 +1,231 @@
+"""
+Reflection strategies that judge an analysis without calling the model.
+
+Strategies are registered by name and selected through
+``Config.REFLECTION_STRATEGY``. A strategy returns a ``Verdict``; an
+ambiguous verdict leaves the decision to the LLM reflection prompt when
+``Config.REFLECTION_LLM_FALLBACK`` is set.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import Config
+from .models import Gap, ResearchState
+from .semantic_cache import HashingEmbedder, terms
+
+
+@dataclass(frozen=True)
+class Verdict:
+    """Outcome of a reflection strategy.
+    
+    Attributes:
+        complete: True if the analysis is ready for the report, False if
+            it needs another pass, None if the strategy cannot tell
+        score: Strategy-specific score in [0, 1]
+        reason: Short explanation for progress output
+        gaps: Missing evidence to search for when ``complete`` is False
+    """
+    complete: Optional[bool]
+    score: float
+    reason: str
+    gaps: Tuple[Gap, ...] = ()
+
+
+class ReflectionStrategy:
+    """Interface implemented by every reflection strategy."""
+    
+    name: str = "base"
+    
+    def assess(self, state: ResearchState) -> Verdict:
+        """Judge the current analysis.
+        
+        Args:
+            state: Research state after analysis
+            
+        Returns:
+            Verdict on the analysis
+        """
+        raise NotImplementedError
+
+
+_STRATEGIES: Dict[str, Callable[..., ReflectionStrategy]] = {}
+
+
+def register_strategy(name: str) -> Callable:
+    """Class decorator registering a strategy under a name.
+    
+    Args:
+        name: Name used to select the strategy
+        
+    Returns:
+        Decorator that registers and returns the class
+    """
+    def decorator(cls):
+        cls.name = name
+        _STRATEGIES[name] = cls
+        return cls
+    return decorator
+
+
+def available_strategies() -> List[str]:
+    """Return the names of all registered strategies."""
+    return sorted(_STRATEGIES)
+
+
+def create_strategy(
+    name: str = Config.REFLECTION_STRATEGY,
+    **kwargs
+) -> ReflectionStrategy:
+    """Instantiate a registered strategy.
+    
+    Args:
+        name: Registered strategy name
+        **kwargs: Strategy constructor arguments
+        
+    Returns:
+        Strategy instance
+    """
+    if name not in _STRATEGIES:
+        raise ValueError(
+            f"Unknown reflection strategy '{name}'. "
+            f"Available: {', '.join(available_strategies())}"
+        )
+    return _STRATEGIES[name](**kwargs)
+
+
+@register_strategy("coverage")
+class CoverageStrategy(ReflectionStrategy):
+    """Checks that the analysis mentions each sub-question's key terms.
+    
+    A sub-question's coverage is the share of its content words that
+    appear in the analysis. The analysis is complete when the mean
+    coverage reaches ``complete`` and no sub-question is below
+    ``incomplete``, and incomplete when the mean is below ``incomplete``.
+    Each sub-question below ``incomplete`` becomes a gap searched with
+    the research query plus the question words the analysis lacks.
+    """
+    
+    def __init__(
+        self,
+        complete: float = Config.REFLECTION_COVERAGE_COMPLETE,
+        incomplete: float = Config.REFLECTION_COVERAGE_INCOMPLETE
+    ):
+        """Initialize the strategy.
+        
+        Args:
+            complete: Mean coverage at which the analysis is complete
+            incomplete: Coverage below which the analysis is incomplete
+        """
+        self.complete = complete
+        self.incomplete = incomplete
+    
+    def assess(self, state: ResearchState) -> Verdict:
+        analysis_terms = set(terms(state["analysis"]))
+        coverages = {}
+        for i, question in enumerate(state["sub_questions"]):
+            question_terms = set(terms(question))
+            if question_terms:
+                coverages[i] = (
+                    len(question_terms & analysis_terms) / len(question_terms)
+                )
+        if not coverages:
+            return Verdict(None, 0.0, "no sub-question terms to check")
+        
+        mean = sum(coverages.values()) / len(coverages)
+        worst = min(coverages.values())
+        reason = f"coverage {mean:.0%} (lowest {worst:.0%})"
+        if mean >= self.complete and worst >= self.incomplete:
+            return Verdict(True, mean, reason)
+        if mean < self.incomplete:
+            gaps = tuple(
+                self._gap(state, i, analysis_terms)
+                for i, coverage in sorted(
+                    coverages.items(), key=lambda item: item[1]
+                )
+                if coverage < self.incomplete
+            )
+            return Verdict(False, mean, reason, gaps)
+        return Verdict(None, mean, reason)
+    
+    @staticmethod
+    def _gap(state: ResearchState, question_id: int, analysis_terms) -> Gap:
+        """Build a search for the words of a sub-question left uncovered."""
+        question = state["sub_questions"][question_id]
+        missing = [
+            word for word in re.findall(r"\w+", question)
+            if any(term not in analysis_terms for term in terms(word))
+        ]
+        return Gap(question_id, " ".join([state["query"], *missing]))
+
+
+@register_strategy("convergence")
+class ConvergenceStrategy(ReflectionStrategy):
+    """Stops once successive analyses stop changing.
+    
+    Analyses are embedded with the hashing embedder of the semantic
+    cache. When the latest analysis is at least ``threshold`` similar to
+    the previous one, another pass is unlikely to add anything. A first
+    analysis, or one that still changes, is ambiguous.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = Config.REFLECTION_CONVERGENCE_THRESHOLD
+    ):
+        """Initialize the strategy.
+        
+        Args:
+            threshold: Cosine similarity at which analyses have converged
+        """
+        self.threshold = threshold
+        self.embedder = HashingEmbedder()
+    
+    def assess(self, state: ResearchState) -> Verdict:
+        previous = state.get("previous_analysis", "")
+        if not previous:
+            return Verdict(None, 0.0, "first analysis")
+        similarity = float(np.dot(
+            self.embedder.embed(previous),
+            self.embedder.embed(state["analysis"])
+        ))
+        reason = f"similarity to previous analysis {similarity:.2f}"
+        if similarity >= self.threshold:
+            return Verdict(True, similarity, reason)
+        return Verdict(None, similarity, reason)
+
+
+@register_strategy("local")
+class LocalStrategy(ReflectionStrategy):
+    """Convergence first, then coverage.
+    
+    A converged analysis is final even if coverage is low, since another
+    pass over the same results would not change it.
+    """
+    
+    def __init__(self, strategies: Optional[List[ReflectionStrategy]] = None):
+        """Initialize the strategy.
+        
+        Args:
+            strategies: Strategies tried in order, defaults to convergence
+                then coverage
+        """
+        self.strategies = strategies or [
+            ConvergenceStrategy(), CoverageStrategy()
+        ]
+    
+    def assess(self, state: ResearchState) -> Verdict:
+        verdicts = []
+        for strategy in self.strategies:
+            verdict = strategy.assess(state)
+            if verdict.complete is not None:
+                return verdict
+            verdicts.append(verdict)
+        return Verdict(
+            None,
+            verdicts[-1].score,
+            "; ".join(verdict.reason for verdict in verdicts)
+        )
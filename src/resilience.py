@@ -0,0 +1,391 @@
+"""
+Rate limiting, retries and circuit breaking for search backends.
+
+Guards are shared per backend name, so every search running in the
+process draws from the same token bucket and trips the same breaker.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from .config import Config
+
+T = TypeVar("T")
+
+
+class SearchError(Exception):
+    """Raised when a search fails after all retries."""
+
+
+class CircuitOpenError(SearchError):
+    """Raised without calling the backend while its circuit is open."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter."""
+    
+    def __init__(self, rate: float, burst: int):
+        """Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens held
+        """
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+    
+    async def aacquire(self) -> float:
+        """Take one token, yielding to the event loop while waiting.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+    
+    def _take(self) -> float:
+        """Take a token if one is available.
+        
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures until a cool-down has passed."""
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """Initialize a closed breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds before a trial call is let through
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+    
+    def allow(self) -> bool:
+        """Return whether a call may proceed.
+        
+        Once the cool-down has passed a single trial call is allowed
+        (half-open); its outcome closes or re-opens the circuit.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            cooled_down = time.monotonic() - self._opened_at >= self.reset_timeout
+            if cooled_down and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+    
+    def record_cancelled(self) -> None:
+        """Release the trial slot of a call that was cancelled midway."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+    
+    def __init__(self, window: int = 200):
+        """Initialize an empty window.
+        
+        Args:
+            window: Number of most recent latencies kept
+        """
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, percent: float) -> Optional[float]:
+        """Return a latency percentile, or None if nothing was recorded.
+        
+        Args:
+            percent: Percentile between 0 and 100
+            
+        Returns:
+            Latency in seconds
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, int(len(samples) * percent / 100))
+        return samples[rank]
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Return a full-jitter exponential backoff delay.
+    
+    Args:
+        attempt: Zero-based retry attempt
+        base_delay: Delay ceiling for the first retry in seconds
+        max_delay: Upper bound on the delay ceiling in seconds
+        
+    Returns:
+        Random delay between 0 and the capped exponential ceiling
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """Return whether an exception looks like a rate-limit response."""
+    text = f"{type(error).__name__} {error}".lower()
+    markers = ("ratelimit", "rate limit", "429", "too many requests")
+    return any(marker in text for marker in markers)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Return whether a failed attempt is worth retrying.
+    
+    Throttling and transient network errors (timeouts, dropped
+    connections) are retried; anything else, e.g. a bad request or a
+    parsing error, would fail the same way again.
+    """
+    if is_throttle_error(error):
+        return True
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    # httpx and other clients raise their own timeout/connect errors
+    name = type(error).__name__.lower()
+    return "timeout" in name or "connect" in name
+
+
+class BackendGuard:
+    """Rate limiter, retry policy, circuit breaker and counters for one backend."""
+    
+    def __init__(
+        self,
+        name: str,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_retries: int = Config.SEARCH_MAX_RETRIES,
+        base_delay: float = Config.SEARCH_RETRY_BASE_DELAY,
+        max_delay: float = Config.SEARCH_RETRY_MAX_DELAY,
+        failure_threshold: int = Config.SEARCH_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = Config.SEARCH_CIRCUIT_RESET_TIMEOUT
+    ):
+        """Initialize the guard.
+        
+        Args:
+            name: Backend name
+            rate_limiter: Shared token bucket, or None for no rate limit
+            max_retries: Retries after the first failed attempt
+            base_delay: Backoff ceiling for the first retry in seconds
+            max_delay: Upper bound on the backoff ceiling in seconds
+            failure_threshold: Consecutive failed searches that open the circuit
+            reset_timeout: Seconds the circuit stays open
+        """
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "calls": 0,
+            "failures": 0,
+            "retries": 0,
+            "throttled": 0,
+            "rate_limit_waits": 0,
+            "rate_limit_wait_seconds": 0.0,
+            "circuit_rejections": 0
+        }
+    
+    def call(self, func: Callable[[], T]) -> T:
+        """Run a backend call under the guard.
+        
+        Args:
+            func: Zero-argument callable performing one backend request
+            
+        Returns:
+            The callable's result
+            
+        Raises:
+            CircuitOpenError: If the circuit is open
+            SearchError: If every attempt failed, or one failed with an
+                error that is not retried
+        """
+        self._admit()
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self._record_wait(self.rate_limiter.acquire())
+            start = time.monotonic()
+            try:
+                result = func()
+            except Exception as e:
+                time.sleep(self._record_error(attempt, e))
+            else:
+                self._record_success(start)
+                return result
+    
+    async def acall(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Run an async backend call under the guard.
+        
+        Args:
+            func: Zero-argument callable returning an awaitable that
+                performs one backend request
+                
+        Returns:
+            The awaited result
+            
+        Raises:
+            CircuitOpenError: If the circuit is open
+            SearchError: If every attempt failed, or one failed with an
+                error that is not retried
+        """
+        self._admit()
+        try:
+            for attempt in range(self.max_retries + 1):
+                if self.rate_limiter is not None:
+                    self._record_wait(await self.rate_limiter.aacquire())
+                start = time.monotonic()
+                try:
+                    result = await func()
+                except Exception as e:
+                    await asyncio.sleep(self._record_error(attempt, e))
+                else:
+                    self._record_success(start)
+                    return result
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled()
+            raise
+    
+    def metrics(self) -> dict:
+        """Return a snapshot of the guard's counters."""
+        with self._lock:
+            snapshot = dict(self._metrics)
+        snapshot["circuit_open"] = self.breaker.is_open
+        return snapshot
+    
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            self._count("circuit_rejections")
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        self._count("calls")
+    
+    def _record_wait(self, waited: float) -> None:
+        if waited:
+            self._count("rate_limit_waits")
+            self._count("rate_limit_wait_seconds", waited)
+    
+    def _record_success(self, start: float) -> None:
+        self.latency.record(time.monotonic() - start)
+        self.breaker.record_success()
+    
+    def _record_error(self, attempt: int, error: Exception) -> float:
+        """Count a failed attempt.
+        
+        Args:
+            attempt: Zero-based attempt number
+            error: Exception raised by the attempt
+            
+        Returns:
+            Backoff delay before the next attempt
+            
+        Raises:
+            SearchError: If this was the last attempt or the error is
+                not retryable
+        """
+        if is_throttle_error(error):
+            self._count("throttled")
+        if attempt == self.max_retries or not is_retryable_error(error):
+            self.breaker.record_failure()
+            self._count("failures")
+            raise SearchError(str(error)) from error
+        self._count("retries")
+        return backoff_delay(attempt, self.base_delay, self.max_delay)
+    
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._metrics[key] += amount
+
+
+_GUARDS: Dict[str, BackendGuard] = {}
+_GUARDS_LOCK = threading.Lock()
+
+
+def get_guard(name: str) -> BackendGuard:
+    """Return the process-wide guard for a backend, creating it once.
+    
+    Rate limits come from ``Config.SEARCH_RATE_LIMITS``; backends not
+    listed there are not rate limited.
+    
+    Args:
+        name: Backend name
+        
+    Returns:
+        Shared guard for the backend
+    """
+    with _GUARDS_LOCK:
+        if name not in _GUARDS:
+            limit = Config.SEARCH_RATE_LIMITS.get(name)
+            limiter = TokenBucket(limit["rate"], limit["burst"]) if limit else None
+            _GUARDS[name] = BackendGuard(name, rate_limiter=limiter)
+        return _GUARDS[name]
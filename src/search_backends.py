@@ -0,0 +1,148 @@
+"""
+Search backend interface and registry.
+
+Backends are registered by name and selected through
+``Config.SEARCH_BACKEND``.
+"""
+
+import asyncio
+import os
+from typing import Callable, Dict, List
+
+from .config import Config
+from .local_index import LocalCorpusIndex
+
+# A raw result as returned by a backend: {"title", "url", "snippet"}
+RawResult = Dict[str, str]
+
+
+class SearchBackend:
+    """Interface implemented by every search backend."""
+    
+    name: str = "base"
+    # Whether results may be stored in the persistent search cache
+    cacheable: bool = True
+    
+    def run(self, query: str) -> List[RawResult]:
+        """Search for a query.
+        
+        Args:
+            query: The search query
+            
+        Returns:
+            List of results with ``title``, ``url`` and ``snippet`` keys
+        """
+        raise NotImplementedError
+    
+    async def arun(self, query: str) -> List[RawResult]:
+        """Search for a query without blocking the event loop.
+        
+        Backends with a native async client should override this; the
+        default runs ``run`` in a worker thread.
+        
+        Args:
+            query: The search query
+            
+        Returns:
+            List of results with ``title``, ``url`` and ``snippet`` keys
+        """
+        return await asyncio.to_thread(self.run, query)
+
+
+_BACKENDS: Dict[str, Callable[..., SearchBackend]] = {}
+
+
+def register_backend(name: str) -> Callable:
+    """Class decorator registering a backend under a name.
+    
+    Args:
+        name: Name used to select the backend
+        
+    Returns:
+        Decorator that registers and returns the class
+    """
+    def decorator(cls):
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def available_backends() -> List[str]:
+    """Return the names of all registered backends."""
+    return sorted(_BACKENDS)
+
+
+def create_backend(name: str = Config.SEARCH_BACKEND, **kwargs) -> SearchBackend:
+    """Instantiate a registered backend.
+    
+    Args:
+        name: Registered backend name
+        **kwargs: Backend constructor arguments
+        
+    Returns:
+        Backend instance
+    """
+    if name not in _BACKENDS:
+        raise ValueError(
+            f"Unknown search backend '{name}'. "
+            f"Available: {', '.join(available_backends())}"
+        )
+    return _BACKENDS[name](**kwargs)
+
+
+@register_backend("duckduckgo")
+class DuckDuckGoBackend(SearchBackend):
+    """Web search through DuckDuckGo."""
+    
+    def __init__(self, max_results: int = Config.SEARCH_MAX_RESULTS):
+        """Create the DuckDuckGo client.
+        
+        Args:
+            max_results: Number of results requested per query
+        """
+        from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+        
+        self.max_results = max_results
+        self.search_wrapper = DuckDuckGoSearchAPIWrapper()
+    
+    def run(self, query: str) -> List[RawResult]:
+        return [
+            {"title": r["title"], "url": r["link"], "snippet": r["snippet"]}
+            for r in self.search_wrapper.results(query, self.max_results)
+            if "snippet" in r
+        ]
+
+
+@register_backend("local")
+class LocalCorpusBackend(SearchBackend):
+    """Offline BM25 search over a folder of text and markdown files."""
+    
+    # The index is refreshed on startup, so cached results could go stale
+    cacheable = False
+    
+    def __init__(
+        self,
+        corpus_dir: str = Config.LOCAL_CORPUS_DIR,
+        index_path: str = Config.LOCAL_INDEX_PATH,
+        top_k: int = Config.SEARCH_MAX_RESULTS
+    ):
+        """Open the index and bring it up to date with the corpus folder.
+        
+        Args:
+            corpus_dir: Folder containing the documents to search
+            index_path: Path to the on-disk index
+            top_k: Number of passages returned per query
+        """
+        if not os.path.isdir(corpus_dir):
+            raise ValueError(f"Local corpus folder not found: {corpus_dir}")
+        
+        self.top_k = top_k
+        self.index = LocalCorpusIndex(index_path)
+        self.index.update(corpus_dir)
+    
+    def run(self, query: str) -> List[RawResult]:
+        return [
+            {"title": os.path.basename(path), "url": path, "snippet": text}
+            for _, path, text in self.index.search(query, self.top_k)
+        ]
@@ -1,59 +1,371 @@
 
-from typing import List
-from langchain_community.tools import DuckDuckGoSearchRun
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
 
-from .models import ResearchState
+from .cache import SearchCache
+from .config import Config
+from .hedging import HedgedSearch
+from .metrics import MetricsRegistry
+from .models import ResearchState, SearchHit
+from .resilience import SearchError, get_guard
+from .search_backends import RawResult, SearchBackend, create_backend
+from .semantic_cache import SemanticCache
 from .utils import print_section_header, print_progress, truncate_text
 
 
 class WebSearchTool:
     
-    def __init__(self):
-        self.search_tool = DuckDuckGoSearchRun()
-    
-    def search(self, query: str) -> str:
+    def __init__(
+        self,
+        backend: Optional[SearchBackend] = None,
+        max_concurrency: int = Config.SEARCH_MAX_CONCURRENCY,
+        cache: Optional[SearchCache] = None,
+        hedge_backend: Optional[SearchBackend] = None,
+        hedge_percentile: Optional[float] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """Initialize the web search tool.
+        
+        Args:
+            backend: Search backend, defaults to the one named by
+                ``Config.SEARCH_BACKEND``
+            max_concurrency: Maximum number of searches running at once
+            cache: Persistent result cache, or None to always search
+            hedge_backend: Secondary backend raced against a slow primary,
+                or None to disable hedging
+            hedge_percentile: Primary latency percentile after which the
+                hedge request is sent, defaults to the backend's
+                "percentile" in ``Config.SEARCH_HEDGING``
+            semantic_cache: Cache reusing results of paraphrased questions,
+                consulted after an exact cache miss
+            metrics: Registry recording search latency, sources and
+                result sizes
         """
+        self.backend = backend or create_backend(Config.SEARCH_BACKEND)
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.metrics = metrics or MetricsRegistry()
+        self.guard = get_guard(self.backend.name)
+        self.hedge = None
+        if hedge_backend is not None:
+            if hedge_percentile is None:
+                hedge_percentile = Config.SEARCH_HEDGING.get(
+                    self.backend.name, {}
+                ).get("percentile", Config.SEARCH_HEDGE_PERCENTILE)
+            self.hedge = HedgedSearch(
+                self.backend,
+                hedge_backend,
+                percentile=hedge_percentile
+            )
+    
+    def search(self, query: str, question_id: int = 0) -> List[SearchHit]:
+        """Search for a query, serving repeated queries from the cache.
+        
+        Backend calls go through the backend's shared guard, which applies
+        the rate limit, retries with backoff and the circuit breaker. With
+        hedging enabled a slow primary is raced against the hedge backend.
         
         Args:
             query: The search query
+            question_id: Index of the sub-question being searched
             
         Returns:
-            Search results as a string
+            List of search hits
+            
+        Raises:
+            SearchError: If the search failed or the circuit is open
         """
+        cached = self._lookup(query, question_id)
+        if cached is not None:
+            return cached
+        
+        start = time.perf_counter()
         try:
-            result = self.search_tool.run(query)
-            return result
-        except Exception as e:
-            return f"Error performing search: {str(e)}"
+            if self.hedge is not None:
+                results, answered_by = self.hedge.run(query)
+            else:
+                results = self.guard.call(lambda: self.backend.run(query))
+                answered_by = self.backend
+        except SearchError:
+            self.metrics.inc("search_errors_total", backend=self.backend.name)
+            raise
+        self._record_search(start, results, answered_by)
+        return self._store(query, question_id, results, answered_by)
     
-    def search_multiple(self, questions: List[str]) -> List[str]:
-        """Perform web searches for multiple questions.
+    async def asearch(self, query: str, question_id: int = 0) -> List[SearchHit]:
+        """Async version of ``search``.
+        
+        Cache lookups and writes run in a worker thread, so SQLite and
+        the semantic cache scan never block the event loop.
         
         Args:
-            questions: List of questions to search
+            query: The search query
+            question_id: Index of the sub-question being searched
             
         Returns:
-            List of formatted search results
+            List of search hits
+            
+        Raises:
+            SearchError: If the search failed or the circuit is open
         """
-        search_results = []
+        cached = await asyncio.to_thread(self._lookup, query, question_id)
+        if cached is not None:
+            return cached
         
-        print_section_header("🔍 SEARCHING WEB...")
+        start = time.perf_counter()
+        try:
+            if self.hedge is not None:
+                results, answered_by = await self.hedge.arun(query)
+            else:
+                results = await self.guard.acall(
+                    lambda: self.backend.arun(query)
+                )
+                answered_by = self.backend
+        except SearchError:
+            self.metrics.inc("search_errors_total", backend=self.backend.name)
+            raise
+        self._record_search(start, results, answered_by)
+        return await asyncio.to_thread(
+            self._store, query, question_id, results, answered_by
+        )
+    
+    def _record_search(
+        self,
+        start: float,
+        results: List[RawResult],
+        answered_by: SearchBackend
+    ) -> None:
+        backend = answered_by.name
+        self.metrics.observe(
+            "search_duration_seconds",
+            time.perf_counter() - start,
+            backend=backend
+        )
+        self.metrics.inc(
+            "search_requests_total", backend=backend, source="backend"
+        )
+        self.metrics.observe(
+            "search_result_chars",
+            sum(len(result["snippet"]) for result in results),
+            backend=backend
+        )
+    
+    def _lookup(self, query: str, question_id: int) -> Optional[List[SearchHit]]:
+        """Return hits from the exact or semantic cache, or None on a miss.
         
-        for i, question in enumerate(questions, 1):
-            print_progress(f"[{i}/{len(questions)}] Searching: {truncate_text(question)}...")
-            
-            result = self.search(question)
-            search_results.append(
-                f"Question: {question}\n\nResults: {result}\n\n"
+        Entries are namespaced by the backend that produced them. With
+        hedging, results the secondary answered are also reused, since
+        the hedged search would accept them too.
+        """
+        backends = [self.backend]
+        if self.hedge is not None:
+            backends.append(self.hedge.secondary)
+        namespaces = [backend.name for backend in backends if backend.cacheable]
+        if self.cache is not None:
+            for namespace in namespaces:
+                cached = self.cache.get(query, namespace=namespace)
+                if cached is not None:
+                    self._count_cached("cache")
+                    return self._from_records(cached, question_id)
+        if self.semantic_cache is not None:
+            for namespace in namespaces:
+                match = self.semantic_cache.lookup(query, namespace=namespace)
+                if match is not None:
+                    self._count_cached("semantic_cache")
+                    return self._from_records(match[1], question_id)
+        return None
+    
+    def _count_cached(self, source: str) -> None:
+        self.metrics.inc(
+            "search_requests_total", backend=self.backend.name, source=source
+        )
+    
+    def _store(
+        self,
+        query: str,
+        question_id: int,
+        results: List[RawResult],
+        answered_by: SearchBackend
+    ) -> List[SearchHit]:
+        """Build hits from backend results and add them to the caches."""
+        fetched_at = time.time()
+        hits = [
+            SearchHit(
+                question_id=question_id,
+                title=result["title"],
+                url=result["url"],
+                snippet=result["snippet"],
+                backend=answered_by.name,
+                fetched_at=fetched_at
             )
+            for result in results
+        ]
+        
+        if not answered_by.cacheable:
+            return hits
+        # Stored under the backend that answered, so a hedge secondary's
+        # results never appear as the primary's
+        records = [hit.to_dict() for hit in hits]
+        if self.cache is not None:
+            self.cache.set(query, records, namespace=answered_by.name)
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(query, records, namespace=answered_by.name)
+        return hits
+    
+    @staticmethod
+    def _from_records(records: List[dict], question_id: int) -> List[SearchHit]:
+        return [
+            SearchHit.from_dict({**record, "question_id": question_id})
+            for record in records
+        ]
+    
+    def search_multiple(
+        self,
+        questions: List[str],
+        question_ids: Optional[List[int]] = None
+    ) -> List[SearchHit]:
+        """Perform web searches for multiple questions concurrently.
+        
+        Searches run on a thread pool bounded by ``max_concurrency``.
+        Progress is printed as each search completes, but the returned
+        list always follows the order of ``questions``. Failed searches
+        contribute no hits, so no error text reaches the analysis prompt.
+        
+        Args:
+            questions: List of questions to search
+            question_ids: Sub-question index recorded on each question's
+                hits, defaults to the position in ``questions``
+                
+        Returns:
+            Search hits for all questions, in question order
+        """
+        search_results: List[List[SearchHit]] = [[] for _ in questions]
+        question_ids = question_ids or list(range(len(questions)))
+        workers = self._print_start(len(questions))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.search, question, question_ids[i]): i
+                for i, question in enumerate(questions)
+            }
             
-            if result.startswith("Error"):
-                print_progress(f"✗ Search failed: {truncate_text(result, 50)}")
-            else:
-                print_progress(f"✓ Results found ({len(result)} chars)")
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    search_results[i] = future.result()
+                except SearchError as e:
+                    self._print_result(i, questions, error=e)
+                else:
+                    self._print_result(i, questions, hits=search_results[i])
+        
+        self._print_summary()
+        return [hit for hits in search_results for hit in hits]
+    
+    async def asearch_multiple(
+        self,
+        questions: List[str],
+        question_ids: Optional[List[int]] = None
+    ) -> List[SearchHit]:
+        """Async version of ``search_multiple``.
         
+        Searches run as tasks on the event loop, at most
+        ``max_concurrency`` at a time.
+        
+        Args:
+            questions: List of questions to search
+            question_ids: Sub-question index recorded on each question's
+                hits, defaults to the position in ``questions``
+                
+        Returns:
+            Search hits for all questions, in question order
+        """
+        search_results: List[List[SearchHit]] = [[] for _ in questions]
+        question_ids = question_ids or list(range(len(questions)))
+        semaphore = asyncio.Semaphore(self._print_start(len(questions)))
+        
+        async def search_one(i: int, question: str):
+            async with semaphore:
+                try:
+                    hits = await self.asearch(question, question_ids[i])
+                    return i, hits, None
+                except SearchError as e:
+                    return i, [], e
+        
+        for next_done in asyncio.as_completed([
+            search_one(i, question) for i, question in enumerate(questions)
+        ]):
+            i, hits, error = await next_done
+            search_results[i] = hits
+            self._print_result(i, questions, hits=hits, error=error)
+        
+        self._print_summary()
+        return [hit for hits in search_results for hit in hits]
+    
+    def _print_start(self, total: int) -> int:
+        """Print the search header and return the number of workers."""
+        workers = min(self.max_concurrency, max(total, 1))
+        print_section_header("🔍 SEARCHING WEB...")
+        print_progress(
+            f"Running {total} searches on '{self.backend.name}' "
+            f"({workers} concurrent)"
+        )
+        return workers
+    
+    @staticmethod
+    def _print_result(
+        i: int,
+        questions: List[str],
+        hits: Optional[List[SearchHit]] = None,
+        error: Optional[SearchError] = None
+    ) -> None:
+        print_progress(
+            f"[{i + 1}/{len(questions)}] {truncate_text(questions[i])}"
+        )
+        if error is not None:
+            print_progress(
+                f"✗ Search failed: {truncate_text(str(error), 50)}",
+                indent=4
+            )
+            return
+        print_progress(
+            f"✓ {len(hits)} results found "
+            f"({sum(len(hit.snippet) for hit in hits)} chars)",
+            indent=4
+        )
+    
+    def _print_summary(self) -> None:
+        """Print resilience, hedging and cache counters after a search step."""
         print("\n✅ Web search completed")
-        return search_results
+        metrics = self.guard.metrics()
+        if metrics["retries"] or metrics["throttled"] or metrics["failures"]:
+            print_progress(
+                f"⚠️  {metrics['throttled']} throttled, "
+                f"{metrics['retries']} retries, "
+                f"{metrics['failures']} failed searches"
+            )
+        if metrics["circuit_open"]:
+            print_progress(f"⚠️  '{self.backend.name}' circuit is open")
+        if self.hedge is not None and self.hedge.stats["hedged"]:
+            print_progress(
+                f"🏁 Hedged {self.hedge.stats['hedged']} searches, "
+                f"'{self.hedge.secondary.name}' won "
+                f"{self.hedge.stats['secondary_wins']}"
+            )
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print_progress(
+                f"💾 Cache: {stats['hits']} hits, {stats['misses']} misses"
+            )
+        if self.semantic_cache is not None:
+            stats = self.semantic_cache.stats()
+            print_progress(
+                f"🧭 Semantic cache: {stats['hits']} hits, "
+                f"{stats['misses']} misses"
+            )
     
     def search_from_state(self, state: ResearchState) -> ResearchState:
         """Perform web searches using questions from state.
@@ -68,3 +380,17 @@ class WebSearchTool:
         search_results = self.search_multiple(sub_questions)
         state["search_results"] = search_results
         return state
+    
+    async def asearch_from_state(self, state: ResearchState) -> ResearchState:
+        """Async version of ``search_from_state``.
+        
+        Args:
+            state: Current research state
+            
+        Returns:
+            Updated research state with search results
+        """
+        state["search_results"] = await self.asearch_multiple(
+            state["sub_questions"]
+        )
+        return state
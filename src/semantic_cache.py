@@ -0,0 +1,327 @@
+"""
+Semantic search cache that reuses results for paraphrased sub-questions.
+
+Questions are embedded locally with a hashing vectorizer (no model
+download, no network) and compared by cosine similarity against a
+NumPy matrix of previously searched questions. Only questions with the
+same numbers and names are compared, since the vectors barely tell
+"in 2023" from "in 2024".
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .config import Config
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how in is it its "
+    "of on or that the their there these this to was were what when where "
+    "which who why will with about into exist exists".split()
+)
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ments", "ment", "ings", "ing", "ies", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+            break
+    return Config.SEMANTIC_CACHE_SYNONYMS.get(word, word)
+
+
+def terms(text: str) -> List[str]:
+    """Return the normalized content words of a text.
+    
+    Args:
+        text: Text to split
+        
+    Returns:
+        Stemmed words without stopwords, in text order
+    """
+    return [
+        _stem(word) for word in re.findall(r"\w+", text.lower())
+        if word not in STOPWORDS
+    ]
+
+
+def key_terms(text: str) -> str:
+    """Return the terms two questions must share to be compared.
+    
+    These are numbers (years, versions, quarters) and names, i.e. words
+    capitalized after the first one and acronyms.
+    
+    Args:
+        text: Question text
+        
+    Returns:
+        Sorted, lowercased key terms joined by spaces
+    """
+    words = re.findall(r"\w+", text)
+    keys = {
+        word.lower() for i, word in enumerate(words)
+        if any(c.isdigit() for c in word)
+        or (i and not word.islower())
+        or (len(word) > 1 and word.isupper())
+    }
+    return " ".join(sorted(keys))
+
+
+def features(text: str) -> List[str]:
+    """Return the hashed features of a question.
+    
+    Features are normalized content words plus their character trigrams,
+    so small wording changes still share most features.
+    
+    Args:
+        text: Question text
+        
+    Returns:
+        List of feature strings
+    """
+    words = terms(text)
+    grams = []
+    for word in words:
+        padded = f"#{word}#"
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return [f"w:{word}" for word in words] * 2 + [f"c:{gram}" for gram in grams]
+
+
+class HashingEmbedder:
+    """Maps text to L2-normalized hashed feature vectors."""
+    
+    def __init__(self, dim: int = Config.SEMANTIC_CACHE_DIM):
+        """Initialize the embedder.
+        
+        Args:
+            dim: Vector dimension
+        """
+        self.dim = dim
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a text.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            ``float32`` vector of length ``dim`` with unit norm (or zero)
+        """
+        vector = np.zeros(self.dim, dtype=np.float32)
+        feature_list = features(text)
+        if not feature_list:
+            return vector
+        
+        digests = np.frombuffer(
+            b"".join(
+                hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest()
+                for f in feature_list
+            ),
+            dtype="<u8"
+        )
+        indices = (digests % np.uint64(self.dim)).astype(np.int64)
+        signs = np.where(digests >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, indices, signs)
+        
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Persistent nearest-neighbour cache of search results by question."""
+    
+    def __init__(
+        self,
+        path: str = Config.SEMANTIC_CACHE_PATH,
+        threshold: float = Config.SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = Config.SEARCH_CACHE_TTL,
+        max_entries: int = Config.SEARCH_CACHE_MAX_ENTRIES,
+        embedder: Optional[HashingEmbedder] = None
+    ):
+        """Open the cache and load unexpired vectors into memory.
+        
+        Args:
+            path: Path to the SQLite database file
+            threshold: Minimum cosine similarity for a hit, among cached
+                questions with the same ``key_terms``
+            ttl: Time-to-live for entries in seconds
+            max_entries: Maximum number of entries; oldest are evicted
+            embedder: Question embedder
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = embedder or HashingEmbedder()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id INTEGER PRIMARY KEY, "
+            "namespace TEXT NOT NULL, "
+            "question TEXT NOT NULL, "
+            "vector BLOB NOT NULL, "
+            "results TEXT NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "DELETE FROM questions WHERE expires_at < ?", (time.time(),)
+        )
+        self._conn.commit()
+        self._load()
+    
+    def lookup(
+        self,
+        question: str,
+        namespace: str = ""
+    ) -> Optional[Tuple[str, List[dict]]]:
+        """Return results of the most similar cached question.
+        
+        Args:
+            question: Question about to be searched
+            namespace: Backend name, so backends never share entries
+            
+        Returns:
+            Tuple of (matched question, hit records), or None on a miss
+        """
+        vector = self.embedder.embed(question)
+        keys = key_terms(question)
+        with self._lock:
+            if self._size:
+                similarities = self._matrix[:self._size] @ vector
+                similarities[self._namespaces[:self._size] != namespace] = -1
+                similarities[self._keys[:self._size] != keys] = -1
+                similarities[self._expires[:self._size] < time.time()] = -1
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    row = self._conn.execute(
+                        "SELECT question, results FROM questions WHERE id = ?",
+                        (int(self._ids[best]),)
+                    ).fetchone()
+                    if row is not None:
+                        self.hits += 1
+                        return row[0], json.loads(row[1])
+            self.misses += 1
+            return None
+    
+    def add(self, question: str, results: List[dict], namespace: str = "") -> None:
+        """Store the results of a searched question.
+        
+        Args:
+            question: Searched question
+            results: Hit records (``SearchHit.to_dict()``)
+            namespace: Backend name, so backends never share entries
+        """
+        vector = self.embedder.embed(question)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO questions "
+                "(namespace, question, vector, results, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    question,
+                    vector.tobytes(),
+                    json.dumps(results, separators=(",", ":")),
+                    expires_at
+                )
+            )
+            self._append(
+                cursor.lastrowid, namespace, key_terms(question), vector,
+                expires_at
+            )
+            
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM questions WHERE id IN "
+                    "(SELECT id FROM questions ORDER BY id ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._conn.commit()
+                self._load_locked()
+            else:
+                self._conn.commit()
+    
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM questions")
+            self._conn.commit()
+            self._load_locked()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        """Return hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._size
+        }
+    
+    def _load(self) -> None:
+        with self._lock:
+            self._load_locked()
+    
+    def _load_locked(self) -> None:
+        rows = self._conn.execute(
+            "SELECT id, namespace, question, vector, expires_at "
+            "FROM questions ORDER BY id"
+        ).fetchall()
+        capacity = max(64, len(rows) * 2)
+        self._matrix = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._namespaces = np.empty(capacity, dtype=object)
+        self._keys = np.empty(capacity, dtype=object)
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        self._size = 0
+        for row_id, namespace, question, blob, expires_at in rows:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if vector.shape[0] == self.embedder.dim:
+                self._append(
+                    row_id, namespace, key_terms(question), vector, expires_at
+                )
+    
+    def _append(
+        self,
+        row_id: int,
+        namespace: str,
+        keys: str,
+        vector: np.ndarray,
+        expires_at: float
+    ) -> None:
+        if self._size == self._matrix.shape[0]:
+            grow = self._matrix.shape[0]
+            self._matrix = np.vstack(
+                [self._matrix, np.zeros_like(self._matrix[:grow])]
+            )
+            self._ids = np.concatenate([self._ids, np.zeros(grow, dtype=np.int64)])
+            self._namespaces = np.concatenate(
+                [self._namespaces, np.empty(grow, dtype=object)]
+            )
+            self._keys = np.concatenate(
+                [self._keys, np.empty(grow, dtype=object)]
+            )
+            self._expires = np.concatenate([self._expires, np.zeros(grow)])
+        self._matrix[self._size] = vector
+        self._ids[self._size] = row_id
+        self._namespaces[self._size] = namespace
+        self._keys[self._size] = keys
+        self._expires[self._size] = expires_at
+        self._size += 1
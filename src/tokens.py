@@ -0,0 +1,113 @@
+"""
+Local token counting for prompt budgeting.
+
+Uses ``tiktoken`` when it is installed and its encoding file is already
+in tiktoken's local cache, and falls back to ``estimate_tokens``
+otherwise, so counting never needs the network. Point
+``TIKTOKEN_CACHE_DIR`` at a directory holding the downloaded files to
+count exactly offline.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from .utils import estimate_tokens
+
+# Where tiktoken downloads an encoding's BPE file from
+BPE_URL = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+
+_ENCODINGS: Dict[str, object] = {}
+_ENCODINGS_LOCK = threading.Lock()
+
+
+def _bpe_cached(encoding_name: str) -> bool:
+    """Return whether tiktoken can load an encoding without downloading.
+    
+    Mirrors the cache lookup of ``tiktoken.load.read_file_cached``.
+    """
+    if "TIKTOKEN_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["TIKTOKEN_CACHE_DIR"]
+    elif "DATA_GYM_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["DATA_GYM_CACHE_DIR"]
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return False
+    url = BPE_URL.format(encoding_name)
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return os.path.exists(os.path.join(cache_dir, key))
+
+
+def get_encoding(model: str) -> Optional[object]:
+    """Return the tiktoken encoding of a model, or None if unavailable.
+    
+    The result is cached per model, including failures, so a missing
+    package or encoding file is only looked up once per process. An
+    encoding that is not in tiktoken's local cache counts as missing
+    instead of being downloaded.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        tiktoken ``Encoding`` or None
+    """
+    with _ENCODINGS_LOCK:
+        if model not in _ENCODINGS:
+            try:
+                import tiktoken
+                try:
+                    name = tiktoken.encoding_name_for_model(model)
+                except KeyError:
+                    name = "cl100k_base"
+                encoding = (
+                    tiktoken.get_encoding(name) if _bpe_cached(name) else None
+                )
+            except Exception:
+                encoding = None
+            _ENCODINGS[model] = encoding
+        return _ENCODINGS[model]
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """Count the tokens of a text for a model.
+    
+    Args:
+        text: Text to measure
+        model: Model name
+        
+    Returns:
+        Token count (estimated if no tokenizer is available)
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "") -> str:
+    """Cut a text down to at most ``max_tokens`` tokens.
+    
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum number of tokens kept
+        model: Model name
+        
+    Returns:
+        Truncated text, ending with "..." if anything was cut
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding(model)
+    if encoding is None:
+        if estimate_tokens(text) <= max_tokens:
+            return text
+        return text[:max(0, max_tokens * 4 - 3)].rstrip() + "..."
+    
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max(0, max_tokens - 1)]).rstrip() + "..."
@@ -0,0 +1,136 @@
+"""
+Tracing modes for the workflow: LangSmith, a local span sink, or off.
+
+``traceable`` replaces ``langsmith.traceable`` on the nodes and only
+wraps a call in a LangSmith run while LangSmith tracing is on, so with
+tracing off a node call costs a flag check instead of building a run.
+Until ``configure_tracing`` picks a mode, the check reads LangSmith's
+environment variables on each call, so library users can turn tracing
+on after importing the package.
+In "local" mode ``configure_tracing`` installs a
+``local_tracing.LocalTracer`` for every run. LangSmith and LangChain are
+imported only once a mode needs them, so importing this module is cheap.
+"""
+
+import atexit
+import functools
+import inspect
+import os
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from .config import Config
+
+TRACING_MODES = ("langsmith", "local", "off")
+
+# Environment variables LangSmith reads, in the order it checks them
+_LANGSMITH_ENV = (
+    "LANGSMITH_TRACING_V2", "LANGCHAIN_TRACING_V2",
+    "LANGSMITH_TRACING", "LANGCHAIN_TRACING"
+)
+
+_local_tracer: ContextVar[Optional["LocalTracer"]] = ContextVar(
+    "local_tracer", default=None
+)
+_hook_registered = False
+
+
+def _langsmith_env_enabled() -> bool:
+    for name in _LANGSMITH_ENV:
+        value = os.getenv(name)
+        if value is not None:
+            return value.lower() == "true"
+    return False
+
+
+# Set by configure_tracing; None means follow the environment
+_langsmith_enabled: Optional[bool] = None
+
+
+def _langsmith_on() -> bool:
+    enabled = _langsmith_enabled
+    return _langsmith_env_enabled() if enabled is None else enabled
+
+
+def traceable(**kwargs) -> Callable:
+    """Decorator like ``langsmith.traceable`` that is free while it is off.
+    
+    Args:
+        **kwargs: ``langsmith.traceable`` arguments, e.g. ``run_type``
+        
+    Returns:
+        Decorator for sync and async functions
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.lru_cache(maxsize=None)
+        def traced() -> Callable:
+            from langsmith.run_helpers import traceable as langsmith_traceable
+            return langsmith_traceable(**kwargs)(func)
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kw):
+                if _langsmith_on():
+                    return await traced()(*args, **kw)
+                return await func(*args, **kw)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kw):
+            if _langsmith_on():
+                return traced()(*args, **kw)
+            return func(*args, **kw)
+        return wrapper
+    return decorator
+
+
+def configure_tracing(
+    mode: str = Config.TRACING_MODE,
+    path: str = Config.TRACE_PATH,
+    **options
+) -> Optional["LocalTracer"]:
+    """Select the tracing mode for the rest of the process.
+    
+    Call after ``Config.setup_environment``. Any previous local tracer
+    is flushed and closed.
+    
+    Args:
+        mode: "langsmith", "local" or "off"
+        path: Span sink of the local mode; ".jsonl" files get JSON
+            lines, any other path a SQLite database
+        **options: ``LocalTracer`` arguments, e.g. ``sample_rate``
+        
+    Returns:
+        The local tracer in "local" mode, otherwise None
+    """
+    global _hook_registered, _langsmith_enabled
+    if mode not in TRACING_MODES:
+        raise ValueError(
+            f"Unknown tracing mode '{mode}'. "
+            f"Available: {', '.join(TRACING_MODES)}"
+        )
+    
+    previous = _local_tracer.get()
+    if previous is not None:
+        previous.close()
+        _local_tracer.set(None)
+    
+    if mode != "langsmith":
+        os.environ["LANGCHAIN_TRACING_V2"] = "false"
+        os.environ["LANGSMITH_TRACING"] = "false"
+    _langsmith_enabled = mode == "langsmith" and _langsmith_env_enabled()
+    
+    if mode != "local":
+        return None
+    from langchain_core.tracers.context import register_configure_hook
+    from .local_tracing import LocalTracer, create_sink
+    
+    if not _hook_registered:
+        # Adds the active local tracer to every callback manager, the
+        # same way LangChain adds its LangSmith tracer
+        register_configure_hook(_local_tracer, inheritable=True)
+        _hook_registered = True
+    tracer = LocalTracer(create_sink(path), **options)
+    _local_tracer.set(tracer)
+    atexit.register(tracer.close)
+    return tracer
@@ -2,7 +2,7 @@
 Utility functions for the Deep Research Agent.
 """
 
-from typing import List, Optional
+from typing import List, Optional, TextIO
 
 
 def print_section_header(title: str, width: int = 60) -> None:
@@ -74,17 +74,14 @@ def save_report_to_file(
         True if save was successful, False otherwise
     """
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# Research Report\n\n")
-            f.write(f"**Query:** {query}\n\n")
-            f.write(f"**Configuration:**\n")
-            f.write(f"- Model: {model_name}\n")
-            f.write(f"- Sub-questions: {num_sub_questions}\n")
-            f.write(f"- Max iterations: {max_iterations}\n\n")
-            f.write(f"## Sub-Questions\n\n")
-            for i, q in enumerate(sub_questions, 1):
-                f.write(f"{i}. {q}\n")
-            f.write(f"\n## Report\n\n")
+        with open_report_file(
+            filename,
+            query,
+            sub_questions,
+            model_name,
+            num_sub_questions,
+            max_iterations
+        ) as f:
             f.write(report)
         return True
     except Exception as e:
@@ -92,6 +89,42 @@ def save_report_to_file(
         return False
 
 
+def open_report_file(
+    filename: str,
+    query: str,
+    sub_questions: List[str],
+    model_name: str,
+    num_sub_questions: int,
+    max_iterations: int
+) -> TextIO:
+    """Create a report file and write everything before the report body.
+    
+    Args:
+        filename: Name of the file to create
+        query: The research query
+        sub_questions: List of sub-questions
+        model_name: Name of the model used
+        num_sub_questions: Number of sub-questions
+        max_iterations: Maximum iterations used
+        
+    Returns:
+        Open file, positioned where the report body goes
+    """
+    f = open(filename, 'w', encoding='utf-8')
+    f.write(f"# Research Report\n\n")
+    f.write(f"**Query:** {query}\n\n")
+    f.write(f"**Configuration:**\n")
+    f.write(f"- Model: {model_name}\n")
+    f.write(f"- Sub-questions: {num_sub_questions}\n")
+    f.write(f"- Max iterations: {max_iterations}\n\n")
+    f.write(f"## Sub-Questions\n\n")
+    for i, q in enumerate(sub_questions, 1):
+        f.write(f"{i}. {q}\n")
+    f.write(f"\n## Report\n\n")
+    f.flush()
+    return f
+
+
 def validate_input_range(
     value: str,
     min_val: int,
@@ -139,6 +172,18 @@ def truncate_text(text: str, max_length: int = 60) -> str:
     return text[:max_length] + "..."
 
 
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a text.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Approximate token count (about four characters per token)
+    """
+    return (len(text) + 3) // 4
+
+
 def clean_questions(questions: List[str], min_length: int = 10) -> List[str]:
     """Clean and filter list of questions.
     
@@ -1,12 +1,41 @@
 
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, TypeVar
+
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableLambda
 
+from .cache import PageCache, SearchCache
+from .checkpoint import SQLiteCheckpointer
 from .config import Config
-from .models import ResearchState
+from .context_packer import ContextPacker
+from .fetcher import PageFetcher
+from .llm_cache import LLMCache
+from .metrics import MetricsRegistry, cache_samples, guard_samples
+from .models import ANALYSIS_MODES, ResearchState
 from .nodes import WorkflowNodes
+from .reflection import create_strategy
+from .search_backends import create_backend
+from .semantic_cache import SemanticCache
 from .search_tool import WebSearchTool
 
+T = TypeVar("T")
+
+
+@dataclass
+class SharedCaches:
+    """Cache instances shared by several builders.
+    
+    Empty fields are filled by the first builder that needs the cache,
+    so later builders reuse the same connections.
+    """
+    search_cache: Optional[SearchCache] = None
+    semantic_cache: Optional[SemanticCache] = None
+    page_cache: Optional[PageCache] = None
+    llm_cache: Optional[LLMCache] = None
+    checkpointer: Optional[SQLiteCheckpointer] = None
+
 
 class WorkflowBuilder:
     
@@ -18,7 +47,22 @@ class WorkflowBuilder:
         question_prompt: str,
         analysis_prompt: str,
         reflection_prompt: str,
-        report_prompt: str
+        report_prompt: str,
+        use_search_cache: bool = Config.SEARCH_CACHE_ENABLED,
+        search_backend: str = Config.SEARCH_BACKEND,
+        fetch_pages: bool = Config.FETCH_PAGES_ENABLED,
+        use_llm_cache: bool = Config.LLM_CACHE_ENABLED,
+        node_models: Optional[Dict[str, dict]] = None,
+        stream: bool = Config.STREAM_LLM_OUTPUT,
+        report_path: Optional[str] = None,
+        caches: Optional[SharedCaches] = None,
+        reflection_strategy: str = Config.REFLECTION_STRATEGY,
+        reflection_fallback: bool = Config.REFLECTION_LLM_FALLBACK,
+        analysis_mode: str = Config.ANALYSIS_MODE,
+        analysis_concurrency: int = Config.ANALYSIS_MAX_CONCURRENCY,
+        speculative_report: bool = Config.SPECULATIVE_REPORT,
+        checkpoints: bool = Config.CHECKPOINT_ENABLED,
+        metrics: Optional[MetricsRegistry] = None
     ):
         """
         
@@ -30,7 +74,40 @@ class WorkflowBuilder:
             analysis_prompt: System prompt for analysis
             reflection_prompt: System prompt for reflection
             report_prompt: System prompt for report generation
+            use_search_cache: Whether to serve repeated or paraphrased
+                searches from the persistent search caches
+            search_backend: Name of the registered search backend
+            fetch_pages: Whether to fetch the top pages of each sub-question
+                after searching
+            use_llm_cache: Whether to serve repeated model calls from the
+                persistent LLM cache
+            node_models: Per-node model settings, defaults to
+                ``Config.NODE_MODELS``
+            stream: Whether to print model output token by token
+            report_path: File the final report is written to as it is
+                generated
+            caches: Caches shared with other builders, or None to open
+                new ones
+            reflection_strategy: Registered reflection strategy, or "llm"
+                to always ask the model
+            reflection_fallback: Whether to ask the model when the
+                reflection strategy is unsure
+            analysis_mode: "single" for one analysis prompt, "map_reduce"
+                for parallel per-sub-question analyses that are merged,
+                "pipelined" to also start each analysis as soon as its
+                sub-question's search finishes
+            analysis_concurrency: Maximum parallel branches in
+                "map_reduce" and "pipelined" mode
+            speculative_report: Whether to generate the report while the
+                model reflects, discarding it if reflection finds gaps
+            checkpoints: Whether to checkpoint every node so failed runs
+                can be resumed; runs then need a thread id, see
+                ``checkpoint.run_config``
+            metrics: Registry for node, model and search metrics, shared
+                with other builders, or None for a new one
         """
+        if analysis_mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode '{analysis_mode}'")
         self.model_name = model_name
         self.num_sub_questions = num_sub_questions
         self.max_iterations = max_iterations
@@ -38,6 +115,65 @@ class WorkflowBuilder:
         self.analysis_prompt = analysis_prompt
         self.reflection_prompt = reflection_prompt
         self.report_prompt = report_prompt
+        self.use_search_cache = use_search_cache
+        self.search_backend = search_backend
+        self.fetch_pages = fetch_pages
+        self.caches = caches
+        self.llm_cache = (
+            self._cache("llm_cache", LLMCache) if use_llm_cache else None
+        )
+        self.node_models = (
+            Config.NODE_MODELS if node_models is None else node_models
+        )
+        self.stream = stream
+        self.report_path = report_path
+        self.reflection_strategy = reflection_strategy
+        self.reflection_fallback = reflection_fallback
+        self.analysis_mode = analysis_mode
+        self.analysis_concurrency = max(1, analysis_concurrency)
+        self.speculative_report = speculative_report
+        self.checkpointer = (
+            self._cache("checkpointer", SQLiteCheckpointer)
+            if checkpoints else None
+        )
+        self.metrics = metrics or MetricsRegistry()
+        self.nodes: Optional[WorkflowNodes] = None
+    
+    def _cache(self, name: str, factory: Callable[[], T]) -> T:
+        """Return a shared cache, creating it on first use."""
+        if self.caches is None:
+            return factory()
+        if getattr(self.caches, name) is None:
+            setattr(self.caches, name, factory())
+        return getattr(self.caches, name)
+    
+    def create_llm(self, settings: Optional[dict] = None) -> BaseChatModel:
+        """Create a chat model from per-node settings.
+        
+        Args:
+            settings: Optional "model", "temperature", "max_tokens",
+                "base_url" and "api_key" overrides
+                
+        Returns:
+            Chat model instance
+        """
+        # The OpenAI client takes most of the import time, so it is only
+        # loaded once a real model is needed
+        from langchain_openai import ChatOpenAI
+        
+        settings = settings or {}
+        kwargs = {
+            "model": settings.get("model", self.model_name),
+            "api_key": settings.get("api_key") or Config.get_openai_api_key(),
+            "temperature": settings.get(
+                "temperature", Config.DEFAULT_TEMPERATURE
+            )
+        }
+        if settings.get("max_tokens") is not None:
+            kwargs["max_tokens"] = settings["max_tokens"]
+        if settings.get("base_url"):
+            kwargs["base_url"] = settings["base_url"]
+        return ChatOpenAI(**kwargs)
     
     def build(self):
         """
@@ -45,16 +181,33 @@ class WorkflowBuilder:
         Returns:
             Compiled workflow graph
         """
-
-        llm = ChatOpenAI(
-            model=self.model_name,
-            api_key=Config.get_openai_api_key(),
-            temperature=Config.DEFAULT_TEMPERATURE
-        )
         
-        search_tool = WebSearchTool()
+        llm = self.create_llm()
+        node_llms = {
+            node: self.create_llm(settings)
+            for node, settings in self.node_models.items()
+            if settings
+        }
+        
+        hedging = Config.SEARCH_HEDGING.get(self.search_backend)
+        search_tool = WebSearchTool(
+            backend=create_backend(self.search_backend),
+            cache=(
+                self._cache("search_cache", SearchCache)
+                if self.use_search_cache else None
+            ),
+            hedge_backend=(
+                create_backend(hedging["secondary"]) if hedging else None
+            ),
+            semantic_cache=(
+                self._cache("semantic_cache", SemanticCache)
+                if self.use_search_cache and Config.SEMANTIC_CACHE_ENABLED
+                else None
+            ),
+            metrics=self.metrics
+        )
         
-        nodes = WorkflowNodes(
+        nodes = self.nodes = WorkflowNodes(
             llm=llm,
             search_tool=search_tool,
             num_sub_questions=self.num_sub_questions,
@@ -62,31 +215,147 @@ class WorkflowBuilder:
             question_prompt=self.question_prompt,
             analysis_prompt=self.analysis_prompt,
             reflection_prompt=self.reflection_prompt,
-            report_prompt=self.report_prompt
+            report_prompt=self.report_prompt,
+            page_fetcher=PageFetcher(
+                cache=(
+                    self._cache("page_cache", PageCache)
+                    if self.use_search_cache else None
+                )
+            ) if self.fetch_pages else None,
+            llm_cache=self.llm_cache,
+            node_llms=node_llms,
+            context_packer=ContextPacker(
+                self.node_models.get("analyze_context", {}).get(
+                    "model", self.model_name
+                )
+            ) if Config.CONTEXT_PACKING_ENABLED else None,
+            stream=self.stream,
+            report_path=self.report_path,
+            reflection=(
+                None if self.reflection_strategy == "llm"
+                else create_strategy(self.reflection_strategy)
+            ),
+            reflection_fallback=self.reflection_fallback,
+            speculative_report=self.speculative_report,
+            metrics=self.metrics
         )
+        self._register_collectors()
         
         workflow = StateGraph(ResearchState)
         
-        workflow.add_node("generate_sub_questions", nodes.generate_sub_questions)
-        workflow.add_node("search_web", nodes.search_web)
-        workflow.add_node("analyze_context", nodes.analyze_context)
-        workflow.add_node("generate_report", nodes.generate_report)
+        # Each node has a sync and an async implementation, so the compiled
+        # graph supports both invoke and ainvoke
+        def node(name: str) -> RunnableLambda:
+            return RunnableLambda(
+                self.metrics.timed(getattr(nodes, name), name),
+                afunc=self.metrics.atimed(getattr(nodes, f"a{name}"), name),
+                name=name
+            )
         
+        workflow.add_node(
+            "generate_sub_questions", node("generate_sub_questions")
+        )
+        workflow.add_node("generate_report", node("generate_report"))
         workflow.set_entry_point("generate_sub_questions")
         
-        workflow.add_edge("generate_sub_questions", "search_web")
-        workflow.add_edge("search_web", "analyze_context")
+        if self.analysis_mode == "pipelined":
+            # research_question searches and analyzes one sub-question per
+            # branch, so each analysis starts as soon as its search is done
+            workflow.add_node("research_question", node("research_question"))
+            workflow.add_conditional_edges(
+                "generate_sub_questions",
+                nodes.fan_out_research,
+                ["research_question"]
+            )
+            stages = ["research_question"]
+        else:
+            # search_web -> [fetch_pages] -> [deduplicate_results] -> analysis
+            workflow.add_node("search_web", node("search_web"))
+            workflow.add_edge("generate_sub_questions", "search_web")
+            stages = ["search_web"]
+            if self.fetch_pages:
+                workflow.add_node("fetch_pages", node("fetch_pages"))
+                stages.append("fetch_pages")
+            if Config.DEDUP_ENABLED:
+                workflow.add_node(
+                    "deduplicate_results", node("deduplicate_results")
+                )
+                stages.append("deduplicate_results")
+            for source, target in zip(stages, stages[1:]):
+                workflow.add_edge(source, target)
+        
+        if self.analysis_mode == "single":
+            workflow.add_node("analyze_context", node("analyze_context"))
+            workflow.add_edge(stages[-1], "analyze_context")
+            workflow.add_conditional_edges(
+                "search_gaps",
+                nodes.after_gap_search,
+                {
+                    "analyze_context": "analyze_context",
+                    "generate_report": "generate_report"
+                }
+            )
+            analysis = "analyze_context"
+        else:
+            # analyze_question runs once per sub-question in parallel, then
+            # merge_analyses combines the partial analyses
+            workflow.add_node("analyze_question", node("analyze_question"))
+            workflow.add_node("merge_analyses", node("merge_analyses"))
+            if self.analysis_mode == "pipelined":
+                workflow.add_edge("research_question", "merge_analyses")
+            else:
+                workflow.add_conditional_edges(
+                    stages[-1],
+                    nodes.fan_out_analysis,
+                    ["analyze_question", "generate_report"]
+                )
+            workflow.add_conditional_edges(
+                "search_gaps",
+                nodes.fan_out_analysis,
+                ["analyze_question", "generate_report"]
+            )
+            workflow.add_edge("analyze_question", "merge_analyses")
+            analysis = "merge_analyses"
+        
+        # analysis -> reflect_on_analysis -> [search_gaps -> analysis ...]
+        # -> generate_report; follow-up passes only search and analyze the
+        # gaps reflection found
+        workflow.add_node("reflect_on_analysis", node("reflect_on_analysis"))
+        workflow.add_node("search_gaps", node("search_gaps"))
+        workflow.add_edge(analysis, "reflect_on_analysis")
         workflow.add_conditional_edges(
-            "analyze_context",
-            nodes.reflect_on_analysis,
+            "reflect_on_analysis",
+            nodes.after_reflection,
             {
-                "analyze_context": "analyze_context",
+                "search_gaps": "search_gaps",
                 "generate_report": "generate_report"
             }
         )
         workflow.add_edge("generate_report", END)
         
-        return workflow.compile()
+        app = workflow.compile(checkpointer=self.checkpointer)
+        if self.analysis_mode != "single":
+            app = app.with_config(max_concurrency=self.analysis_concurrency)
+        return app
+    
+    def _register_collectors(self) -> None:
+        """Export the counters of the search guard and caches in use."""
+        guard = self.nodes.search_tool.guard
+        self.metrics.add_collector(
+            f"guard:{guard.name}", lambda: guard_samples(guard)
+        )
+        caches = {
+            "search": self.nodes.search_tool.cache,
+            "semantic": self.nodes.search_tool.semantic_cache,
+            "page": getattr(self.nodes.page_fetcher, "cache", None),
+            "llm": self.llm_cache
+        }
+        for name, cache in caches.items():
+            if cache is not None:
+                self.metrics.add_collector(
+                    f"cache:{name}",
+                    lambda name=name, cache=cache: cache_samples(name, cache)
+                )
     
     @staticmethod
     def create_initial_state(query: str) -> ResearchState:
@@ -103,6 +372,11 @@ class WorkflowBuilder:
             "sub_questions": [],
             "search_results": [],
             "analysis": "",
+            "previous_analysis": "",
+            "gaps": [],
+            "new_results": [],
+            "partial_analyses": {},
+            "question_results": {},
             "report": "",
             "iteration": 0
         }
@@ -0,0 +1,95 @@
+"""
+Tests for batch input loading.
+"""
+
+import json
+import re
+
+import pytest
+
+from src.batch import load_items
+from src.config import Config
+
+DEFAULTS = {
+    "model": Config.DEFAULT_MODEL,
+    "num_sub_questions": Config.DEFAULT_NUM_SUB_QUESTIONS,
+    "max_iterations": Config.DEFAULT_MAX_ITERATIONS,
+    "backend": Config.SEARCH_BACKEND,
+    "fetch_pages": False
+}
+
+
+def write_lines(tmp_path, *records):
+    path = tmp_path / "queries.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in records))
+    return str(path)
+
+
+def test_settings_default_and_override(tmp_path):
+    path = write_lines(
+        tmp_path,
+        {"query": "first"},
+        {"id": "two", "query": "second", "num_sub_questions": 2}
+    )
+    
+    first, second = load_items(path, DEFAULTS)
+    
+    assert first.settings == DEFAULTS
+    assert second.id == "two"
+    assert second.settings["num_sub_questions"] == 2
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("num_sub_questions", "3"),
+    ("num_sub_questions", 3.0),
+    ("max_iterations", True),
+    ("model", 4),
+    ("backend", None),
+    ("fetch_pages", "yes"),
+])
+def test_wrong_setting_type_names_file_and_line(tmp_path, setting, value):
+    path = write_lines(tmp_path, {"query": "ok"}, {"query": "q", setting: value})
+    
+    with pytest.raises(ValueError, match=re.escape(f"{path}:2: {setting} must be")):
+        load_items(path, DEFAULTS)
+
+
+def test_query_must_be_a_string(tmp_path):
+    path = write_lines(tmp_path, {"query": ["a", "b"]})
+    
+    message = f"{path}:1: query must be a string"
+    with pytest.raises(ValueError, match=re.escape(message)):
+        load_items(path, DEFAULTS)
+
+
+@pytest.mark.parametrize("item_id", [
+    "../escape", "reports/q1", "..", "q1\\evil", "C:q1", "what?", "tab\there",
+    " padded", "trailing.",
+])
+def test_unsafe_id_is_rejected(tmp_path, item_id):
+    path = write_lines(
+        tmp_path, {"id": "ok", "query": "q"}, {"id": item_id, "query": "q"}
+    )
+    
+    message = f"{path}:2: id '{item_id}' is not a valid file name"
+    with pytest.raises(ValueError, match=re.escape(message)):
+        load_items(path, DEFAULTS)
+
+
+def test_safe_ids_are_kept(tmp_path):
+    path = write_lines(
+        tmp_path, {"id": "q-1_v2.final", "query": "q"}, {"query": "a/b? c"}
+    )
+    
+    first, second = load_items(path, DEFAULTS)
+    
+    assert first.id == "q-1_v2.final"
+    # Derived ids are slugs, so they are always safe
+    assert second.id.startswith("a-b-c-")
+
+
+def test_out_of_range_setting_is_rejected(tmp_path):
+    path = write_lines(tmp_path, {"query": "q", "num_sub_questions": 1000})
+    
+    with pytest.raises(ValueError, match="num_sub_questions out of range"):
+        load_items(path, DEFAULTS)
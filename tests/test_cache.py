@@ -0,0 +1,85 @@
+"""
+Tests for the SQLite caches: TTL expiry and LRU and size eviction.
+"""
+
+import types
+
+import pytest
+
+from src import cache as cache_module
+from src.cache import SearchCache, SQLiteCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(
+        cache_module, "time", types.SimpleNamespace(time=clock.time)
+    )
+    return clock
+
+
+def make_cache(tmp_path, **options):
+    settings = dict(ttl=60, max_entries=100)
+    settings.update(options)
+    return SQLiteCache(str(tmp_path / "cache.db"), **settings)
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.set("default", "a")
+    cache.set("short", "b", ttl=5)
+    
+    clock.now += 10
+    assert cache.get("short") is None
+    assert cache.get("default") == "a"
+    
+    clock.now += 60
+    assert cache.get("default") is None
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.set("a", "1")
+    clock.now += 1
+    cache.set("b", "2")
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    
+    cache.set("c", "3")
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_byte_cap_evicts_oldest_values(tmp_path, clock):
+    cache = make_cache(tmp_path, max_bytes=10)
+    cache.set("a", "xxxx")
+    clock.now += 1
+    cache.set("b", "yyyy")
+    clock.now += 1
+    
+    # Multi-byte characters count by encoded size: 3 bytes each
+    cache.set("c", "ééé")
+    
+    assert cache.get("a") is None
+    assert cache.get("b") == "yyyy" and cache.get("c") == "ééé"
+
+
+def test_search_cache_keys_are_normalized_and_namespaced(tmp_path, clock):
+    cache = SearchCache(path=str(tmp_path / "search.db"))
+    cache.set("What is  RUST?", [{"title": "t"}], namespace="ddg")
+    
+    assert cache.get("what is rust", namespace="ddg") == [{"title": "t"}]
+    assert cache.get("what is rust", namespace="tavily") is None
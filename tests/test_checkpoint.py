@@ -0,0 +1,184 @@
+"""
+Tests for the SQLite checkpointer and batch checkpoint threads.
+"""
+
+import asyncio
+import contextlib
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from src import main, workflow
+from src.batch import BatchItem, BatchRunner
+from src.checkpoint import CompressedSerializer, SQLiteCheckpointer, run_config
+from src.config import Config
+from src.fetcher import PageFetcher
+from src.prompts import Prompts
+from src.workflow import SharedCaches
+from tests.test_nodes import ScriptedChatModel, make_builder
+
+
+def checkpointed_run(tmp_path, run_ids, use_async=False):
+    checkpointer = SQLiteCheckpointer(path=str(tmp_path / "checkpoints.db"))
+    builder = make_builder(
+        checkpoints=True, caches=SharedCaches(checkpointer=checkpointer)
+    )
+    app = builder.build()
+    
+    async def run_all():
+        for run_id in run_ids:
+            await app.ainvoke(
+                builder.create_initial_state(run_id), run_config(run_id)
+            )
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        if use_async:
+            asyncio.run(run_all())
+        else:
+            for run_id in run_ids:
+                app.invoke(
+                    builder.create_initial_state(run_id), run_config(run_id)
+                )
+    return checkpointer
+
+
+def test_latest_checkpoint_is_read_with_a_sql_limit(tmp_path):
+    checkpointer = checkpointed_run(tmp_path, ["a"])
+    statements = []
+    checkpointer._conn.set_trace_callback(statements.append)
+    
+    latest = checkpointer.get_tuple(run_config("a"))
+    
+    newest = next(checkpointer.list(run_config("a")))
+    assert latest.config == newest.config
+    assert "LIMIT" in statements[0]
+
+
+def test_list_limit_with_and_without_filter(tmp_path):
+    checkpointer = checkpointed_run(tmp_path, ["a"])
+    every = list(checkpointer.list(run_config("a")))
+    
+    newest_two = list(checkpointer.list(run_config("a"), limit=2))
+    loops = list(
+        checkpointer.list(
+            run_config("a"), filter={"source": "loop"}, limit=2
+        )
+    )
+    
+    assert len(every) > 2
+    assert [c.config for c in newest_two] == [c.config for c in every[:2]]
+    assert len(loops) == 2
+    assert all(c.metadata["source"] == "loop" for c in loops)
+    assert list(checkpointer.list(run_config("a"), limit=0)) == []
+
+
+def test_async_runs_checkpoint_like_sync_runs(tmp_path):
+    checkpointer = checkpointed_run(tmp_path, ["a", "b"], use_async=True)
+    
+    async def latest(run_id):
+        return await checkpointer.aget_tuple(run_config(run_id))
+    
+    for run_id in ("a", "b"):
+        saved = asyncio.run(latest(run_id))
+        assert saved.checkpoint["channel_values"]["report"]
+
+
+def test_compression_is_safe_across_threads():
+    serde = CompressedSerializer(min_size=0)
+    values = [{"text": f"value {i} " * 2000} for i in range(64)]
+    
+    def round_trip(value):
+        return serde.loads_typed(serde.dumps_typed(value))
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(round_trip, values)) == values
+
+
+def test_batch_threads_are_scoped_to_output_and_settings(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    first = BatchRunner(str(tmp_path / "first"))
+    second = BatchRunner(str(tmp_path / "second"))
+    item = BatchItem("q", "query", {"model": "m", "num_sub_questions": 3})
+    edited = BatchItem("q", "other query", item.settings)
+    
+    assert first._thread_id(item) == first._thread_id(item)
+    assert first._thread_id(item) != second._thread_id(item)
+    assert first._thread_id(item) != first._thread_id(edited)
+    assert first._thread_id(item).startswith("batch-q-")
+
+
+class FailingReportModel(ScriptedChatModel):
+    fail_report: bool = False
+    
+    def _result(self, messages):
+        is_report = messages[0].content == Prompts.REPORT_GENERATION
+        if self.fail_report and is_report:
+            raise TimeoutError("report timed out")
+        return super()._result(messages)
+
+
+def test_resume_restores_the_run_settings(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "setup_environment", lambda: None)
+    monkeypatch.setattr(Config, "validate_config", lambda: None)
+    monkeypatch.setattr(main, "get_user_input", lambda: (
+        "topic", "fake-chat", 2, 1, {
+            "question_prompt": Prompts.QUESTION_GENERATION,
+            "analysis_prompt": Prompts.ANALYSIS,
+            "reflection_prompt": Prompts.REFLECTION,
+            "report_prompt": Prompts.REPORT_GENERATION
+        }
+    ))
+    fetched = []
+    monkeypatch.setattr(
+        PageFetcher, "fetch_for_hits",
+        lambda self, hits, top_k: fetched.append(len(hits))
+    )
+    builders = []
+    
+    class RecordingBuilder(workflow.WorkflowBuilder):
+        llm = None
+        
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            builders.append(self)
+        
+        def create_llm(self, settings=None):
+            return self.llm
+    
+    monkeypatch.setattr(workflow, "WorkflowBuilder", RecordingBuilder)
+    flags = ["--no-cache", "--no-llm-cache", "--output", "report.md"]
+    
+    RecordingBuilder.llm = FailingReportModel(
+        latency=0.0, jitter=0.0, fail_report=True
+    )
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        with contextlib.redirect_stderr(io.StringIO()):
+            main.run_research(
+                flags + ["--fetch-pages", "--backend", "test-nodes", "--stream"]
+            )
+    run_id = re.search(r"--resume (\S+)", output.getvalue()).group(1)
+    assert fetched
+    
+    settings = main.load_run(SQLiteCheckpointer(), run_id)
+    assert settings["fetch_pages"] is True
+    assert settings["backend"] == "test-nodes"
+    assert settings["stream"] is True
+    assert settings["speculative_report"] is False
+    
+    # Resumed without the flags, the run still rebuilds the same workflow
+    RecordingBuilder.llm = FailingReportModel(latency=0.0, jitter=0.0)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        main.run_research(flags + ["--resume", run_id])
+    
+    resumed = builders[-1]
+    assert resumed.fetch_pages is True
+    assert resumed.nodes.search_tool.backend.name == "test-nodes"
+    assert resumed.stream is True
+    assert f"Resuming run {run_id} at generate_report" in output.getvalue()
+    assert "Research completed successfully" in output.getvalue()
+    assert (tmp_path / "report.md").exists()
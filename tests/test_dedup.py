@@ -0,0 +1,44 @@
+"""
+Tests for near-duplicate removal of search hits.
+"""
+
+from src.dedup import deduplicate_results
+from src.models import SearchHit
+
+TEXT = "Solid-state batteries replace the liquid electrolyte with a solid one"
+
+
+def hit(snippet, content="", url="https://example.com"):
+    return SearchHit(0, "title", url, snippet, "test", 0.0, content=content)
+
+
+def test_repeated_text_is_removed_and_first_kept():
+    first, repeat = hit(TEXT, url="https://a"), hit(TEXT + ".", url="https://b")
+    other = hit("Sulfide electrolytes react with moisture in the air quickly")
+    
+    kept, stats = deduplicate_results([first, repeat, other])
+    
+    assert kept == [first, other]
+    assert stats["hits"] == 3 and stats["removed"] == 1
+    assert stats["tokens_saved"] > 0
+
+
+def test_short_and_empty_snippets_are_kept():
+    hits = [hit(""), hit(""), hit("See more"), hit("See more")]
+    
+    kept, stats = deduplicate_results(hits)
+    
+    assert kept == hits
+    assert stats["removed"] == 0
+
+
+def test_fetched_content_is_compared_instead_of_the_snippet():
+    page = "Full page text about anode dendrites and how they short cells"
+    same_page = [hit("", content=page), hit("Different teaser", content=page)]
+    different_pages = [
+        hit(TEXT, content=page),
+        hit(TEXT, content="Another article on cathode coatings and cycle life")
+    ]
+    
+    assert len(deduplicate_results(same_page)[0]) == 1
+    assert len(deduplicate_results(different_pages)[0]) == 2
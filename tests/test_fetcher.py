@@ -0,0 +1,121 @@
+"""
+Tests for page fetching against a local HTTP fixture server.
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from src.cache import PageCache
+from src.fetcher import PageFetcher
+from src.models import SearchHit
+
+PAGE = (
+    b"<html><head><script>var tracking = 1;</script></head><body>"
+    b"<nav>Menu</nav><h1>Title</h1><p>Body text.</p></body></html>"
+)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_error(404)
+        elif self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/page")
+            self.end_headers()
+        elif self.path == "/image":
+            self._send(b"\x89PNG\r\n", "image/png")
+        elif self.path == "/slow":
+            # Streams one paragraph every 50 ms for a second
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            for i in range(20):
+                self.wfile.write(f"<p>Part {i}</p>".encode())
+                time.sleep(0.05)
+        else:
+            self._send(PAGE, "text/html; charset=utf-8")
+    
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    fetcher = PageFetcher(
+        timeout=0.3, cache=PageCache(path=str(tmp_path / "pages.db"))
+    )
+    yield fetcher
+    fetcher.close()
+
+
+def test_html_page_is_extracted_and_cached(fetcher, base_url):
+    text = fetcher.fetch(base_url + "/page")
+    
+    assert "Title" in text and "Body text." in text
+    assert "tracking" not in text and "Menu" not in text
+    assert fetcher.cache.get(base_url + "/page") == text
+
+
+def test_redirect_is_followed(fetcher, base_url):
+    assert "Body text." in fetcher.fetch(base_url + "/moved")
+
+
+def test_missing_page_raises(fetcher, base_url):
+    with pytest.raises(httpx.HTTPStatusError):
+        fetcher.fetch(base_url + "/missing")
+
+
+def test_non_html_response_is_skipped(fetcher, base_url):
+    assert fetcher.fetch(base_url + "/image") is None
+    assert fetcher.cache.get(base_url + "/image") is None
+
+
+def test_page_cut_short_by_the_timeout_is_not_cached(fetcher, base_url):
+    text = fetcher.fetch(base_url + "/slow")
+    
+    assert "Part 0" in text and "Part 19" not in text
+    assert fetcher.cache.get(base_url + "/slow") is None
+
+
+def test_fetch_for_hits_counts_fetched_and_skipped(fetcher, base_url, capsys):
+    paths = ["/page", "/moved", "/image", "/missing", "/slow"]
+    hits = [
+        SearchHit(0, path, base_url + path, "", "fixture", 0.0)
+        for path in paths
+    ]
+    hits.append(SearchHit(0, "local", "corpus/doc.md", "", "local", 0.0))
+    
+    fetched = fetcher.fetch_for_hits(hits, top_k=len(hits))
+    
+    assert fetched == 3
+    assert "Fetched 3/5 pages, 1 skipped" in capsys.readouterr().out
+    assert hits[0].content and hits[1].content == hits[0].content
+    assert not hits[2].content and not hits[3].content
+    
+    for hit in hits:
+        hit.content = ""
+    fetcher.cache.clear()
+    assert asyncio.run(fetcher.afetch_for_hits(hits, top_k=len(hits))) == 3
+    assert "Fetched 3/5 pages, 1 skipped" in capsys.readouterr().out
+    assert fetcher.cache.get(base_url + "/slow") is None
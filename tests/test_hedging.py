@@ -0,0 +1,188 @@
+"""
+Tests for hedged search across a primary and a secondary backend.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from src.cache import SearchCache
+from src.config import Config
+from src.hedging import HedgedSearch
+from src.resilience import SearchError, get_guard
+from src.search_backends import SearchBackend
+from src.search_tool import WebSearchTool
+
+_names = itertools.count()
+
+
+class StubBackend(SearchBackend):
+    """Backend answering after a fixed delay, or failing."""
+    
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        # Unique names give every backend its own guard
+        self.name = f"stub-{next(_names)}"
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.finished = threading.Event()
+        self.cancelled = False
+        get_guard(self.name).max_retries = 0
+    
+    def _result(self, query):
+        self.finished.set()
+        if self.fail:
+            raise ConnectionError(f"{self.name} is down")
+        return [
+            {"title": self.name, "url": "https://example.com", "snippet": query}
+        ]
+    
+    def run(self, query):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self._result(query)
+    
+    async def arun(self, query):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self._result(query)
+
+
+def hedged(primary, secondary, delay=0.05):
+    return HedgedSearch(
+        primary, secondary, default_delay=delay, min_samples=10**6
+    )
+
+
+def test_primary_wins_without_hedging():
+    primary, secondary = StubBackend(), StubBackend()
+    search = hedged(primary, secondary)
+    
+    results, answered_by = search.run("query")
+    
+    assert answered_by is primary
+    assert results[0]["title"] == primary.name
+    assert secondary.calls == 0
+    assert search.stats == {"requests": 1, "hedged": 0, "secondary_wins": 0}
+
+
+def test_slow_primary_loses_to_secondary():
+    primary, secondary = StubBackend(delay=0.5), StubBackend()
+    search = hedged(primary, secondary)
+    
+    results, answered_by = search.run("query")
+    
+    assert answered_by is secondary
+    assert results[0]["title"] == secondary.name
+    assert search.stats == {"requests": 1, "hedged": 1, "secondary_wins": 1}
+
+
+def test_failed_primary_falls_back_before_the_delay():
+    primary, secondary = StubBackend(fail=True), StubBackend()
+    search = hedged(primary, secondary, delay=5.0)
+    
+    start = time.perf_counter()
+    _, answered_by = search.run("query")
+    
+    assert answered_by is secondary
+    assert time.perf_counter() - start < 1.0
+
+
+def test_both_failing_raises_search_error():
+    search = hedged(StubBackend(fail=True), StubBackend(fail=True))
+    
+    with pytest.raises(SearchError):
+        search.run("query")
+    with pytest.raises(SearchError):
+        asyncio.run(search.arun("query"))
+
+
+def test_async_primary_and_secondary_wins():
+    fast, slow = StubBackend(), StubBackend(delay=0.5)
+    
+    _, answered_by = asyncio.run(hedged(fast, slow).arun("query"))
+    assert answered_by is fast
+    assert slow.calls == 0
+    
+    slow, fast = StubBackend(delay=0.5), StubBackend()
+    search = hedged(slow, fast)
+    _, answered_by = asyncio.run(search.arun("query"))
+    assert answered_by is fast
+    assert search.stats["secondary_wins"] == 1
+
+
+def test_async_loser_is_cancelled():
+    primary, secondary = StubBackend(delay=5.0), StubBackend()
+    
+    start = time.perf_counter()
+    _, answered_by = asyncio.run(hedged(primary, secondary).arun("query"))
+    
+    assert answered_by is secondary
+    assert primary.cancelled
+    assert not primary.finished.is_set()
+    assert time.perf_counter() - start < 1.0
+
+
+def test_sync_loser_does_not_delay_the_winner():
+    primary, secondary = StubBackend(delay=1.0), StubBackend()
+    
+    start = time.perf_counter()
+    _, answered_by = hedged(primary, secondary).run("query")
+    
+    # A started request cannot be cancelled in a thread; its result is
+    # discarded once it finishes
+    assert answered_by is secondary
+    assert time.perf_counter() - start < 0.5
+    assert not primary.finished.is_set()
+
+
+def test_secondary_results_are_cached_under_its_own_name(tmp_path):
+    primary, secondary = StubBackend(delay=0.5), StubBackend()
+    cache = SearchCache(path=str(tmp_path / "search.db"))
+    tool = WebSearchTool(
+        backend=primary, cache=cache, hedge_backend=secondary,
+        hedge_percentile=95
+    )
+    tool.hedge.default_delay = 0.05
+    
+    hits = tool.search("query")
+    
+    assert hits[0].backend == secondary.name
+    assert cache.get("query", namespace=primary.name) is None
+    assert cache.get("query", namespace=secondary.name) is not None
+    
+    # A plain search on the primary must not serve the secondary's results
+    plain = WebSearchTool(backend=primary, cache=cache)
+    assert plain._lookup("query", 0) is None
+    # The hedged tool reuses them, since it would accept them again
+    assert tool._lookup("query", 0)[0].backend == secondary.name
+
+
+def test_hedge_percentile_comes_from_config(monkeypatch):
+    primary = StubBackend()
+    monkeypatch.setattr(
+        Config, "SEARCH_HEDGING", {primary.name: {"percentile": 80}}
+    )
+    tool = WebSearchTool(backend=primary, hedge_backend=StubBackend())
+    
+    assert tool.hedge.percentile == 80
+
+
+def test_hedged_searches_share_one_worker_pool():
+    # A search tool per run must not leave a pool of idle threads behind
+    for _ in range(20):
+        search = hedged(StubBackend(delay=0.02), StubBackend(), delay=0.01)
+        assert search.run("query")[0]
+    
+    hedge_threads = [
+        thread for thread in threading.enumerate()
+        if thread.name.startswith("hedge")
+    ]
+    assert 0 < len(hedge_threads) <= Config.SEARCH_HEDGE_MAX_WORKERS
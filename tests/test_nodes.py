@@ -0,0 +1,401 @@
+"""
+Tests for the workflow nodes, run through the compiled graph with fakes.
+"""
+
+import asyncio
+import contextlib
+import io
+import re
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from benchmarks.fakes import FakeChatModel, FakeSearchBackend
+from src.checkpoint import run_config
+from src.config import Config
+from src.models import Gap, SearchHit, merge_by_question
+from src.nodes import WorkflowNodes
+from src.prompts import Prompts
+from src.search_backends import register_backend
+from src.tokens import count_tokens
+from src.workflow import WorkflowBuilder
+
+
+@register_backend("test-nodes")
+class NodesSearchBackend(FakeSearchBackend):
+    def __init__(self):
+        super().__init__(latency=0.0, jitter=0.0, name="test-nodes")
+
+
+class ScriptedChatModel(FakeChatModel):
+    """Fake model that can find gaps and answer its first report slowly.
+    
+    Report responses report ``REPORT_TOKENS`` tokens of usage. Every
+    prompt answered is kept in ``prompts``.
+    """
+    
+    find_gaps: bool = False
+    first_report_latency: float = 0.0
+    report_prompts: list = []
+    prompts: list = []
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self._report_delay(messages))
+        return super()._generate(messages, stop, run_manager, **kwargs)
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self._report_delay(messages))
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+    
+    def _report_delay(self, messages) -> float:
+        if messages[0].content != Prompts.REPORT_GENERATION:
+            return 0.0
+        self.report_prompts.append(messages)
+        return self.first_report_latency if len(self.report_prompts) == 1 else 0
+    
+    def _result(self, messages):
+        self.prompts.append(messages)
+        result = super()._result(messages)
+        message = result.generations[0].message
+        if messages[0].content == Prompts.REPORT_GENERATION:
+            message.usage_metadata = {
+                "input_tokens": REPORT_TOKENS - 10,
+                "output_tokens": 10,
+                "total_tokens": REPORT_TOKENS
+            }
+        elif self.find_gaps and message.content.startswith("yes"):
+            message.content = "no, evidence is thin\nGAP 1: more evidence"
+        return result
+
+
+REPORT_TOKENS = 1234
+
+
+def make_builder(llm=None, **options) -> WorkflowBuilder:
+    llm = llm or FakeChatModel(latency=0.0, jitter=0.0)
+    
+    class FakeWorkflowBuilder(WorkflowBuilder):
+        def create_llm(self, settings=None):
+            return llm
+    
+    settings = dict(
+        model_name="fake-chat",
+        num_sub_questions=2,
+        max_iterations=1,
+        question_prompt=Prompts.QUESTION_GENERATION,
+        analysis_prompt=Prompts.ANALYSIS,
+        reflection_prompt=Prompts.REFLECTION,
+        report_prompt=Prompts.REPORT_GENERATION,
+        use_search_cache=False,
+        use_llm_cache=False,
+        search_backend="test-nodes",
+        fetch_pages=False,
+        node_models={},
+        stream=False,
+        checkpoints=False
+    )
+    settings.update(options)
+    return FakeWorkflowBuilder(**settings)
+
+
+def test_time_to_first_token_is_kept_per_run():
+    builder = make_builder(stream=True)
+    app = builder.build()
+    
+    async def research(run_id):
+        return await app.ainvoke(
+            builder.create_initial_state(f"topic {run_id}"), run_config(run_id)
+        )
+    
+    async def both():
+        await asyncio.gather(research("a"), research("b"))
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(both())
+    
+    assert set(builder.nodes.ttft) == {"a", "b"}
+    for run_id in ("a", "b"):
+        ttft = builder.nodes.pop_ttft(run_id)
+        assert len(ttft["generate_sub_questions"]) == 1
+        assert len(ttft["generate_report"]) == 1
+    assert builder.nodes.ttft == {}
+
+
+def hit(question_id, snippet):
+    return SearchHit(
+        question_id, "title", f"https://example.com/{question_id}", snippet,
+        "test-nodes", 0.0
+    )
+
+
+def test_pipelined_results_are_deduplicated(monkeypatch):
+    monkeypatch.setattr(Config, "DEDUP_ENABLED", True)
+    shared = "Solid-state batteries replace the liquid electrolyte entirely"
+    state = make_builder().create_initial_state("topic")
+    state["question_results"] = {
+        0: [hit(0, shared), hit(0, "Lithium metal anodes grow dendrites")],
+        1: [hit(1, shared), hit(1, "Sulfide electrolytes are air sensitive")]
+    }
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        branch = WorkflowNodes._deduplicate_branch([hit(0, shared)] * 2)
+        WorkflowNodes._collect_question_results(state)
+    
+    assert len(branch) == 1
+    assert [h.question_id for h in state["search_results"]] == [0, 0, 1]
+
+
+def run_speculative(use_async, **model_options):
+    llm = ScriptedChatModel(latency=0.0, jitter=0.0, **model_options)
+    builder = make_builder(
+        llm,
+        max_iterations=2,
+        reflection_strategy="llm",
+        speculative_report=True
+    )
+    app = builder.build()
+    state = builder.create_initial_state("topic")
+    with contextlib.redirect_stdout(io.StringIO()):
+        if use_async:
+            result = asyncio.run(app.ainvoke(state))
+        else:
+            result = app.invoke(state)
+        stats = builder.nodes.speculation_stats()
+    return llm, builder, result, stats
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_accepted_speculative_report_is_used(use_async):
+    llm, builder, result, stats = run_speculative(use_async)
+    
+    assert stats == {
+        "started": 1, "hits": 1, "misses": 0, "wasted_tokens": 0,
+        "hit_rate": 1.0
+    }
+    assert len(llm.report_prompts) == 1
+    assert result["report"].startswith("Generated text")
+
+
+def test_rejected_running_sync_report_is_counted_before_stats():
+    llm, builder, result, stats = run_speculative(
+        False, find_gaps=True, first_report_latency=0.5
+    )
+    
+    # The discarded report could not be cancelled; it ran to completion
+    # and every token it used counts as wasted
+    assert stats["started"] == 1 and stats["misses"] == 1
+    assert stats["hits"] == 0 and stats["hit_rate"] == 0.0
+    assert stats["wasted_tokens"] == REPORT_TOKENS
+    assert builder.metrics.counter(
+        "speculative_wasted_tokens_total"
+    ) == REPORT_TOKENS
+    assert result["iteration"] == 2
+
+
+def test_rejected_async_report_is_cancelled():
+    llm, builder, result, stats = run_speculative(
+        True, find_gaps=True, first_report_latency=5.0
+    )
+    
+    # Only the prompt of a cancelled call is counted
+    prompt_tokens = sum(
+        count_tokens(str(message.content), llm.model_name)
+        for message in llm.report_prompts[0]
+    )
+    assert stats["started"] == 1 and stats["misses"] == 1
+    assert stats["wasted_tokens"] == prompt_tokens
+    assert result["iteration"] == 2
+
+
+def parse_gaps(content):
+    state = {"sub_questions": ["first question", "second question"]}
+    with contextlib.redirect_stdout(io.StringIO()):
+        return WorkflowNodes._parse_gaps(state, AIMessage(content=content))
+
+
+def test_reflection_gaps_are_parsed():
+    gaps = parse_gaps(
+        "No, the analysis lacks recent data.\n"
+        "GAP 1: battery cost per kWh 2024\n"
+        "  - gap 2 : sodium-ion supply chain  \n"
+        "GAP 3: a sub-question that does not exist"
+    )
+    
+    assert gaps == [
+        Gap(0, "battery cost per kWh 2024"),
+        Gap(1, "sodium-ion supply chain")
+    ]
+
+
+@pytest.mark.parametrize("content", [
+    "yes, the analysis is comprehensive",
+    "No. The analysis lacks cost data.",
+    "No.\nGAP: cost data\nGaps - 1. supply chain",
+    "",
+])
+def test_malformed_reflection_names_no_gaps(content):
+    assert parse_gaps(content) == []
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_follow_up_pass_analyzes_only_the_gap_results(use_async):
+    llm = ScriptedChatModel(latency=0.0, jitter=0.0, find_gaps=True)
+    builder = make_builder(llm, max_iterations=2, reflection_strategy="llm")
+    app = builder.build()
+    state = builder.create_initial_state("topic")
+    with contextlib.redirect_stdout(io.StringIO()):
+        if use_async:
+            result = asyncio.run(app.ainvoke(state))
+        else:
+            result = app.invoke(state)
+    
+    first, second = [
+        messages[-1].content for messages in llm.prompts
+        if messages[0].content == Prompts.ANALYSIS
+    ]
+    assert "Result 0 for What is aspect number 0" in first
+    assert "more evidence" not in first
+    # The second pass gets the earlier analysis, the gap and only the
+    # results searched for it
+    assert second.startswith("Research Query: topic\n\nPrevious Analysis:")
+    assert result["previous_analysis"] in second
+    assert "- more evidence" in second
+    assert "Result 0 for more evidence" in second
+    assert "Result 0 for What is aspect" not in second
+    # Sub-question 2 had no gap, so none of its results are sent again
+    assert "aspect number 1" not in second
+    assert result["iteration"] == 2
+    assert builder.nodes.reflections == {"local": 0, "llm": 1}
+
+
+class BranchChatModel(ScriptedChatModel):
+    """Fake model answering each map-reduce branch with its question id.
+    
+    Branch prompts containing ``fail_when`` raise, and the branch of
+    sub-question 0 answers after ``first_branch_latency`` seconds.
+    """
+    
+    fail_when: str = "never"
+    first_branch_latency: float = 0.0
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self._question_id(messages) == 0:
+            await asyncio.sleep(self.first_branch_latency)
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+    
+    def _result(self, messages):
+        result = super()._result(messages)
+        question_id = self._question_id(messages)
+        if question_id is not None:
+            if self.fail_when in messages[-1].content:
+                raise ConnectionError(f"branch {question_id} failed")
+            message = result.generations[0].message
+            message.content = f"Analysis of Q{question_id}"
+        return result
+    
+    @staticmethod
+    def _question_id(messages):
+        content = messages[-1].content
+        is_merge = "Sub-question" in content
+        if messages[0].content != Prompts.ANALYSIS or is_merge:
+            return None
+        return int(re.search(r"aspect number (\d+)", content).group(1))
+
+
+def run_map_reduce(use_async, num_sub_questions=3, **model_options):
+    llm = BranchChatModel(latency=0.0, jitter=0.0, **model_options)
+    builder = make_builder(
+        llm,
+        num_sub_questions=num_sub_questions,
+        max_iterations=2,
+        reflection_strategy="llm",
+        analysis_mode="map_reduce"
+    )
+    app = builder.build()
+    state = builder.create_initial_state("topic")
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        if use_async:
+            result = asyncio.run(app.ainvoke(state))
+        else:
+            result = app.invoke(state)
+    merges = [
+        messages[-1].content for messages in llm.prompts
+        if "Analyses per sub-question" in messages[-1].content
+    ]
+    return builder, result, merges, output.getvalue()
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_failed_branch_keeps_the_other_analyses(use_async):
+    builder, result, merges, output = run_map_reduce(
+        use_async, fail_when="aspect number 1 "
+    )
+    
+    assert result["partial_analyses"] == {
+        0: "Analysis of Q0", 2: "Analysis of Q2"
+    }
+    assert "Sub-question 1: What is aspect number 0" in merges[0]
+    assert "Sub-question 2:" not in merges[0]
+    assert "Sub-question 3: What is aspect number 2" in merges[0]
+    assert "✗ Q2 analysis failed: branch 1 failed" in output
+    assert builder.metrics.counter(
+        "llm_errors_total", node="analyze_context"
+    ) == 1
+    assert result["report"]
+
+
+def test_failed_follow_up_branch_keeps_the_earlier_analysis():
+    builder, result, merges, output = run_map_reduce(
+        False, num_sub_questions=2, find_gaps=True,
+        fail_when="Previous Analysis"
+    )
+    
+    # The gap pass for sub-question 1 failed; both first-pass analyses
+    # are merged again
+    assert result["iteration"] == 2
+    assert result["partial_analyses"] == {
+        0: "Analysis of Q0", 1: "Analysis of Q1"
+    }
+    assert len(merges) == 2 and merges[0] == merges[1]
+
+
+def merge_order(text):
+    positions = {i: text.index(f"Analysis of Q{i}") for i in range(3)}
+    return sorted(positions, key=positions.get)
+
+
+def test_branches_merge_in_question_order():
+    # Sub-question 1 finishes last but is still merged first
+    builder, result, merges, output = run_map_reduce(
+        True, first_branch_latency=0.05
+    )
+    
+    assert merge_order(merges[0]) == [0, 1, 2]
+    
+    state = builder.create_initial_state("topic")
+    state["sub_questions"] = ["q1", "q2", "q3"]
+    state["partial_analyses"] = {
+        i: f"Analysis of Q{i}" for i in (2, 0, 1)
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        prompt = builder.nodes._merge_messages(state)
+    assert merge_order(prompt[-1].content) == [0, 1, 2]
+
+
+def test_every_branch_failing_stops_the_run():
+    with pytest.raises(RuntimeError, match="Every sub-question analysis failed"):
+        run_map_reduce(False, num_sub_questions=1, fail_when="aspect number")
+
+
+def test_merge_by_question_replaces_by_question_id():
+    current = {0: "first", 1: "second"}
+    update = {1: "second, revised", 2: "third"}
+    
+    merged = merge_by_question(current, update)
+    
+    assert merged == {0: "first", 1: "second, revised", 2: "third"}
+    assert merge_by_question(merged, update) == merged
+    assert merge_by_question(merged, {}) == merged
+    assert current == {0: "first", 1: "second"}
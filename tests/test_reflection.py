@@ -0,0 +1,156 @@
+"""
+Tests for the local reflection strategies and the LLM fallback.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from src.models import Gap
+from src.reflection import (
+    ConvergenceStrategy,
+    CoverageStrategy,
+    LocalStrategy,
+    create_strategy
+)
+from tests.test_nodes import ScriptedChatModel, make_builder
+
+QUESTIONS = [
+    "What are the main challenges of solid-state batteries?",
+    "How do sodium-ion batteries compare on cost?"
+]
+# Covers every sub-question
+FULL = (
+    "Solid-state batteries face main challenges: dendrites. "
+    "Sodium-ion batteries compare well on cost."
+)
+# Covers the first sub-question only
+HALF = (
+    "Solid-state batteries face main challenges such as dendrites and "
+    "interface resistance."
+)
+UNRELATED = "Wind turbines keep getting larger."
+
+
+def state(analysis, previous=""):
+    return {
+        "query": "battery research",
+        "sub_questions": QUESTIONS,
+        "analysis": analysis,
+        "previous_analysis": previous,
+        "iteration": 0
+    }
+
+
+def test_coverage_complete():
+    verdict = CoverageStrategy().assess(state(FULL))
+    
+    assert verdict.complete is True and verdict.score == 1.0
+    assert verdict.gaps == ()
+
+
+def test_coverage_incomplete_names_the_missing_words():
+    verdict = CoverageStrategy().assess(state(UNRELATED))
+    
+    assert verdict.complete is False
+    assert verdict.gaps == (
+        Gap(0, "battery research main challenges solid state batteries"),
+        Gap(1, "battery research sodium ion batteries compare cost")
+    )
+
+
+def test_coverage_only_gaps_uncovered_questions():
+    verdict = CoverageStrategy(complete=0.9, incomplete=0.7).assess(
+        state(HALF)
+    )
+    
+    assert verdict.complete is False
+    assert [gap.question_id for gap in verdict.gaps] == [1]
+
+
+def test_coverage_between_thresholds_is_unsure():
+    verdict = CoverageStrategy().assess(state(HALF))
+    
+    assert verdict.complete is None
+    assert verdict.reason == "coverage 60% (lowest 20%)"
+
+
+def test_convergence_stops_when_analysis_stops_changing():
+    strategy = ConvergenceStrategy()
+    
+    assert strategy.assess(state(FULL, previous=FULL)).complete is True
+    assert strategy.assess(state(FULL + " Costs fell in 2024.", FULL)).complete
+
+
+def test_convergence_is_unsure_on_first_or_changing_analysis():
+    strategy = ConvergenceStrategy()
+    
+    assert strategy.assess(state(FULL)).complete is None
+    assert strategy.assess(state(FULL, previous=UNRELATED)).complete is None
+
+
+def test_local_accepts_converged_analysis_despite_low_coverage():
+    verdict = LocalStrategy().assess(state(UNRELATED, previous=UNRELATED))
+    
+    assert verdict.complete is True and verdict.gaps == ()
+
+
+def test_local_falls_through_to_coverage():
+    verdict = LocalStrategy().assess(state(UNRELATED, previous=FULL))
+    
+    assert verdict.complete is False and len(verdict.gaps) == 2
+
+
+def test_local_is_unsure_when_every_strategy_is():
+    verdict = LocalStrategy().assess(state(HALF, previous=UNRELATED))
+    
+    assert verdict.complete is None
+    assert verdict.reason == (
+        "similarity to previous analysis 0.00; coverage 60% (lowest 20%)"
+    )
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError, match="Unknown reflection strategy"):
+        create_strategy("nope")
+
+
+def reflect(analysis, fallback=True, llm=None):
+    builder = make_builder(
+        llm=llm,
+        max_iterations=2,
+        reflection_strategy="coverage",
+        reflection_fallback=fallback
+    )
+    builder.build()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = builder.nodes.reflect_on_analysis(state(analysis))
+    return result["gaps"], builder.nodes.reflections
+
+
+def test_conclusive_verdict_skips_the_model():
+    llm = ScriptedChatModel(latency=0.0, jitter=0.0, find_gaps=True)
+    
+    gaps, reflections = reflect(FULL, llm=llm)
+    
+    assert gaps == []
+    assert reflections == {"local": 1, "llm": 0}
+
+
+def test_unsure_verdict_asks_the_model():
+    llm = ScriptedChatModel(latency=0.0, jitter=0.0, find_gaps=True)
+    
+    gaps, reflections = reflect(HALF, llm=llm)
+    
+    assert gaps == [Gap(0, "more evidence")]
+    assert reflections == {"local": 0, "llm": 1}
+
+
+def test_unsure_verdict_is_accepted_without_fallback():
+    llm = ScriptedChatModel(latency=0.0, jitter=0.0, find_gaps=True)
+    
+    gaps, reflections = reflect(HALF, fallback=False, llm=llm)
+    
+    assert gaps == []
+    assert reflections == {"local": 1, "llm": 0}
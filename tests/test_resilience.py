@@ -0,0 +1,181 @@
+"""
+Tests for the rate limiter, circuit breaker and retry policy.
+
+Time is injected through a fake clock, so the tests never sleep.
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from src import resilience
+from src.resilience import (
+    BackendGuard,
+    CircuitBreaker,
+    CircuitOpenError,
+    SearchError,
+    TokenBucket,
+    backoff_delay,
+    is_throttle_error
+)
+
+
+class Clock:
+    """Monotonic clock whose sleeps only advance the time."""
+    
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+    
+    async def asleep(self, seconds):
+        self.sleep(seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(
+        resilience,
+        "time",
+        types.SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep)
+    )
+    monkeypatch.setattr(
+        resilience,
+        "asyncio",
+        types.SimpleNamespace(
+            sleep=clock.asleep, CancelledError=asyncio.CancelledError
+        )
+    )
+    return clock
+
+
+class Flaky:
+    """Backend call failing with the given errors, then succeeding."""
+    
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+    
+    async def acall(self):
+        return self()
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2, burst=2)
+    
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    clock.now += 1.0
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert asyncio.run(bucket.aacquire()) == pytest.approx(0.5)
+
+
+def test_breaker_opens_after_threshold_and_allows_one_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    for _ in range(2):
+        breaker.record_failure()
+    assert not breaker.is_open
+    
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.allow()
+    
+    clock.now += 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    
+    # A failed trial re-opens the circuit for another cool-down
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open and breaker.allow() and breaker.allow()
+
+
+def test_cancelled_trial_releases_the_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5)
+    breaker.record_failure()
+    clock.now += 5
+    assert breaker.allow()
+    
+    breaker.record_cancelled()
+    assert breaker.allow()
+
+
+def test_guard_retries_throttles_with_backoff(clock):
+    guard = BackendGuard("test", max_retries=3, base_delay=1, max_delay=2)
+    call = Flaky(RuntimeError("429 Too Many Requests"), ConnectionError())
+    
+    assert guard.call(call) == "ok"
+    
+    assert call.calls == 3
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1 and 0 <= clock.sleeps[1] <= 2
+    metrics = guard.metrics()
+    assert metrics["retries"] == 2 and metrics["throttled"] == 1
+    assert metrics["failures"] == 0
+
+
+def test_guard_does_not_retry_other_errors(clock):
+    guard = BackendGuard("test", max_retries=3)
+    call = Flaky(ValueError("unexpected response"))
+    
+    with pytest.raises(SearchError, match="unexpected response"):
+        guard.call(call)
+    with pytest.raises(SearchError):
+        asyncio.run(guard.acall(Flaky(KeyError("results")).acall))
+    
+    assert call.calls == 1
+    assert clock.sleeps == []
+    assert guard.metrics()["failures"] == 2
+
+
+def test_guard_opens_the_circuit_and_recovers(clock):
+    guard = BackendGuard(
+        "test", max_retries=0, failure_threshold=2, reset_timeout=30
+    )
+    for _ in range(2):
+        with pytest.raises(SearchError):
+            guard.call(Flaky(ConnectionError()))
+    
+    never_called = Flaky()
+    with pytest.raises(CircuitOpenError):
+        guard.call(never_called)
+    assert never_called.calls == 0
+    assert guard.metrics()["circuit_rejections"] == 1
+    assert guard.metrics()["circuit_open"]
+    
+    clock.now += 30
+    assert asyncio.run(guard.acall(Flaky().acall)) == "ok"
+    assert not guard.metrics()["circuit_open"]
+
+
+def test_backoff_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 0.5, 8.0) <= min(8.0, 0.5 * 2 ** attempt)
+
+
+@pytest.mark.parametrize("error, throttled", [
+    (RuntimeError("Ratelimit: 202 response"), True),
+    (RuntimeError("HTTP 429"), True),
+    (RuntimeError("Too Many Requests"), True),
+    (type("RateLimitException", (Exception,), {})("blocked"), True),
+    (ConnectionError("reset by peer"), False),
+    (ValueError("bad json"), False),
+])
+def test_throttle_classification(error, throttled):
+    assert is_throttle_error(error) is throttled
@@ -0,0 +1,42 @@
+"""
+Tests for the search tool's caching.
+"""
+
+import asyncio
+import threading
+
+from src.cache import SearchCache
+from src.search_backends import SearchBackend
+from src.search_tool import WebSearchTool
+
+
+class EchoBackend(SearchBackend):
+    name = "echo"
+    
+    def run(self, query):
+        return [{"title": query, "url": "https://example.com", "snippet": query}]
+
+
+def test_async_search_uses_the_cache_off_the_event_loop(tmp_path):
+    cache = SearchCache(path=str(tmp_path / "search.db"))
+    threads = []
+    get, set_ = cache.get, cache.set
+    cache.get = lambda *a, **kw: threads.append(threading.get_ident()) or get(
+        *a, **kw
+    )
+    cache.set = lambda *a, **kw: threads.append(threading.get_ident()) or set_(
+        *a, **kw
+    )
+    tool = WebSearchTool(backend=EchoBackend(), cache=cache)
+    
+    async def search_twice():
+        loop_thread = threading.get_ident()
+        first = await tool.asearch("query")
+        second = await tool.asearch("query")
+        return loop_thread, first, second
+    
+    loop_thread, first, second = asyncio.run(search_twice())
+    
+    assert [hit.url for hit in second] == [hit.url for hit in first]
+    assert len(threads) == 3
+    assert loop_thread not in threads
@@ -0,0 +1,100 @@
+"""
+Tests for the semantic search cache.
+"""
+
+import pytest
+
+from src.config import Config
+from src.semantic_cache import SemanticCache, key_terms, terms
+
+RESULTS = [{"title": "t", "url": "https://example.com", "snippet": "s"}]
+
+PARAPHRASES = [
+    (
+        "What are the current trends in quantum computing?",
+        "What recent developments exist in quantum computing?"
+    ),
+    (
+        "What are the latest advances in solid-state batteries?",
+        "What are the current trends in solid-state batteries?"
+    ),
+    (
+        "What problems does CRISPR gene editing face?",
+        "What are the challenges of CRISPR gene editing?"
+    ),
+]
+
+DIFFERENT_QUESTIONS = [
+    (
+        "What are the benefits of remote work for employers?",
+        "What are the benefits of remote work for employees?"
+    ),
+    (
+        "What was the EV market size in 2023?",
+        "What was the EV market size in 2024?"
+    ),
+    (
+        "How does Python handle memory management?",
+        "How does Java handle memory management?"
+    ),
+    ("How did Apple perform in Q3?", "How did Apple perform in Q4?"),
+    ("What are the risks of GPT-4?", "What are the risks of GPT-3?"),
+    (
+        "What are the current trends in quantum computing?",
+        "What are the current trends in cloud computing?"
+    ),
+    (
+        "What are the benefits of solar power?",
+        "What are the drawbacks of solar power?"
+    ),
+]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SemanticCache(path=str(tmp_path / "semantic.db"))
+
+
+@pytest.mark.parametrize("cached, asked", PARAPHRASES)
+def test_paraphrase_hits(cache, cached, asked):
+    cache.add(cached, RESULTS)
+    
+    assert cache.lookup(asked) == (cached, RESULTS)
+
+
+@pytest.mark.parametrize("cached, asked", DIFFERENT_QUESTIONS)
+def test_different_question_misses(cache, cached, asked):
+    cache.add(cached, RESULTS)
+    
+    assert cache.lookup(asked) is None
+
+
+def test_synonyms_come_from_config(cache, monkeypatch):
+    assert terms("latest advances") == terms("current trends")
+    
+    monkeypatch.setattr(Config, "SEMANTIC_CACHE_SYNONYMS", {})
+    cache.add(PARAPHRASES[1][0], RESULTS)
+    
+    assert terms("latest advances") == ["latest", "advance"]
+    assert cache.lookup(PARAPHRASES[1][1]) is None
+
+
+def test_key_terms_are_numbers_and_names():
+    assert key_terms("What was the EV market size in 2023?") == "2023 ev"
+    assert key_terms("What are the benefits of remote work?") == ""
+
+
+def test_namespaces_are_separate(cache):
+    cache.add(PARAPHRASES[0][0], RESULTS, namespace="ddg")
+    
+    assert cache.lookup(PARAPHRASES[0][1], namespace="tavily") is None
+    assert cache.lookup(PARAPHRASES[0][1], namespace="ddg") is not None
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "semantic.db")
+    SemanticCache(path=path).add("What was the EV market size in 2023?", RESULTS)
+    
+    reopened = SemanticCache(path=path)
+    assert reopened.lookup("What was the EV market size in 2024?") is None
+    assert reopened.lookup("EV market size in 2023?") is not None
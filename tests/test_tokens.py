@@ -0,0 +1,43 @@
+"""
+Tests for local token counting.
+"""
+
+import hashlib
+
+import pytest
+
+from src import tokens
+from src.utils import estimate_tokens
+
+tiktoken = pytest.importorskip("tiktoken")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(tokens, "_ENCODINGS", {})
+    return tmp_path
+
+
+def test_missing_encoding_file_falls_back_without_downloading(
+    cache_dir, monkeypatch
+):
+    def download(name):
+        raise AssertionError(f"{name} would be downloaded")
+    monkeypatch.setattr(tiktoken, "get_encoding", download)
+    
+    text = "How many tokens is this sentence?"
+    assert tokens.get_encoding("gpt-4o-mini") is None
+    assert tokens.count_tokens(text, "gpt-4o-mini") == estimate_tokens(text)
+
+
+def test_cached_encoding_file_is_used(cache_dir, monkeypatch):
+    url = tokens.BPE_URL.format("o200k_base")
+    (cache_dir / hashlib.sha1(url.encode()).hexdigest()).write_bytes(b"")
+    loaded = []
+    monkeypatch.setattr(tiktoken, "get_encoding", loaded.append)
+    
+    tokens.get_encoding("gpt-4o-mini")
+    tokens.get_encoding("gpt-4o-mini")
+    
+    assert loaded == ["o200k_base"]
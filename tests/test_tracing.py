@@ -0,0 +1,68 @@
+"""
+Tests for switching LangSmith tracing of the workflow nodes.
+"""
+
+import asyncio
+
+import langsmith.run_helpers
+import pytest
+
+from src import tracing
+from src.tracing import configure_tracing, traceable
+
+ENV = (
+    "LANGSMITH_TRACING_V2", "LANGCHAIN_TRACING_V2",
+    "LANGSMITH_TRACING", "LANGCHAIN_TRACING"
+)
+
+
+@pytest.fixture
+def traced_calls(monkeypatch):
+    """Replace LangSmith's decorator with one recording traced calls."""
+    for name in ENV:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(tracing, "_langsmith_enabled", None)
+    calls = []
+    
+    def fake_traceable(**kwargs):
+        def decorator(func):
+            def wrapper(*args, **kw):
+                calls.append(kwargs["name"])
+                return func(*args, **kw)
+            return wrapper
+        return decorator
+    
+    monkeypatch.setattr(langsmith.run_helpers, "traceable", fake_traceable)
+    return calls
+
+
+def test_environment_set_after_import_turns_tracing_on(
+    traced_calls, monkeypatch
+):
+    @traceable(run_type="chain", name="node")
+    def node(value):
+        return value + 1
+    
+    @traceable(run_type="chain", name="anode")
+    async def anode(value):
+        return value + 1
+    
+    assert node(1) == 2 and asyncio.run(anode(1)) == 2
+    assert traced_calls == []
+    
+    monkeypatch.setenv("LANGCHAIN_TRACING_V2", "true")
+    
+    assert node(1) == 2 and asyncio.run(anode(1)) == 2
+    assert traced_calls == ["node", "anode"]
+
+
+def test_configured_mode_overrides_the_environment(traced_calls, monkeypatch):
+    @traceable(run_type="chain", name="node")
+    def node():
+        return None
+    
+    configure_tracing("off")
+    monkeypatch.setenv("LANGSMITH_TRACING", "true")
+    node()
+    
+    assert traced_calls == []